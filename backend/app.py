@@ -1,11 +1,14 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
 import json
 import csv
 import io
+import math
 import os
 import sys
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 import openpyxl
@@ -22,11 +25,156 @@ if backend_dir not in sys.path:
 load_dotenv(os.path.join(backend_dir, '.env'))
 
 # Import prompt functions
-from prompts import get_prompt_for_scenario, get_qa_prompt
+from prompts import (
+    get_prompt_for_scenario, get_packed_prompt_for_scenario, get_qa_prompt, add_reference_translations,
+    software_glossary, load_glossary_file, PROMPT_REGISTRY
+)
+from services import (
+    TranslationMemory, FuzzyIndex, SharedRateLimiter, load_tenant_quotas, Counters, prompt_hash,
+    estimate_messages_tokens,
+    plan_packs, packed_max_tokens, parse_packed_reply, fan_in_max_tokens, parse_multi_language_reply,
+    load_json_reply, plan_qa_chunks, qa_max_tokens, check_table, select_cells_for_review,
+    split_template, template_key, substitute_values, estimate_tokens, ModelRouter, load_routes,
+    ResilientClient, CircuitBreaker, build_http_client, LatencyTracker, Hedger, SingleFlight, AIMDLimiter,
+    INTERACTIVE, BULK, AdmissionQueue, Overloaded, Cancelled, peer_closed,
+    JobStore, JobManager
+)
 
 app = Flask(__name__)
 CORS(app)
 
+# Extra termbase entries for the software scenario (JSON list, see prompts/glossary.py)
+if os.getenv('SOFTWARE_GLOSSARY_PATH'):
+    software_glossary.extend(load_glossary_file(os.getenv('SOFTWARE_GLOSSARY_PATH')))
+
+# System prompt cost per scenario: shared prefix and each language slice
+PROMPT_TOKEN_COUNTS = PROMPT_REGISTRY.token_counts(estimate_tokens)
+
+# Persistent translation memory shared by all translate endpoints
+translation_memory = TranslationMemory(
+    os.getenv('TRANSLATION_MEMORY_PATH', os.path.join(backend_dir, 'translation_memory.sqlite3')),
+    max_memory_entries=int(os.getenv('TRANSLATION_MEMORY_SIZE', '10000')),
+    fuzzy_index=FuzzyIndex() if os.getenv('FUZZY_MATCH', 'true').lower() == 'true' else None
+)
+
+# Near matches scoring at least FUZZY_MATCH_THRESHOLD are given to the model as
+# references; at FUZZY_REUSE_THRESHOLD (0 = never) the match is reused as is
+FUZZY_MATCH_THRESHOLD = float(os.getenv('FUZZY_MATCH_THRESHOLD', '0.75'))
+FUZZY_REUSE_THRESHOLD = float(os.getenv('FUZZY_REUSE_THRESHOLD', '0'))
+FUZZY_MATCH_COUNT = int(os.getenv('FUZZY_MATCH_COUNT', '3'))
+fuzzy_stats = Counters('referenced', 'reused')
+
+# Pacing for every upstream OpenAI call, shared by all worker processes through
+# RATE_LIMIT_PATH; TENANT_QUOTAS (JSON object or path) caps tenants within the org budget.
+# The tenant is the client's X-Tenant header, which is not authenticated: tenants not
+# listed in TENANT_QUOTAS share the "*" quota as a single bucket. Calls reserve their
+# prompt plus expected reply tokens and are settled against reported usage. The defaults
+# match a mid-tier account, so a batch is not paced below one call at a time; set the
+# limits to the account's own (upstream 429s also slow the adaptive concurrency limit)
+rate_limiter = SharedRateLimiter(
+    os.getenv('RATE_LIMIT_PATH', os.path.join(backend_dir, 'rate_limits.sqlite3')),
+    requests_per_minute=int(os.getenv('OPENAI_RPM_LIMIT', '5000')),
+    tokens_per_minute=int(os.getenv('OPENAI_TPM_LIMIT', '450000')),
+    tenant_quotas=load_tenant_quotas(os.getenv('TENANT_QUOTAS')) if os.getenv('TENANT_QUOTAS') else None
+)
+
+# Model and max_tokens per call; MODEL_ROUTES is a JSON list or the path of a JSON file
+model_router = ModelRouter(
+    routes=load_routes(os.getenv('MODEL_ROUTES')) if os.getenv('MODEL_ROUTES') else None,
+    default_model=os.getenv('OPENAI_MODEL', 'gpt-4o'),
+    ceiling=int(os.getenv('TRANSLATION_MAX_TOKENS', '4096')),
+    fast_model=os.getenv('FAST_MODEL', 'gpt-4o-mini') or None
+)
+
+# Hedged single-string translations: a duplicate call is sent once a call outlives
+# the HEDGE_PERCENTILE latency, for at most HEDGE_BUDGET of calls
+hedger = Hedger(
+    LatencyTracker(window=int(os.getenv('HEDGE_WINDOW', '500'))),
+    percentile=float(os.getenv('HEDGE_PERCENTILE', '95')),
+    budget=float(os.getenv('HEDGE_BUDGET', '0.05')),
+    default_delay=float(os.getenv('HEDGE_DEFAULT_DELAY', '5'))
+)
+HEDGE_REQUESTS = os.getenv('HEDGE_REQUESTS', 'false').lower() == 'true'
+
+# Identical single-string requests in flight at the same moment share one translation
+COALESCE_REQUESTS = os.getenv('COALESCE_REQUESTS', 'true').lower() == 'true'
+translation_flights = SingleFlight()
+coalesce_stats = Counters('saved_calls')
+
+# Upstream calls not made because the client disconnected or the job was cancelled
+cancel_stats = Counters('skipped_calls')
+
+# Upstream calls in flight adapt (AIMD) between CONCURRENCY_MIN and CONCURRENCY_MAX,
+# backing off on 429s, timeouts and latency inflation. Single-string requests run in
+# the interactive lane; INTERACTIVE_RESERVE of the limit is kept free of bulk calls
+concurrency_limiter = AIMDLimiter(
+    initial=int(os.getenv('CONCURRENCY_INITIAL', '8')),
+    min_limit=int(os.getenv('CONCURRENCY_MIN', '1')),
+    max_limit=int(os.getenv('CONCURRENCY_MAX', '32')),
+    interactive_reserve=float(os.getenv('INTERACTIVE_RESERVE', '0.25'))
+)
+
+# Worker pool size for batch fan-out (per request, clients may ask for fewer);
+# sized to the concurrency ceiling so the adaptive limit is what binds
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', str(concurrency_limiter.max_limit)))
+
+# Concurrent QA chunks per verification run
+QA_WORKERS = int(os.getenv('QA_WORKERS', str(BATCH_WORKERS)))
+
+# QA chunks are sized from estimated prompt and reply tokens
+QA_INPUT_TOKEN_BUDGET = int(os.getenv('QA_INPUT_TOKEN_BUDGET', '6000'))
+QA_OUTPUT_TOKEN_BUDGET = int(os.getenv('QA_OUTPUT_TOKEN_BUDGET', '4000'))
+qa_stats = Counters('chunks', 'resplit_chunks', 'unparsed_entries', 'flagged_cells', 'skipped_cells')
+qa_latency = LatencyTracker()
+
+# Packed batch mode: item token budget and item cap per completion
+PACK_TOKEN_BUDGET = int(os.getenv('PACK_TOKEN_BUDGET', '2000'))
+PACK_MAX_ITEMS = int(os.getenv('PACK_MAX_ITEMS', '50'))
+packing_stats = Counters('requests', 'items', 'retried_items')
+fan_in_stats = Counters('requests', 'languages', 'fallback_languages')
+dedupe_stats = Counters('templates', 'collapsed_cells', 'fallback_cells')
+
+# Bounded admission: a request is shed with 429 + Retry-After once the upstream calls
+# admitted ahead of it would take longer than its queue's budget (seconds) to drain
+ADMISSION_DEFAULT_LATENCY = float(os.getenv('ADMISSION_DEFAULT_LATENCY', '2'))
+
+def upstream_call_rate(lane, latency=None):
+    """Estimated upstream calls per second available to a lane (for calls of `latency` seconds)"""
+    latency = latency or hedger.tracker.percentile(50) or ADMISSION_DEFAULT_LATENCY
+    return min(max(1, concurrency_limiter.lane_limit(lane)) / latency, rate_limiter.requests_per_minute / 60.0)
+
+interactive_queue = AdmissionQueue(
+    'interactive', lambda: upstream_call_rate(INTERACTIVE),
+    latency_budget=float(os.getenv('INTERACTIVE_QUEUE_BUDGET', '10')),
+    max_pending=int(os.getenv('INTERACTIVE_QUEUE_MAX', '256'))
+)
+bulk_queue = AdmissionQueue(
+    'bulk', lambda: upstream_call_rate(BULK),
+    latency_budget=float(os.getenv('BULK_QUEUE_BUDGET', '120')),
+    max_pending=int(os.getenv('BULK_QUEUE_MAX', '32'))
+)
+
+# Deadlines: batch and verify requests may pass `deadline` (seconds). The work is
+# planned to fit it and whatever is done DEADLINE_MARGIN seconds before it is returned;
+# no new upstream call starts after that, while calls in flight finish into the
+# translation memory (in both the Flask and the ASGI app)
+DEADLINE_MARGIN = float(os.getenv('DEADLINE_MARGIN', '1'))
+DEADLINE_PACK_FACTOR = float(os.getenv('DEADLINE_PACK_FACTOR', '2'))
+deadline_stats = Counters('requests', 'degraded', 'partial')
+
+# Background jobs for large translation and QA runs
+job_store = JobStore(os.getenv('JOB_STORE_PATH', os.path.join(backend_dir, 'jobs.sqlite3')))
+job_manager = JobManager(job_store, max_workers=int(os.getenv('JOB_WORKERS', '2')))
+
+# Upstream resilience: per-call deadline and retries (seconds), circuit breaker
+UPSTREAM_DEADLINE = float(os.getenv('UPSTREAM_DEADLINE', '60'))
+UPSTREAM_ATTEMPT_TIMEOUT = float(os.getenv('UPSTREAM_ATTEMPT_TIMEOUT', '30'))
+UPSTREAM_MAX_ATTEMPTS = int(os.getenv('UPSTREAM_MAX_ATTEMPTS', '4'))
+upstream_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv('UPSTREAM_BREAKER_FAILURES', '5')),
+    reset_timeout=float(os.getenv('UPSTREAM_BREAKER_RESET', '30'))
+)
+
 # Initialize OpenAI client
 client = None
 def get_openai_client():
@@ -35,9 +183,916 @@ def get_openai_client():
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key or api_key == 'your_openai_api_key_here':
             return None
-        client = OpenAI(api_key=api_key)
+        # Retries are handled by ResilientClient, not the SDK
+        sdk_client = OpenAI(
+            api_key=api_key,
+            max_retries=0,
+            http_client=build_http_client(
+                max_connections=int(os.getenv('UPSTREAM_MAX_CONNECTIONS', '100')),
+                max_keepalive=int(os.getenv('UPSTREAM_MAX_KEEPALIVE', str(BATCH_WORKERS * 2))),
+                read_timeout=UPSTREAM_ATTEMPT_TIMEOUT
+            )
+        )
+        client = ResilientClient(
+            sdk_client,
+            deadline=UPSTREAM_DEADLINE,
+            attempt_timeout=UPSTREAM_ATTEMPT_TIMEOUT,
+            max_attempts=UPSTREAM_MAX_ATTEMPTS,
+            breaker=upstream_breaker,
+            limiter=concurrency_limiter
+        )
     return client
 
+# Open the upstream connection before the first user request
+if os.getenv('UPSTREAM_WARMUP', 'true').lower() == 'true' and get_openai_client():
+    client.warm_up()
+
+# One upstream completion requested by a translation step generator (see run_steps).
+# tokens is what the rate limiter is charged; measure records the call's upstream
+# latency (per attempt) in the hedge tracker, which also sizes admission and deadlines;
+# hedge races a slow call against a duplicate
+UpstreamCall = namedtuple('UpstreamCall', ['params', 'tokens', 'measure', 'hedge'], defaults=(False, False))
+
+def run_steps(openai_client, steps, tenant=None, lane=INTERACTIVE, should_stop=None):
+    """
+    Drive a translation step generator with a blocking client: every
+    UpstreamCall it yields is paced (against the tenant's quota, in the given
+    priority lane) and sent, and its response (or error) is passed back in.
+    The ASGI app drives the same generators with the async client.
+
+    Raises:
+        Cancelled: should_stop() turned True before a call was sent
+
+    Returns:
+        The generator's return value
+    """
+    response, error = None, None
+    while True:
+        try:
+            call = steps.throw(error) if error is not None else steps.send(response)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            response, error = send_call(openai_client, call, tenant, lane, should_stop), None
+        except Cancelled:
+            steps.close()
+            raise
+        except Exception as e:
+            response, error = None, e
+
+def check_cancelled(should_stop):
+    """Raise Cancelled (counting the skipped call) once should_stop() is True"""
+    if should_stop and should_stop():
+        cancel_stats.incr('skipped_calls')
+        raise Cancelled('Request cancelled')
+
+def send_call(openai_client, call, tenant=None, lane=INTERACTIVE, should_stop=None):
+    """Pace and send one UpstreamCall, unless should_stop() turns True first"""
+    check_cancelled(should_stop)
+    rate_limiter.acquire(call.tokens, tenant, lane, should_stop)
+    # Pacing may have taken a while, or been abandoned
+    check_cancelled(should_stop)
+
+    tracker = hedger.tracker if call.measure or call.hedge else None
+
+    def request():
+        return openai_client.chat.completions.create(
+            lane=lane, should_stop=should_stop, latency_tracker=tracker, **call.params
+        )
+
+    def duplicate():
+        rate_limiter.acquire(call.tokens, tenant, lane, should_stop)
+        check_cancelled(should_stop)
+        return request()
+
+    response = hedger.run(request, duplicate) if call.hedge else request()
+    settle_tokens(call.tokens, response, tenant)
+    return response
+
+def settle_tokens(reserved, response, tenant=None):
+    """Settle a call's token reservation against the usage its response reports"""
+    used = getattr(getattr(response, 'usage', None), 'total_tokens', None)
+    if isinstance(used, (int, float)):
+        rate_limiter.settle(reserved, used, tenant)
+
+def translate_text(openai_client, text, target_language, scenario, location='', hedge=False, tenant=None):
+    """
+    Translate one (text, language) pair, consulting the translation memory first.
+    On a miss, near matches from memory are reused (above FUZZY_REUSE_THRESHOLD)
+    or passed to the model as references. Only successful completions are stored.
+    With hedge, a slow upstream call is raced against a duplicate.
+
+    Returns:
+        Tuple of (translation, route) -- route names the model route that
+        served the cell, or 'memory' / 'fuzzy' when no call was made
+    """
+    return run_steps(openai_client, translate_text_steps(text, target_language, scenario, location, hedge), tenant)
+
+def translate_text_coalesced(openai_client, text, target_language, scenario, location='', hedge=False,
+                             tenant=None):
+    """
+    translate_text for the single-string endpoints: with COALESCE_REQUESTS,
+    concurrent requests for the same (scenario, language, location, text)
+    wait for the first one's result instead of calling upstream themselves.
+
+    Returns:
+        Tuple of (translation, route)
+    """
+    if not COALESCE_REQUESTS:
+        return translate_text(openai_client, text, target_language, scenario, location, hedge, tenant)
+    outcome, shared = translation_flights.do(
+        (scenario, target_language, location, text),
+        lambda: translate_text(openai_client, text, target_language, scenario, location, hedge, tenant)
+    )
+    record_coalesced(outcome, shared)
+    return outcome
+
+def record_coalesced(outcome, shared):
+    """Count upstream calls saved by a request answered from another's flight"""
+    # Memory hits would not have called upstream anyway
+    if shared and outcome[1] not in ('memory', 'fuzzy'):
+        coalesce_stats.incr('saved_calls')
+
+def translate_text_steps(text, target_language, scenario, location='', hedge=False, fast=False):
+    """Step generator behind translate_text"""
+    system_prompt, user_prompt = get_prompt_for_scenario(scenario, text, target_language, location)
+    digest = prompt_hash(system_prompt, user_prompt)
+
+    cached = translation_memory.get(scenario, target_language, location, text, digest)
+    if cached is not None:
+        return cached, 'memory'
+
+    matches = translation_memory.near(
+        scenario, target_language, location, text, FUZZY_MATCH_COUNT, FUZZY_MATCH_THRESHOLD
+    )
+    if matches and FUZZY_REUSE_THRESHOLD and matches[0]['score'] >= FUZZY_REUSE_THRESHOLD:
+        fuzzy_stats.incr('reused')
+        translation_memory.put(scenario, target_language, location, text, digest, matches[0]['translation'])
+        return matches[0]['translation'], 'fuzzy'
+    if matches:
+        fuzzy_stats.incr('referenced')
+        # Cached under the digest of the plain prompt, so later exact lookups hit
+        user_prompt = add_reference_translations(user_prompt, matches)
+
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    route = model_router.route(scenario, estimate_tokens(text), [target_language], fast=fast)
+    max_tokens = route.max_tokens
+    # The rate limiter is charged the likely reply size and settled against usage afterwards
+    expected = min(max_tokens, model_router.expected_tokens(estimate_tokens(text), [target_language]))
+    while True:
+        response = yield UpstreamCall(
+            params={'model': route.model, 'messages': messages, 'temperature': 0.1, 'max_tokens': max_tokens},
+            tokens=estimate_messages_tokens(messages) + expected,
+            measure=True,
+            hedge=hedge
+        )
+        # Sized from an estimate: retry a truncated reply once at the ceiling
+        if getattr(response.choices[0], 'finish_reason', None) != 'length' or max_tokens >= model_router.ceiling:
+            break
+        max_tokens = expected = model_router.ceiling
+
+    translation = response.choices[0].message.content.strip()
+    translation_memory.put(scenario, target_language, location, text, digest, translation)
+    return translation, route.name
+
+def translate_pack_steps(texts, target_language, scenario, location='', fast=False):
+    """
+    Translate several texts into one language with a single packed completion.
+    Texts already in translation memory are served from it; items missing or
+    malformed in the reply are retried one by one.
+
+    Returns:
+        List of (translation, route) aligned with `texts`; an item whose
+        one-by-one retry failed holds the exception instead
+    """
+    translations = [None] * len(texts)
+    pending = {}
+    digests = {}
+    for position, text in enumerate(texts):
+        system_prompt, user_prompt = get_prompt_for_scenario(scenario, text, target_language, location)
+        digest = prompt_hash(system_prompt, user_prompt)
+        cached = translation_memory.get(scenario, target_language, location, text, digest)
+        if cached is not None:
+            translations[position] = (cached, 'memory')
+        else:
+            pending.setdefault(text, []).append(position)
+            digests[text] = digest
+
+    if not pending:
+        return translations
+
+    unique_texts = list(pending)
+    item_ids = list(range(len(unique_texts)))
+    items = [{'id': item_id, 'text': unique_texts[item_id]} for item_id in item_ids]
+    system_prompt, user_prompt = get_packed_prompt_for_scenario(scenario, items, target_language, location)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    max_tokens = packed_max_tokens(unique_texts)
+    route = model_router.route(
+        scenario, sum(estimate_tokens(text) for text in unique_texts), [target_language], kind='packed', fast=fast
+    )
+
+    try:
+        response = yield UpstreamCall(
+            params={'model': route.model, 'messages': messages, 'temperature': 0.1, 'max_tokens': max_tokens},
+            tokens=estimate_messages_tokens(messages) + max_tokens
+        )
+        packed, missing = parse_packed_reply(response.choices[0].message.content, item_ids)
+    except Exception:
+        packed, missing = {}, item_ids
+    packing_stats.incr('requests')
+    packing_stats.incr('items', len(unique_texts))
+
+    for item_id, translation in packed.items():
+        text = unique_texts[item_id]
+        translation_memory.put(scenario, target_language, location, text, digests[text], translation)
+        for position in pending[text]:
+            translations[position] = (translation, route.name)
+
+    # Split out anything the packed reply did not cover
+    for item_id in missing:
+        text = unique_texts[item_id]
+        packing_stats.incr('retried_items')
+        try:
+            outcome = yield from translate_text_steps(text, target_language, scenario, location, fast=fast)
+        except Exception as e:
+            outcome = e
+        for position in pending[text]:
+            translations[position] = outcome
+
+    return translations
+
+def translate_fan_in_steps(text, languages, scenario, location='', fast=False):
+    """
+    Translate one text into several languages with a single completion
+    returning a JSON object keyed by language. Languages already in
+    translation memory are served from it; languages whose output fails
+    validation fall back to per-language calls.
+
+    Returns:
+        Dict of language -> (translation, route), or the exception for a
+        language whose fallback call failed
+    """
+    translations = {}
+    digests = {}
+    for lang in languages:
+        system_prompt, user_prompt = get_prompt_for_scenario(scenario, text, lang, location)
+        digest = prompt_hash(system_prompt, user_prompt)
+        cached = translation_memory.get(scenario, lang, location, text, digest)
+        if cached is not None:
+            translations[lang] = (cached, 'memory')
+        else:
+            digests[lang] = digest
+
+    pending = [lang for lang in languages if lang in digests]
+    if len(pending) == 1:
+        translations[pending[0]] = yield from translate_text_steps(text, pending[0], scenario, location, fast=fast)
+        return translations
+    if not pending:
+        return translations
+
+    system_prompt, user_prompt = get_prompt_for_scenario(scenario, text, pending, location)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    max_tokens = fan_in_max_tokens(text, pending)
+    route = model_router.route(scenario, estimate_tokens(text), pending, kind='fan-in', fast=fast)
+
+    try:
+        response = yield UpstreamCall(
+            params={
+                'model': route.model,
+                'messages': messages,
+                'temperature': 0.1,
+                'max_tokens': max_tokens,
+                'response_format': {"type": "json_object"}
+            },
+            tokens=estimate_messages_tokens(messages) + max_tokens
+        )
+        fanned, failed = parse_multi_language_reply(response.choices[0].message.content, pending)
+    except Exception:
+        fanned, failed = {}, pending
+    fan_in_stats.incr('requests')
+    fan_in_stats.incr('languages', len(pending))
+
+    for lang, translation in fanned.items():
+        translation_memory.put(scenario, lang, location, text, digests[lang], translation)
+        translations[lang] = (translation, route.name)
+
+    for lang in failed:
+        fan_in_stats.incr('fallback_languages')
+        try:
+            translations[lang] = yield from translate_text_steps(text, lang, scenario, location, fast=fast)
+        except Exception as e:
+            translations[lang] = e
+
+    return translations
+
+def estimate_translation_calls(data, texts, languages):
+    """Upstream calls a batch/table request may make (before dedupe and memory hits)"""
+    mode = translation_mode(data, languages)
+    if mode == 'packed':
+        return len(languages) * math.ceil(len(texts) / PACK_MAX_ITEMS)
+    if mode == 'fan-in':
+        return len(texts)
+    return len(texts) * len(languages)
+
+def translation_mode(data, languages):
+    """Pick 'packed', 'fan-in' or 'single' from request options"""
+    if data.get('packed'):
+        return 'packed'
+    if data.get('fanIn') and len(languages) > 1:
+        return 'fan-in'
+    return 'single'
+
+def collapse_templates(texts, cells):
+    """
+    Group cells whose source differs only in numbers/placeholders (and whose
+    values share a plural category in the target language).
+
+    Returns:
+        Tuple of (representative_cells, followers) where followers maps a
+        representative (row_index, language) to the other rows of its group
+    """
+    representatives = {}
+    followers = {}
+    run_cells = []
+    for index, lang in cells:
+        key = (lang,) + template_key(texts[index], lang)
+        representative = representatives.get(key)
+        if representative is None:
+            representatives[key] = index
+            run_cells.append((index, lang))
+        else:
+            followers.setdefault((representative, lang), []).append(index)
+    return run_cells, followers
+
+def prepare_cells(texts, languages, cells=None, dedupe=True):
+    """
+    Cells to translate, collapsed to one per template when dedupe is on.
+
+    Returns:
+        Tuple of (cells, followers) -- see collapse_templates
+    """
+    if cells is None:
+        cells = [(index, lang) for index in range(len(texts)) for lang in languages]
+    followers = {}
+    if dedupe and cells:
+        total_cells = len(cells)
+        cells, followers = collapse_templates(texts, cells)
+        dedupe_stats.incr('templates', len(cells))
+        dedupe_stats.incr('collapsed_cells', total_cells - len(cells))
+    return cells, followers
+
+def plan_translation_tasks(texts, cells, mode='single', token_budget=PACK_TOKEN_BUDGET):
+    """
+    Group cells into upstream tasks for the given mode.
+
+    Returns:
+        List of (rows, languages, kind) -- kind is 'packed' (several rows, one
+        language), 'fan-in' (one row, several languages) or 'single'
+    """
+    if mode == 'packed':
+        rows_by_lang = {}
+        for index, lang in cells:
+            rows_by_lang.setdefault(lang, []).append(index)
+        return [
+            ([rows[position] for position in pack], [lang], 'packed')
+            for lang, rows in rows_by_lang.items()
+            for pack in plan_packs([texts[index] for index in rows], token_budget, PACK_MAX_ITEMS)
+        ]
+    if mode == 'fan-in':
+        langs_by_row = {}
+        for index, lang in cells:
+            langs_by_row.setdefault(index, []).append(lang)
+        return [([index], row_langs, 'fan-in') for index, row_langs in langs_by_row.items()]
+    return [([index], [lang], 'single') for index, lang in cells]
+
+def translation_task_steps(texts, rows, langs, kind, scenario, location='', fast=False):
+    """Step generator for one task from plan_translation_tasks"""
+    if kind == 'packed':
+        return translate_pack_steps([texts[index] for index in rows], langs[0], scenario, location, fast)
+    if kind == 'fan-in':
+        return translate_fan_in_steps(texts[rows[0]], langs, scenario, location, fast)
+    return translate_text_steps(texts[rows[0]], langs[0], scenario, location, fast=fast)
+
+def expand_task_result(texts, rows, langs, kind, result, error, followers):
+    """
+    Cells of one finished task, each followed by the rows sharing its template
+    (their values substituted into the translation).
+
+    Returns:
+        Tuple of (cells, retries) -- cells are (row_index, language, translation,
+        route, error); retries are (row_index, language) followers whose values
+        could not be located in the translation and need their own call
+    """
+    cells = []
+    retries = []
+    for position, index in enumerate(rows):
+        for lang in langs:
+            if error is not None:
+                outcome = None
+            elif kind == 'packed':
+                outcome = result[position]
+            elif kind == 'fan-in':
+                outcome = result[lang]
+            else:
+                outcome = result
+            # Packed and fan-in tasks report failed fallbacks per cell
+            cell_error = str(outcome) if isinstance(outcome, Exception) else error
+            translation, route = outcome if cell_error is None else (None, None)
+            model_router.record(route or 'error')
+            cells.append((index, lang, translation, route, cell_error))
+
+            # Rows sharing this cell's template
+            _, values = split_template(texts[index])
+            for follower in followers.pop((index, lang), []):
+                if cell_error is not None:
+                    model_router.record('error')
+                    cells.append((follower, lang, None, None, cell_error))
+                    continue
+                substituted = substitute_values(translation, values, split_template(texts[follower])[1])
+                if substituted is None:
+                    dedupe_stats.incr('fallback_cells')
+                    retries.append((follower, lang))
+                else:
+                    model_router.record('template')
+                    cells.append((follower, lang, substituted, 'template', None))
+    return cells, retries
+
+def request_budget(data):
+    """
+    Seconds the client gives the request (`deadline` in its JSON), or None.
+
+    Raises:
+        ValueError: deadline is not a positive number of seconds
+    """
+    deadline = data.get('deadline')
+    if deadline is None:
+        return None
+    try:
+        budget = float(deadline) if not isinstance(deadline, bool) else math.nan
+    except (TypeError, ValueError):
+        budget = math.nan
+    if not 0 < budget < math.inf:
+        raise ValueError('deadline must be a positive number of seconds')
+    return budget
+
+def deadline_check(expires, should_stop=None):
+    """should_stop callable that also turns True DEADLINE_MARGIN seconds before `expires` (monotonic)"""
+    if expires is None:
+        return should_stop
+    return lambda: time.monotonic() >= expires - DEADLINE_MARGIN or bool(should_stop and should_stop())
+
+def estimate_run_seconds(calls, workers, latency):
+    """Rough wall-clock seconds for `calls` bulk upstream calls of `latency` seconds on `workers` threads"""
+    return calls / min(upstream_call_rate(BULK, latency), workers / latency)
+
+def plan_batch(data, texts, languages, workers, budget=None):
+    """
+    Mode, pack token budget and model for a batch. With a deadline (`budget`
+    seconds) the batch is degraded until its estimated run time fits: cells
+    are packed, packs grow, then calls go to the fast model. The estimate
+    assumes calls take the recent median single-string latency.
+
+    Returns:
+        Tuple of (mode, token_budget, fast, degraded) -- degraded lists the steps taken
+    """
+    mode = translation_mode(data, languages)
+    token_budget = int(data.get('packTokenBudget', PACK_TOKEN_BUDGET))
+    degraded = []
+    if budget is None:
+        return mode, token_budget, False, degraded
+    deadline_stats.incr('requests')
+
+    cells = [(index, lang) for index in range(len(texts)) for lang in languages]
+    if data.get('dedupe', True):
+        cells, _ = collapse_templates(texts, cells)
+    latency = hedger.tracker.percentile(50) or ADMISSION_DEFAULT_LATENCY
+
+    def calls(mode, token_budget):
+        return len(plan_translation_tasks(texts, cells, mode, token_budget))
+
+    def fits(mode, token_budget):
+        return estimate_run_seconds(calls(mode, token_budget), workers, latency) <= budget - DEADLINE_MARGIN
+
+    if mode == 'single' and not fits(mode, token_budget):
+        mode = 'packed'
+        degraded.append('packed')
+    if mode == 'packed' and not fits(mode, token_budget):
+        larger = int(token_budget * DEADLINE_PACK_FACTOR)
+        # Packs may already be at PACK_MAX_ITEMS
+        if calls(mode, larger) < calls(mode, token_budget):
+            token_budget = larger
+            degraded.append('larger-packs')
+    fast = bool(model_router.fast_model) and not fits(mode, token_budget)
+    if fast:
+        degraded.append('fast-model')
+    if degraded:
+        deadline_stats.incr('degraded')
+    return mode, token_budget, fast, degraded
+
+def batch_response(texts, languages, cells, degraded=()):
+    """
+    Batch response body from cells {(row_index, language): (value, route, error)}.
+    Each row carries `status` per language: 'complete', 'error', or 'pending'
+    when the deadline passed first; pending cells are left out of
+    translations and routes, as in partial job results.
+    """
+    results = []
+    for index, text in enumerate(texts):
+        done = [lang for lang in languages if (index, lang) in cells]
+        results.append({
+            'source': text,
+            'translations': {lang: cells[(index, lang)][0] for lang in done},
+            'routes': {lang: cells[(index, lang)][1] for lang in done},
+            'status': {
+                lang: 'pending' if (index, lang) not in cells else 'error' if cells[(index, lang)][2] else 'complete'
+                for lang in languages
+            }
+        })
+    complete = len(cells) == len(texts) * len(languages)
+    if not complete:
+        deadline_stats.incr('partial')
+    return {'results': results, 'complete': complete, 'degraded': list(degraded)}
+
+def iter_translations(openai_client, texts, languages, scenario, location='', mode='single',
+                      workers=BATCH_WORKERS, token_budget=PACK_TOKEN_BUDGET, should_stop=None, cells=None,
+                      dedupe=True, tenant=None, fast=False):
+    """
+    Translate texts x languages on a worker pool and yield cells as they complete.
+    Upstream calls run in the bulk lane, behind single-string requests.
+    Work not yet started is cancelled when the generator is closed early or
+    when should_stop() returns True; from then on no new upstream call is made,
+    while calls already in flight finish into the translation memory.
+
+    With dedupe, exact duplicates and strings that differ only in numbers or
+    placeholders are translated once per language; the other rows get the
+    translation with their own values substituted back, or are translated on
+    their own when the values cannot be located in it.
+
+    Args:
+        mode: 'single' (one call per cell), 'packed' or 'fan-in'
+        should_stop: Optional callable polled while waiting for results and before every upstream call
+        cells: Optional list of (row_index, language) to translate instead of the full grid
+        dedupe: Collapse duplicate and template-equivalent sources first
+        tenant: Tenant whose quota the upstream calls are charged to
+        fast: Route every call to the router's fast model
+
+    Yields:
+        (row_index, language, translation, route, error) -- error is None on
+        success; route is None on error and 'template' for substituted rows
+    """
+    cells, followers = prepare_cells(texts, languages, cells, dedupe)
+    if not cells:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(cells))))
+    futures = {}
+
+    def submit(rows, langs, kind):
+        steps = translation_task_steps(texts, rows, langs, kind, scenario, location, fast)
+        futures[pool.submit(run_steps, openai_client, steps, tenant, BULK, should_stop)] = (rows, langs, kind)
+
+    try:
+        for task in plan_translation_tasks(texts, cells, mode, token_budget):
+            submit(*task)
+
+        while futures:
+            if should_stop and should_stop():
+                return
+            done, _ = wait(futures, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                rows, langs, kind = futures.pop(future)
+                try:
+                    result = future.result()
+                    error = None
+                except Cancelled:
+                    continue
+                except Exception as e:
+                    result = None
+                    error = str(e)
+
+                finished, retries = expand_task_result(texts, rows, langs, kind, result, error, followers)
+                yield from finished
+                for index, lang in retries:
+                    submit([index], [lang], 'single')
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def verify_chunk(openai_client, entries, lang, scenario, tenant=None, should_stop=None):
+    """
+    QA one chunk of {source, translation} entries for one language.
+
+    Returns:
+        List of (translation, notes) aligned with entries, or None if the reply
+        was truncated or is not a JSON array covering every entry
+    """
+    system_prompt, user_prompt = get_qa_prompt(entries, lang, scenario)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    max_tokens = qa_max_tokens(entries)
+    route = model_router.route(
+        scenario, sum(estimate_tokens(entry['source']) for entry in entries), [lang], kind='qa'
+    )
+    check_cancelled(should_stop)
+    reserved = estimate_messages_tokens(messages) + max_tokens
+    rate_limiter.acquire(reserved, tenant, BULK, should_stop)
+    check_cancelled(should_stop)
+
+    response = openai_client.chat.completions.create(
+        lane=BULK,
+        should_stop=should_stop,
+        latency_tracker=qa_latency,
+        model=route.model,
+        messages=messages,
+        temperature=0.1,
+        max_tokens=max_tokens
+    )
+    settle_tokens(reserved, response, tenant)
+
+    choice = response.choices[0]
+    corrected_list = load_json_reply(choice.message.content)
+    if getattr(choice, 'finish_reason', None) == 'length':
+        return None
+    if not isinstance(corrected_list, list) or len(corrected_list) < len(entries):
+        return None
+
+    reviewed = []
+    for entry, item in zip(entries, corrected_list):
+        if not isinstance(item, dict):
+            return None
+        translation = item.get('translation', entry['translation'])
+        if not isinstance(translation, str):
+            translation = entry['translation']
+        reviewed.append((translation, item.get('notes', []) or []))
+    return reviewed
+
+def verify_entries(openai_client, entries, lang, scenario, stats, tenant=None, should_stop=None):
+    """
+    QA entries, splitting the chunk in half and retrying each half whenever the
+    reply is truncated or unparseable. A single entry that still fails is left as-is.
+
+    Returns:
+        List of (translation, notes) aligned with entries
+    """
+    reviewed = verify_chunk(openai_client, entries, lang, scenario, tenant, should_stop)
+    if reviewed is not None:
+        return reviewed
+
+    if len(entries) == 1:
+        stats.incr('unparsed_entries')
+        return [(entries[0]['translation'], [])]
+
+    stats.incr('resplit_chunks')
+    middle = len(entries) // 2
+    return (
+        verify_entries(openai_client, entries[:middle], lang, scenario, stats, tenant, should_stop) +
+        verify_entries(openai_client, entries[middle:], lang, scenario, stats, tenant, should_stop)
+    )
+
+def plan_verify(table_data, languages, scenario, chunk_size, precheck, sample_rate, workers=QA_WORKERS,
+                budget=None):
+    """
+    QA settings for a verification. With a deadline (`budget` seconds) the LLM
+    pass is cut down until its estimated run time fits: only cells that fail a
+    local rule are reviewed (no random sample), then the LLM pass is skipped
+    and only the rules run.
+
+    Returns:
+        Tuple of (precheck, sample_rate, review, degraded) -- degraded lists the steps taken
+    """
+    degraded = []
+    if budget is None:
+        return precheck, sample_rate, True, degraded
+    deadline_stats.incr('requests')
+
+    latency = qa_latency.percentile(50) or ADMISSION_DEFAULT_LATENCY
+    rule_hits = check_table(table_data, languages, scenario)
+
+    def fits(precheck, sample_rate):
+        if precheck:
+            selected = select_cells_for_review(rule_hits, len(table_data), languages, sample_rate)
+        else:
+            selected = {(index, lang) for index in range(len(table_data)) for lang in languages}
+        chunks = sum(
+            math.ceil(sum(1 for _, cell_lang in selected if cell_lang == lang) / max(1, chunk_size))
+            for lang in languages
+        )
+        return estimate_run_seconds(chunks, workers, latency) <= budget - DEADLINE_MARGIN
+
+    if (not precheck or sample_rate) and not fits(precheck, sample_rate):
+        precheck, sample_rate = True, 0.0
+        degraded.append('rule-hits-only')
+    review = fits(precheck, sample_rate)
+    if not review:
+        degraded.append('skip-qa')
+    if degraded:
+        deadline_stats.incr('degraded')
+    return precheck, sample_rate, review, degraded
+
+def verify_response(corrected, qa_issues, stats, languages, selected, reviewed, degraded=()):
+    """
+    Verify response body. Each row carries `status` per language: 'reviewed'
+    by the LLM, 'checked' by the local rules only, or 'pending' when the
+    deadline passed before its chunk was reviewed.
+    """
+    for index, row in enumerate(corrected):
+        row['status'] = {
+            lang: 'reviewed' if (index, lang) in reviewed else 'pending' if (index, lang) in selected else 'checked'
+            for lang in languages
+        }
+    complete = selected <= reviewed
+    if not complete:
+        deadline_stats.incr('partial')
+    return {
+        'results': corrected,
+        'issues': qa_issues,
+        'stats': {
+            'chunks': stats['chunks'],
+            'resplitChunks': stats['resplit_chunks'],
+            'unparsedEntries': stats['unparsed_entries'],
+            'flaggedCells': stats['flagged_cells'],
+            'skippedCells': stats['skipped_cells']
+        },
+        'complete': complete,
+        'degraded': list(degraded)
+    }
+
+def select_qa_cells(table_data, languages, scenario, precheck=True, sample_rate=0.0):
+    """
+    Run the local QA rules and pick the cells that need the LLM pass.
+
+    Returns:
+        Tuple of (rule_hits, selected_cells); without precheck every cell is selected
+    """
+    if not precheck:
+        return {}, {(index, lang) for index in range(len(table_data)) for lang in languages}
+    rule_hits = check_table(table_data, languages, scenario)
+    return rule_hits, select_cells_for_review(rule_hits, len(table_data), languages, sample_rate)
+
+def verify_table(openai_client, table_data, languages, scenario, chunk_size=50, on_chunk=None, should_stop=None,
+                 skip_cells=None, workers=QA_WORKERS, precheck=True, sample_rate=0.0, tenant=None, review=True):
+    """
+    QA every language of the table in chunks. With precheck, local rules run
+    first and only cells that fail a rule (plus a `sample_rate` random sample)
+    are sent to the LLM; rule hits are reported as issues. Chunks are sized
+    from estimated prompt and reply tokens (at most chunk_size entries) and
+    re-split on truncated or unparseable replies. Chunks from all languages
+    run concurrently under the shared rate limiter; corrections and issues
+    are merged in (language, row) order, so the output matches a serial run.
+
+    Args:
+        on_chunk: Optional callback(lang, rows, reviewed, issues) as each chunk
+                  completes; issues is aligned with reviewed (None where nothing changed)
+        should_stop: Optional callable; verification stops early when it returns True, and
+                     no further QA call is made (chunks not completed keep their values)
+        skip_cells: Optional set of (row_index, language) already verified; chunks
+                    made up only of such cells are not sent again
+        workers: Number of chunks in flight at once
+        tenant: Tenant whose quota the QA calls are charged to
+        review: Send the selected cells to the LLM; when False only the local
+                rule hits are reported (as issues, values unchanged)
+
+    Returns:
+        Tuple of (corrected_rows, qa_issues, stats)
+    """
+    # Prepare output structure
+    corrected = [
+        {
+            'source': row.get('source', ''),
+            'translations': dict(row.get('translations', {}))
+        }
+        for row in table_data
+    ]
+
+    rule_hits, selected = select_qa_cells(table_data, languages, scenario, precheck, sample_rate)
+    if not review:
+        selected = set()
+
+    # Chunk the selected cells of every language to fit token limits, in serial order
+    chunks = []
+    for lang in languages:
+        rows = [index for index in range(len(table_data)) if (index, lang) in selected]
+        entries = [
+            {
+                'source': table_data[index].get('source', ''),
+                'translation': table_data[index].get('translations', {}).get(lang, '')
+            }
+            for index in rows
+        ]
+        for start, end in plan_qa_chunks(entries, chunk_size, QA_INPUT_TOKEN_BUDGET, QA_OUTPUT_TOKEN_BUDGET):
+            chunk_rows = rows[start:end]
+            if skip_cells and all((index, lang) in skip_cells for index in chunk_rows):
+                continue
+            chunks.append((lang, chunk_rows, entries[start:end]))
+
+    run_stats = Counters('chunks', 'resplit_chunks', 'unparsed_entries', 'flagged_cells', 'skipped_cells')
+    run_stats.incr('flagged_cells', len(rule_hits))
+    run_stats.incr('skipped_cells', len(table_data) * len(languages) - len(selected))
+
+    def issue_for(index, lang, original_value, new_value, notes):
+        hits = rule_hits.get((index, lang), [])
+        if new_value == original_value and not notes and not hits:
+            return None
+        issue = {
+            'source': table_data[index].get('source', ''),
+            'language': lang,
+            'original': original_value,
+            'corrected': new_value,
+            'notes': [hit['message'] for hit in hits] + list(notes)
+        }
+        if hits:
+            issue['rules'] = [hit['rule'] for hit in hits]
+        return issue
+
+    def review_chunk(lang, rows, entries):
+        run_stats.incr('chunks')
+        reviewed = verify_entries(openai_client, entries, lang, scenario, run_stats, tenant, should_stop)
+        chunk_issues = [
+            issue_for(rows[offset], lang, entries[offset]['translation'], new_value, notes)
+            for offset, (new_value, notes) in enumerate(reviewed)
+        ]
+        return reviewed, chunk_issues
+
+    completed = {}
+    if chunks:
+        pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks))))
+        try:
+            futures = {pool.submit(review_chunk, *chunk): position for position, chunk in enumerate(chunks)}
+            pending = set(futures)
+            while pending:
+                if should_stop and should_stop():
+                    break
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    position = futures[future]
+                    lang, rows, _ = chunks[position]
+                    # An upstream failure aborts the run, as in the serial version
+                    try:
+                        completed[position] = future.result()
+                    except Cancelled:
+                        continue
+                    if on_chunk:
+                        on_chunk(lang, rows, *completed[position])
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # Apply corrections back to the main table in deterministic order
+    qa_issues = []
+    for position, (lang, rows, entries) in enumerate(chunks):
+        if position not in completed:
+            # Stopped before review: still report what the local rules found
+            for index, entry in zip(rows, entries):
+                if (index, lang) in rule_hits:
+                    qa_issues.append(issue_for(index, lang, entry['translation'], entry['translation'], []))
+            continue
+        reviewed, chunk_issues = completed[position]
+        for index, (new_value, _), issue in zip(rows, reviewed, chunk_issues):
+            corrected[index]['translations'][lang] = new_value
+            if issue:
+                qa_issues.append(issue)
+    if not review:
+        # Local rules only: report their hits without corrections
+        for lang in languages:
+            for index in range(len(table_data)):
+                if (index, lang) in rule_hits:
+                    value = table_data[index].get('translations', {}).get(lang, '')
+                    qa_issues.append(issue_for(index, lang, value, value, []))
+
+    stats = run_stats.snapshot()
+    for name, value in stats.items():
+        qa_stats.incr(name, value)
+    return corrected, qa_issues, stats
+
+def overloaded_response(error):
+    """429 with Retry-After for a request shed by admission control"""
+    return jsonify({'error': str(error), 'retryAfter': error.retry_after}), 429, {
+        'Retry-After': str(error.retry_after)
+    }
+
+def disconnect_check():
+    """
+    should_stop callable for the current request: True once its client has
+    disconnected. None when the server does not expose the connection.
+    """
+    sock = request.environ.get('werkzeug.socket') or request.environ.get('gunicorn.socket')
+    if sock is None:
+        return None
+    return lambda: peer_closed(sock)
+
+def request_tenant():
+    """Tenant of the current request (X-Tenant header), for quotas and fair queuing"""
+    return request.headers.get('X-Tenant') or 'default'
+
 @app.route('/api/health', methods=['GET'])
 def health():
     has_api_key = bool(os.getenv('OPENAI_API_KEY') and os.getenv('OPENAI_API_KEY') != 'your_openai_api_key_here')
@@ -53,6 +1108,9 @@ def translate():
     """
     Translate a single text string to a target language.
     Uses scenario-specific prompts for optimal results.
+    With `hedge: true` (default HEDGE_REQUESTS), a slow upstream call is
+    raced against a duplicate. Identical requests arriving while one is in
+    flight share its result.
     """
     try:
         openai_client = get_openai_client()
@@ -68,29 +1126,24 @@ def translate():
         if not text or not target_language:
             return jsonify({'error': 'Missing text or targetLanguage'}), 400
         
-        # Get scenario-specific prompt
-        system_prompt, user_prompt = get_prompt_for_scenario(scenario, text, target_language, location)
-        
-        # Call OpenAI
-        response = openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.1,
-            max_tokens=500
-        )
-        
-        translation = response.choices[0].message.content.strip()
+        # Scenario-specific prompt, served from translation memory when possible
+        with interactive_queue.admit():
+            translation, route = translate_text_coalesced(
+                openai_client, text, target_language, scenario, location, hedge=data.get('hedge', HEDGE_REQUESTS),
+                tenant=request_tenant()
+            )
+        model_router.record(route)
         
         return jsonify({
             'translation': translation,
             'source': text,
             'targetLanguage': target_language,
-            'scenario': scenario
+            'scenario': scenario,
+            'route': route
         })
         
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -98,7 +1151,20 @@ def translate():
 def translate_batch():
     """
     Translate multiple texts to multiple languages.
-    Returns translations progressively for each text-language pair.
+    Cells run on a worker pool paced by the shared rate limiter;
+    optional `concurrency` caps the pool size for this request.
+    With `packed: true`, strings are grouped per language into packed
+    completions sized by `packTokenBudget`. With `fanIn: true` (ignored when
+    packed), each string gets one completion covering all languages.
+    Duplicate and number/placeholder-only variants are translated once
+    unless `dedupe: false`. Each result row also carries `routes`, the model
+    route that served each language, and `status` per language.
+
+    With `deadline` (seconds), the batch is planned to fit it (packing, larger
+    packs, the fast model; listed in `degraded`) and the cells done shortly
+    before it are returned, with `complete: false` if any are still pending.
+    Calls still in flight then finish into the translation memory, so a
+    retry picks them up.
     """
     try:
         openai_client = get_openai_client()
@@ -114,43 +1180,34 @@ def translate_batch():
         if not texts or not languages:
             return jsonify({'error': 'Missing texts or languages'}), 400
         
-        results = []
+        workers = max(1, min(int(data.get('concurrency', BATCH_WORKERS)), BATCH_WORKERS))
+        try:
+            budget = request_budget(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        expires = time.monotonic() + budget if budget else None
+        mode, token_budget, fast, degraded = plan_batch(data, texts, languages, workers, budget)
+        disconnected = disconnect_check()
+        cells = {}
         
-        for text in texts:
-            text_result = {
-                'source': text,
-                'translations': {}
-            }
-            
-            for lang in languages:
-                try:
-                    # Get scenario-specific prompt
-                    system_prompt, user_prompt = get_prompt_for_scenario(scenario, text, lang, location)
-                    
-                    # Call OpenAI with rate limiting
-                    response = openai_client.chat.completions.create(
-                        model="gpt-4o",
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        temperature=0.1,
-                        max_tokens=500
-                    )
-                    
-                    translation = response.choices[0].message.content.strip()
-                    text_result['translations'][lang] = translation
-                    
-                    # Small delay to avoid rate limiting
-                    time.sleep(0.1)
-                    
-                except Exception as e:
-                    text_result['translations'][lang] = f'[Error: {str(e)}]'
-            
-            results.append(text_result)
+        # Fan cells out over the worker pool; the shared rate limiter paces upstream calls
+        with bulk_queue.admit(estimate_translation_calls(data, texts, languages)):
+            for index, lang, translation, route, error in iter_translations(
+                openai_client, texts, languages, scenario, location,
+                mode=mode, workers=workers, token_budget=token_budget,
+                should_stop=deadline_check(expires, disconnected), dedupe=data.get('dedupe', True),
+                tenant=request_tenant(), fast=fast
+            ):
+                cells[(index, lang)] = (translation if error is None else f'[Error: {error}]', route, error)
+        
+        if disconnected and disconnected():
+            # The client is gone (499, as nginx logs it)
+            return jsonify({'error': 'Client disconnected'}), 499
         
-        return jsonify({'results': results})
+        return jsonify(batch_response(texts, languages, cells, degraded))
         
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -158,18 +1215,33 @@ def translate_batch():
 def verify_translations():
     """
     Verify and correct translations for the provided table.
+    Chunks of all languages are checked concurrently; output order matches
+    a serial run.
 
     Request JSON:
     {
       tableData: [{ source, translations: { langName: translation } }],
       languages: ["Spanish", ...],
       scenario: "general",
-      chunkSize: 50
+      chunkSize: 50,
+      precheck: true,
+      sampleRate: 0.0,
+      deadline: 30
     }
 
+    chunkSize caps entries per QA call; actual chunks are sized from a local
+    token estimate of prompt and reply. With precheck (default), local rules
+    decide which cells go to the LLM; sampleRate adds a random share of the
+    cells that passed. With deadline (seconds, optional) the LLM pass is cut
+    down or skipped to fit it, and chunks not reviewed by then keep their values.
+
     Response JSON:
     {
-      results: [{ source, translations: { langName: corrected } }]
+      results: [{ source, translations: { langName: corrected }, status: { langName: status } }],
+      issues: [{ source, language, original, corrected, notes }],
+      stats: { chunks, resplitChunks, unparsedEntries, flaggedCells, skippedCells },
+      complete: true,
+      degraded: []
     }
     """
     try:
@@ -182,76 +1254,32 @@ def verify_translations():
         languages = data.get('languages', [])
         scenario = data.get('scenario', 'general')
         chunk_size = int(data.get('chunkSize', 50))
+        try:
+            budget = request_budget(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        expires = time.monotonic() + budget if budget else None
+        precheck, sample_rate, review, degraded = plan_verify(
+            table_data, languages, scenario, chunk_size, data.get('precheck', True),
+            float(data.get('sampleRate', 0.0)), budget=budget
+        )
+        _, selected = select_qa_cells(table_data, languages, scenario, precheck, sample_rate) if review else ({}, set())
+        reviewed = set()
 
-        # Prepare output structure
-        corrected = [
-            {
-                'source': row.get('source', ''),
-                'translations': dict(row.get('translations', {}))
-            }
-            for row in table_data
-        ]
+        def record_chunk(lang, rows, *_):
+            reviewed.update((index, lang) for index in rows)
 
-        qa_issues = []
+        with bulk_queue.admit(len(languages) * math.ceil(len(table_data) / max(1, chunk_size))):
+            corrected, qa_issues, stats = verify_table(
+                openai_client, table_data, languages, scenario, chunk_size, on_chunk=record_chunk,
+                should_stop=deadline_check(expires, disconnect_check()), precheck=precheck,
+                sample_rate=sample_rate, tenant=request_tenant(), review=review
+            )
 
-        # For each language, QA in chunks
-        for lang in languages:
-            # Build list of entries for this language
-            entries = [
-                {
-                    'source': row.get('source', ''),
-                    'translation': row.get('translations', {}).get(lang, '')
-                }
-                for row in table_data
-            ]
-
-            # Chunk processing to avoid token limits
-            for start in range(0, len(entries), chunk_size):
-                chunk = entries[start:start+chunk_size]
-                system_prompt, user_prompt = get_qa_prompt(chunk, lang, scenario)
-
-                response = openai_client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.1,
-                    max_tokens=1500
-                )
-
-                content = response.choices[0].message.content
-                # Parse JSON safely
-                try:
-                    import json
-                    corrected_list = json.loads(content)
-                    # Apply corrections back to the main table
-                    for idx, item in enumerate(corrected_list):
-                        global_index = start + idx
-                        if 0 <= global_index < len(corrected):
-                            original_value = corrected[global_index]['translations'].get(lang, '')
-                            new_value = item.get('translation', original_value)
-                            corrected[global_index]['translations'][lang] = new_value
-
-                            notes = item.get('notes', []) or []
-                            if new_value != original_value or notes:
-                                qa_issues.append({
-                                    'source': corrected[global_index].get('source', ''),
-                                    'language': lang,
-                                    'original': original_value,
-                                    'corrected': new_value,
-                                    'notes': notes
-                                })
-                except Exception:
-                    # Leave as-is if parsing fails, annotate error in translation
-                    for idx in range(start, min(start+chunk_size, len(entries))):
-                        corrected[idx]['translations'][lang] = corrected[idx]['translations'].get(lang, '')
-
-                # Small delay between chunks
-                time.sleep(0.1)
-
-        return jsonify({'results': corrected, 'issues': qa_issues})
+        return jsonify(verify_response(corrected, qa_issues, stats, languages, selected, reviewed, degraded))
 
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -260,6 +1288,7 @@ def translate_stream():
     """
     Stream translations one at a time for progressive UI updates.
     Client should call this for each text-language pair.
+    Accepts `hedge` like /api/translate.
     """
     try:
         openai_client = get_openai_client()
@@ -276,33 +1305,346 @@ def translate_stream():
         if not text or not target_language:
             return jsonify({'error': 'Missing text or targetLanguage'}), 400
         
-        # Get scenario-specific prompt
-        system_prompt, user_prompt = get_prompt_for_scenario(scenario, text, target_language, location)
-        
-        # Call OpenAI
-        response = openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.1,
-            max_tokens=500
-        )
-        
-        translation = response.choices[0].message.content.strip()
+        # Scenario-specific prompt, served from translation memory when possible
+        with interactive_queue.admit():
+            translation, route = translate_text_coalesced(
+                openai_client, text, target_language, scenario, location, hedge=data.get('hedge', HEDGE_REQUESTS),
+                tenant=request_tenant()
+            )
+        model_router.record(route)
         
         return jsonify({
             'translation': translation,
             'source': text,
             'targetLanguage': target_language,
             'rowIndex': row_index,
-            'scenario': scenario
+            'scenario': scenario,
+            'route': route
         })
         
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return jsonify({'error': str(e), 'rowIndex': data.get('rowIndex', 0)}), 500
 
+def sse_event(event, payload):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@app.route('/api/translate/stream/table', methods=['POST'])
+def translate_stream_table():
+    """
+    Translate a whole table in one request and stream each cell as soon as it
+    completes (server-sent events). Cells are produced concurrently.
+
+    Request JSON:
+    {
+      texts: ["Save", ...],
+      languages: ["Spanish", ...],
+      scenario: "general",
+      location: "",
+      packed: false,
+      fanIn: false,
+      dedupe: true,
+      concurrency: 8
+    }
+
+    Events:
+      translation: { rowIndex, language, translation, route }
+      error:       { rowIndex, language, error }
+      done:        { completed, failed, total }
+    """
+    openai_client = get_openai_client()
+    if not openai_client:
+        return jsonify({'error': 'OpenAI API key not configured'}), 500
+    
+    data = request.json or {}
+    texts = data.get('texts', [])
+    languages = data.get('languages', [])
+    scenario = data.get('scenario', 'general')
+    location = data.get('location', '')
+    workers = max(1, min(int(data.get('concurrency', BATCH_WORKERS)), BATCH_WORKERS))
+    tenant = request_tenant()
+    should_stop = disconnect_check()
+    
+    if not texts or not languages:
+        return jsonify({'error': 'Missing texts or languages'}), 400
+    
+    try:
+        ticket = bulk_queue.admit(estimate_translation_calls(data, texts, languages))
+    except Overloaded as e:
+        return overloaded_response(e)
+    
+    def generate():
+        total = len(texts) * len(languages)
+        completed = 0
+        failed = 0
+        cells = iter_translations(
+            openai_client, texts, languages, scenario, location,
+            mode=translation_mode(data, languages), workers=workers, should_stop=should_stop,
+            dedupe=data.get('dedupe', True), tenant=tenant
+        )
+        try:
+            for index, lang, translation, route, error in cells:
+                if error is None:
+                    completed += 1
+                    yield sse_event('translation', {
+                        'rowIndex': index, 'language': lang, 'translation': translation, 'route': route
+                    })
+                else:
+                    failed += 1
+                    yield sse_event('error', {'rowIndex': index, 'language': lang, 'error': error})
+            
+            yield sse_event('done', {'completed': completed, 'failed': failed, 'total': total})
+        finally:
+            # Client went away or stream finished: drop anything not yet started
+            cells.close()
+            ticket.release()
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # The generator never runs if the client leaves before the first chunk
+    response.call_on_close(ticket.release)
+    return response
+
+# ==================== JOB ENDPOINTS ====================
+
+def run_translation_job(job):
+    """Job runner: translate texts x languages, recording every cell"""
+    openai_client = get_openai_client()
+    if not openai_client:
+        raise RuntimeError('OpenAI API key not configured')
+
+    params = job.params
+    texts = params.get('texts', [])
+    languages = params.get('languages', [])
+    job.set_total(len(texts) * len(languages))
+
+    # Resumed jobs only re-run cells that are missing or errored
+    completed = job.completed_cells()
+    pending = [
+        (index, lang) for index in range(len(texts)) for lang in languages if (index, lang) not in completed
+    ]
+
+    cells = iter_translations(
+        openai_client, texts, languages, params.get('scenario', 'general'), params.get('location', ''),
+        mode=translation_mode(params, languages),
+        token_budget=int(params.get('packTokenBudget', PACK_TOKEN_BUDGET)),
+        should_stop=lambda: job.cancelled,
+        cells=pending,
+        dedupe=params.get('dedupe', True),
+        tenant=params.get('tenant')
+    )
+    try:
+        for index, lang, translation, route, error in cells:
+            if error is None:
+                job.record_cell(index, lang, translation, extra={'route': route})
+            else:
+                job.record_cell(index, lang, f'[Error: {error}]', status='error', error=error)
+    finally:
+        cells.close()
+
+def run_verify_job(job):
+    """Job runner: QA the table, recording every reviewed cell"""
+    openai_client = get_openai_client()
+    if not openai_client:
+        raise RuntimeError('OpenAI API key not configured')
+
+    params = job.params
+    table_data = params.get('tableData', [])
+    languages = params.get('languages', [])
+    scenario = params.get('scenario', 'general')
+    precheck = params.get('precheck', True)
+    sample_rate = float(params.get('sampleRate', 0.0))
+
+    # Only cells selected by the local rules are reviewed (and recorded)
+    _, selected = select_qa_cells(table_data, languages, scenario, precheck, sample_rate)
+    job.set_total(len(selected))
+
+    def record_chunk(lang, rows, reviewed, issues):
+        for index, (value, notes), issue in zip(rows, reviewed, issues):
+            job.record_cell(index, lang, value, extra=issue)
+
+    verify_table(
+        openai_client, table_data, languages, scenario,
+        int(params.get('chunkSize', 50)), on_chunk=record_chunk, should_stop=lambda: job.cancelled,
+        skip_cells=job.completed_cells(), precheck=precheck, sample_rate=sample_rate,
+        tenant=params.get('tenant')
+    )
+
+job_manager.register('translate', run_translation_job)
+job_manager.register('verify', run_verify_job)
+
+# Jobs left running by a crashed/restarted process become 'interrupted';
+# with JOB_AUTO_RESUME they are picked up again from their last checkpoint
+job_manager.recover(auto_resume=os.getenv('JOB_AUTO_RESUME', 'false').lower() == 'true')
+
+def build_job_results(job):
+    """Assemble results of a (possibly partial) job in the synchronous endpoint shape"""
+    params = job['params']
+    languages = params.get('languages', [])
+    cells = {(cell['row_index'], cell['language']): cell for cell in job_store.get_cells(job['id'])}
+
+    if job['kind'] == 'translate':
+        results = [
+            {
+                'source': text,
+                'translations': {
+                    lang: cells[(index, lang)]['value'] for lang in languages if (index, lang) in cells
+                },
+                'routes': {
+                    lang: (cells[(index, lang)]['extra'] or {}).get('route')
+                    for lang in languages if (index, lang) in cells
+                }
+            }
+            for index, text in enumerate(params.get('texts', []))
+        ]
+        return {'results': results}
+
+    table_data = params.get('tableData', [])
+    results = []
+    for index, row in enumerate(table_data):
+        translations = dict(row.get('translations', {}))
+        for lang in languages:
+            if (index, lang) in cells:
+                translations[lang] = cells[(index, lang)]['value']
+        results.append({'source': row.get('source', ''), 'translations': translations})
+
+    # Same order as the synchronous endpoint: language, then row
+    issues = [
+        cells[(index, lang)]['extra']
+        for lang in languages
+        for index in range(len(table_data))
+        if (index, lang) in cells and cells[(index, lang)]['extra']
+    ]
+    return {'results': results, 'issues': issues}
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Submit a background translation or QA job.
+
+    Request JSON:
+    { kind: "translate", texts, languages, scenario, location, packed, fanIn, dedupe }
+    { kind: "verify", tableData, languages, scenario, chunkSize, precheck, sampleRate }
+
+    Response JSON (202):
+    { jobId, status }
+    """
+    try:
+        data = request.json or {}
+        kind = data.get('kind', 'translate')
+        if kind == 'translate' and not (data.get('texts') and data.get('languages')):
+            return jsonify({'error': 'Missing texts or languages'}), 400
+        if kind == 'verify' and not (data.get('tableData') and data.get('languages')):
+            return jsonify({'error': 'Missing tableData or languages'}), 400
+
+        params = {key: value for key, value in data.items() if key != 'kind'}
+        # Job calls are charged to the submitting tenant
+        params['tenant'] = request_tenant()
+        job_id = job_manager.submit(kind, params)
+        return jsonify({'jobId': job_id, 'status': 'queued'}), 202
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Job status with cells done, throughput and ETA"""
+    progress = job_manager.progress(job_id)
+    if progress is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(progress)
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Stop a queued or running job; finished cells are kept"""
+    if not job_manager.cancel(job_id):
+        return jsonify({'error': 'Job not found or already finished'}), 409
+    return jsonify(job_manager.progress(job_id))
+
+@app.route('/api/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    """Re-run only the missing or errored cells of a stopped job"""
+    if not job_manager.resume(job_id):
+        return jsonify({'error': 'Job not found or still active'}), 409
+    return jsonify(job_manager.progress(job_id)), 202
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    """Results recorded so far, in the same shape as the synchronous endpoints"""
+    job = job_store.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    payload = build_job_results(job)
+    payload['status'] = job['status']
+    return jsonify(payload)
+
+# ==================== METRICS ENDPOINTS ====================
+
+# Extra /api/metrics sections: name -> callable, registered by other serving modes
+metrics_sources = {}
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Counters from the shared translation services"""
+    return jsonify({
+        **{name: source() for name, source in metrics_sources.items()},
+        'translation_memory': translation_memory.stats(),
+        'rate_limiter': rate_limiter.stats(),
+        'packing': packing_stats.snapshot(),
+        'fan_in': fan_in_stats.snapshot(),
+        'qa': qa_stats.snapshot(),
+        'dedupe': dedupe_stats.snapshot(),
+        'fuzzy': fuzzy_stats.snapshot(),
+        'router': model_router.stats(),
+        'upstream': client.stats() if isinstance(client, ResilientClient) else None,
+        'hedging': hedger.stats(),
+        'coalescing': dict(translation_flights.stats(), **coalesce_stats.snapshot()),
+        'concurrency': concurrency_limiter.stats(),
+        'admission': {'interactive': interactive_queue.stats(), 'bulk': bulk_queue.stats()},
+        'cancellation': cancel_stats.snapshot(),
+        'deadlines': deadline_stats.snapshot()
+    })
+
+@app.route('/api/prompts/tokens', methods=['GET'])
+def prompt_tokens():
+    """
+    Estimated system prompt tokens per scenario.
+
+    Response JSON:
+    { "<scenario>": { prefix, languages: { "<language>": n }, full } }
+
+    A call's system prompt costs prefix + the slices of its target languages;
+    full is the cost with every slice included.
+    """
+    return jsonify(PROMPT_TOKEN_COUNTS)
+
+# ==================== TRANSLATION MEMORY ENDPOINTS ====================
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss/eviction counters and sizes of the translation memory"""
+    return jsonify(translation_memory.stats())
+
+@app.route('/api/cache/purge', methods=['POST'])
+def cache_purge():
+    """
+    Purge translation memory entries.
+
+    Request JSON (both optional, omit both to clear everything):
+    { scenario: "software", language: "Spanish" }
+    """
+    try:
+        data = request.json or {}
+        removed = translation_memory.purge(data.get('scenario'), data.get('language'))
+        return jsonify({'removed': removed})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ==================== EXPORT ENDPOINTS ====================
 
 @app.route('/api/export/csv', methods=['POST'])
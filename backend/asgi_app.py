@@ -0,0 +1,543 @@
+"""
+ASGI serving mode: uvicorn asgi_app:app --host 0.0.0.0 --port 5000 (from backend/)
+
+The translation endpoints (/api/translate, /api/translate/stream,
+/api/translate/batch, /api/translate/stream/table) run natively on asyncio
+with the async OpenAI client, so a call waiting on the upstream or an open
+SSE stream costs a task instead of a thread. They drive the same step
+generators as the Flask handlers and share their translation memory,
+limiters, router and counters, so requests and responses are unchanged.
+/api/verify runs the blocking QA pass in a worker thread. All of them watch
+for the client disconnecting and stop calling the upstream when it does.
+
+Every other endpoint (jobs, metrics, cache, exports, ...) is the Flask app
+itself, served through a WSGI bridge.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from openai import AsyncOpenAI
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+import app as flask_backend
+from services import AsyncResilientClient, build_async_http_client, INTERACTIVE, BULK, Overloaded, Cancelled
+
+# Initialize async OpenAI client (per process, bound to its event loop)
+client = None
+def get_openai_client():
+    global client
+    if client is None:
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key or api_key == 'your_openai_api_key_here':
+            return None
+        # Retries are handled by AsyncResilientClient, not the SDK
+        sdk_client = AsyncOpenAI(
+            api_key=api_key,
+            max_retries=0,
+            http_client=build_async_http_client(
+                max_connections=int(os.getenv('UPSTREAM_MAX_CONNECTIONS', '100')),
+                max_keepalive=int(os.getenv('UPSTREAM_MAX_KEEPALIVE', str(flask_backend.BATCH_WORKERS * 2))),
+                read_timeout=flask_backend.UPSTREAM_ATTEMPT_TIMEOUT
+            )
+        )
+        # Breaker and limiter are shared with the blocking client used by jobs and QA
+        client = AsyncResilientClient(
+            sdk_client,
+            deadline=flask_backend.UPSTREAM_DEADLINE,
+            attempt_timeout=flask_backend.UPSTREAM_ATTEMPT_TIMEOUT,
+            max_attempts=flask_backend.UPSTREAM_MAX_ATTEMPTS,
+            breaker=flask_backend.upstream_breaker,
+            limiter=flask_backend.concurrency_limiter
+        )
+    return client
+
+# Async client counters next to the blocking client's in /api/metrics
+flask_backend.metrics_sources['upstream_async'] = lambda: client.stats() if client is not None else None
+
+async def run_steps(openai_client, steps, tenant=None, lane=INTERACTIVE, should_stop=None):
+    """
+    Drive a translation step generator (see app.run_steps) with the async client.
+    Between calls the generators read and write the translation memory
+    (SQLite, fuzzy lookups), so each step runs in a worker thread to keep
+    that blocking work off the event loop.
+
+    Raises:
+        Cancelled: should_stop() turned True before a call was sent
+
+    Returns:
+        The generator's return value
+    """
+    def advance(response, error):
+        # StopIteration cannot cross a Future, so hand it back as a value
+        try:
+            return steps.throw(error) if error is not None else steps.send(response)
+        except StopIteration as stop:
+            return stop
+
+    response, error = None, None
+    while True:
+        call = await asyncio.to_thread(advance, response, error)
+        if isinstance(call, StopIteration):
+            return call.value
+        try:
+            response, error = await send_call(openai_client, call, tenant, lane, should_stop), None
+        except Cancelled:
+            steps.close()
+            raise
+        except Exception as e:
+            response, error = None, e
+
+async def send_call(openai_client, call, tenant=None, lane=INTERACTIVE, should_stop=None):
+    """Pace and send one UpstreamCall, unless should_stop() turns True first"""
+    flask_backend.check_cancelled(should_stop)
+    await flask_backend.rate_limiter.acquire_async(call.tokens, tenant, lane, should_stop)
+    flask_backend.check_cancelled(should_stop)
+
+    tracker = flask_backend.hedger.tracker if call.measure or call.hedge else None
+
+    def request():
+        return openai_client.chat.completions.create(lane=lane, latency_tracker=tracker, **call.params)
+
+    async def duplicate():
+        await flask_backend.rate_limiter.acquire_async(call.tokens, tenant, lane, should_stop)
+        flask_backend.check_cancelled(should_stop)
+        return await request()
+
+    if call.hedge:
+        response = await flask_backend.hedger.run_async(request, duplicate)
+    else:
+        response = await request()
+    await asyncio.to_thread(flask_backend.settle_tokens, call.tokens, response, tenant)
+    return response
+
+async def translate_text_coalesced(openai_client, text, target_language, scenario, location='', hedge=False,
+                                   tenant=None):
+    """
+    app.translate_text_coalesced with the async client; flights are shared
+    with requests served by Flask threads.
+
+    Returns:
+        Tuple of (translation, route)
+    """
+    def translate():
+        return run_steps(openai_client, flask_backend.translate_text_steps(
+            text, target_language, scenario, location, hedge
+        ), tenant)
+
+    if not flask_backend.COALESCE_REQUESTS:
+        return await translate()
+    outcome, shared = await flask_backend.translation_flights.do_async(
+        (scenario, target_language, location, text), translate
+    )
+    flask_backend.record_coalesced(outcome, shared)
+    return outcome
+
+async def iter_translations(openai_client, texts, languages, scenario, location='', mode='single',
+                            workers=flask_backend.BATCH_WORKERS, token_budget=flask_backend.PACK_TOKEN_BUDGET,
+                            should_stop=None, cells=None, dedupe=True, tenant=None, fast=False):
+    """
+    app.iter_translations on the event loop: at most `workers` tasks talk to
+    the upstream at once. Closing the generator (or cancelling its consumer,
+    e.g. when an SSE client disconnects) cancels calls still in flight.
+    Once should_stop() returns True (a deadline) the generator ends and no
+    new upstream call is made, but calls in flight finish into the
+    translation memory, as in the Flask app.
+
+    Yields:
+        (row_index, language, translation, route, error)
+    """
+    cells, followers = flask_backend.prepare_cells(texts, languages, cells, dedupe)
+    if not cells:
+        return
+
+    semaphore = asyncio.Semaphore(max(1, min(workers, len(cells))))
+    tasks = {}
+
+    async def run(steps):
+        async with semaphore:
+            return await run_steps(openai_client, steps, tenant, BULK, should_stop)
+
+    def submit(rows, langs, kind):
+        steps = flask_backend.translation_task_steps(texts, rows, langs, kind, scenario, location, fast)
+        tasks[asyncio.ensure_future(run(steps))] = (rows, langs, kind)
+
+    try:
+        for task in flask_backend.plan_translation_tasks(texts, cells, mode, token_budget):
+            submit(*task)
+
+        while tasks:
+            if should_stop and should_stop():
+                # Leave calls in flight to finish; their tasks stop before the next call
+                for task in tasks:
+                    detach(task)
+                tasks.clear()
+                return
+            done, _ = await asyncio.wait(tasks, timeout=0.5, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                rows, langs, kind = tasks.pop(task)
+                try:
+                    result = task.result()
+                    error = None
+                except Cancelled:
+                    continue
+                except Exception as e:
+                    result = None
+                    error = str(e)
+
+                finished, retries = flask_backend.expand_task_result(
+                    texts, rows, langs, kind, result, error, followers
+                )
+                for cell in finished:
+                    yield cell
+                for index, lang in retries:
+                    submit([index], [lang], 'single')
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# Tasks left to finish after their request returned (the loop only keeps weak references)
+detached_tasks = set()
+
+def detach(task):
+    """Keep `task` running after its consumer is gone, discarding its outcome"""
+    detached_tasks.add(task)
+    task.add_done_callback(lambda done: detached_tasks.discard(done) or done.cancelled() or done.exception())
+
+def request_tenant(request):
+    """Tenant of a request (X-Tenant header), as app.request_tenant"""
+    return request.headers.get('X-Tenant') or 'default'
+
+def json_response(payload, status=200, headers=None):
+    """JSON rendered by the Flask app's provider, byte for byte what jsonify returns"""
+    rendered = flask_backend.app.json.response(payload)
+    return Response(rendered.get_data(), status_code=status, headers=headers, media_type=rendered.mimetype)
+
+def overloaded_response(error):
+    """429 with Retry-After for a request shed by admission control (see app.overloaded_response)"""
+    return json_response({'error': str(error), 'retryAfter': error.retry_after}, 429, {
+        'Retry-After': str(error.retry_after)
+    })
+
+async def until_disconnected(request):
+    """Return once the client disconnects; the request body must have been read"""
+    while (await request.receive())['type'] != 'http.disconnect':
+        pass
+
+async def unless_disconnected(request, work, stop=None):
+    """
+    Await the coroutine `work` unless the client disconnects first; then it is
+    cancelled, and `stop` (an Event polled by work running in threads) is set.
+
+    Returns:
+        Tuple of (result, disconnected)
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(until_disconnected(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            if stop is not None:
+                stop.set()
+            task.cancel()
+            await asyncio.wait({task})
+    if task.cancelled():
+        return None, True
+    return task.result(), False
+
+def disconnected_response():
+    """Response for a request whose client went away (499, as nginx logs it)"""
+    return json_response({'error': 'Client disconnected'}, 499)
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """StreamingResponse that releases its admission ticket however the response ends"""
+
+    def __init__(self, content, ticket, **kwargs):
+        super().__init__(content, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.ticket.release()
+
+# ==================== TRANSLATION ENDPOINTS ====================
+
+async def translate(request):
+    """
+    Translate a single text string to a target language (see app.translate).
+    """
+    try:
+        openai_client = get_openai_client()
+        if not openai_client:
+            return json_response({'error': 'OpenAI API key not configured'}, 500)
+
+        data = await request.json()
+        text = data.get('text', '')
+        target_language = data.get('targetLanguage', '')
+        scenario = data.get('scenario', 'general')
+        location = data.get('location', '')
+
+        if not text or not target_language:
+            return json_response({'error': 'Missing text or targetLanguage'}, 400)
+
+        with flask_backend.interactive_queue.admit():
+            translation, route = await translate_text_coalesced(
+                openai_client, text, target_language, scenario, location,
+                hedge=data.get('hedge', flask_backend.HEDGE_REQUESTS), tenant=request_tenant(request)
+            )
+        flask_backend.model_router.record(route)
+
+        return json_response({
+            'translation': translation,
+            'source': text,
+            'targetLanguage': target_language,
+            'scenario': scenario,
+            'route': route
+        })
+
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+async def translate_batch(request):
+    """
+    Translate multiple texts to multiple languages (see app.translate_batch).
+    """
+    try:
+        openai_client = get_openai_client()
+        if not openai_client:
+            return json_response({'error': 'OpenAI API key not configured'}, 500)
+
+        data = await request.json()
+        texts = data.get('texts', [])
+        languages = data.get('languages', [])
+        scenario = data.get('scenario', 'general')
+        location = data.get('location', '')
+
+        if not texts or not languages:
+            return json_response({'error': 'Missing texts or languages'}, 400)
+
+        batch_workers = flask_backend.BATCH_WORKERS
+        workers = max(1, min(int(data.get('concurrency', batch_workers)), batch_workers))
+        try:
+            budget = flask_backend.request_budget(data)
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+        expires = time.monotonic() + budget if budget else None
+        mode, token_budget, fast, degraded = flask_backend.plan_batch(data, texts, languages, workers, budget)
+        cells = {}
+
+        async def collect():
+            # At the deadline the cells done so far are returned
+            async for index, lang, translation, route, error in iter_translations(
+                openai_client, texts, languages, scenario, location,
+                mode=mode, workers=workers, token_budget=token_budget,
+                should_stop=flask_backend.deadline_check(expires), dedupe=data.get('dedupe', True),
+                tenant=request_tenant(request), fast=fast
+            ):
+                cells[(index, lang)] = (translation if error is None else f'[Error: {error}]', route, error)
+
+        with flask_backend.bulk_queue.admit(flask_backend.estimate_translation_calls(data, texts, languages)):
+            _, disconnected = await unless_disconnected(request, collect())
+        if disconnected:
+            return disconnected_response()
+
+        return json_response(flask_backend.batch_response(texts, languages, cells, degraded))
+
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+async def verify_translations(request):
+    """
+    QA a translated table (see app.verify_translations). The pass runs in a
+    worker thread with the blocking client and makes no further QA calls once
+    the client disconnects.
+    """
+    try:
+        openai_client = flask_backend.get_openai_client()
+        if not openai_client:
+            return json_response({'error': 'OpenAI API key not configured'}, 500)
+
+        data = await request.json()
+        table_data = data.get('tableData', [])
+        languages = data.get('languages', [])
+        scenario = data.get('scenario', 'general')
+        chunk_size = int(data.get('chunkSize', 50))
+        try:
+            budget = flask_backend.request_budget(data)
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+        expires = time.monotonic() + budget if budget else None
+        precheck, sample_rate, review, degraded = flask_backend.plan_verify(
+            table_data, languages, scenario, chunk_size, data.get('precheck', True),
+            float(data.get('sampleRate', 0.0)), budget=budget
+        )
+        _, selected = flask_backend.select_qa_cells(
+            table_data, languages, scenario, precheck, sample_rate
+        ) if review else ({}, set())
+        reviewed = set()
+        stop = threading.Event()
+
+        def record_chunk(lang, rows, *_):
+            reviewed.update((index, lang) for index in rows)
+
+        with flask_backend.bulk_queue.admit(len(languages) * math.ceil(len(table_data) / max(1, chunk_size))):
+            outcome, disconnected = await unless_disconnected(request, asyncio.to_thread(
+                flask_backend.verify_table, openai_client, table_data, languages, scenario, chunk_size,
+                on_chunk=record_chunk, should_stop=flask_backend.deadline_check(expires, stop.is_set),
+                precheck=precheck, sample_rate=sample_rate, tenant=request_tenant(request), review=review
+            ), stop)
+        if disconnected:
+            return disconnected_response()
+        corrected, qa_issues, stats = outcome
+
+        return json_response(flask_backend.verify_response(
+            corrected, qa_issues, stats, languages, selected, reviewed, degraded
+        ))
+
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+async def translate_stream(request):
+    """
+    Translate one text-language pair for progressive UI updates (see app.translate_stream).
+    """
+    data = {}
+    try:
+        openai_client = get_openai_client()
+        if not openai_client:
+            return json_response({'error': 'OpenAI API key not configured'}, 500)
+
+        data = await request.json()
+        text = data.get('text', '')
+        target_language = data.get('targetLanguage', '')
+        scenario = data.get('scenario', 'general')
+        location = data.get('location', '')
+        row_index = data.get('rowIndex', 0)
+
+        if not text or not target_language:
+            return json_response({'error': 'Missing text or targetLanguage'}, 400)
+
+        with flask_backend.interactive_queue.admit():
+            translation, route = await translate_text_coalesced(
+                openai_client, text, target_language, scenario, location,
+                hedge=data.get('hedge', flask_backend.HEDGE_REQUESTS), tenant=request_tenant(request)
+            )
+        flask_backend.model_router.record(route)
+
+        return json_response({
+            'translation': translation,
+            'source': text,
+            'targetLanguage': target_language,
+            'rowIndex': row_index,
+            'scenario': scenario,
+            'route': route
+        })
+
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return json_response({'error': str(e), 'rowIndex': data.get('rowIndex', 0)}, 500)
+
+async def translate_stream_table(request):
+    """
+    Translate a whole table and stream each cell as server-sent events
+    (see app.translate_stream_table).
+    """
+    openai_client = get_openai_client()
+    if not openai_client:
+        return json_response({'error': 'OpenAI API key not configured'}, 500)
+
+    data = await request.json() or {}
+    texts = data.get('texts', [])
+    languages = data.get('languages', [])
+    scenario = data.get('scenario', 'general')
+    location = data.get('location', '')
+    batch_workers = flask_backend.BATCH_WORKERS
+    workers = max(1, min(int(data.get('concurrency', batch_workers)), batch_workers))
+
+    if not texts or not languages:
+        return json_response({'error': 'Missing texts or languages'}, 400)
+
+    try:
+        ticket = flask_backend.bulk_queue.admit(flask_backend.estimate_translation_calls(data, texts, languages))
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    async def generate():
+        sse_event = flask_backend.sse_event
+        total = len(texts) * len(languages)
+        completed = 0
+        failed = 0
+        cells = iter_translations(
+            openai_client, texts, languages, scenario, location,
+            mode=flask_backend.translation_mode(data, languages), workers=workers,
+            dedupe=data.get('dedupe', True), tenant=request_tenant(request)
+        )
+        try:
+            async for index, lang, translation, route, error in cells:
+                if error is None:
+                    completed += 1
+                    yield sse_event('translation', {
+                        'rowIndex': index, 'language': lang, 'translation': translation, 'route': route
+                    })
+                else:
+                    failed += 1
+                    yield sse_event('error', {'rowIndex': index, 'language': lang, 'error': error})
+
+            yield sse_event('done', {'completed': completed, 'failed': failed, 'total': total})
+        finally:
+            # Client went away or stream finished: cancel calls still in flight
+            await cells.aclose()
+
+    return AdmittedStreamingResponse(generate(), ticket, media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@asynccontextmanager
+async def lifespan(_app):
+    # Open the upstream connection before the first user request, without delaying startup
+    warm_up = None
+    if os.getenv('UPSTREAM_WARMUP', 'true').lower() == 'true' and get_openai_client():
+        warm_up = asyncio.ensure_future(client.warm_up())
+    yield
+    if warm_up is not None:
+        warm_up.cancel()
+    if client is not None:
+        await client.close()
+
+app = Starlette(
+    routes=[
+        Route('/api/translate', translate, methods=['POST']),
+        Route('/api/translate/batch', translate_batch, methods=['POST']),
+        Route('/api/translate/stream', translate_stream, methods=['POST']),
+        Route('/api/translate/stream/table', translate_stream_table, methods=['POST']),
+        Route('/api/verify', verify_translations, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(flask_backend.app)),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,4 @@
+"""
+Test configuration: tests import the backend modules (services, prompts, app)
+from this directory, which pytest puts on sys.path for its conftest.
+"""
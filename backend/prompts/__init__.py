@@ -6,9 +6,14 @@ Each scenario has its own specialized prompt for optimal translations.
 from .app_store_aso import get_app_store_prompt
 from .marketing_social import get_marketing_social_prompt
 from .website_seo import get_website_seo_prompt
-from .software_strings import get_software_strings_prompt
+from .software_strings import get_software_strings_prompt, get_software_strings_notes, software_glossary
 from .general_bulk import get_general_bulk_prompt
 from .quality_assurance import get_quality_assurance_prompt
+from .packed_batch import get_packed_prompt
+from .multi_language import get_multi_language_prompt
+from .reference import add_reference_translations
+from .glossary import Glossary, load_glossary_file
+from .registry import PromptRegistry
 
 # Scenario ID to prompt function mapping
 PROMPT_MAP = {
@@ -19,6 +24,20 @@ PROMPT_MAP = {
     'general': get_general_bulk_prompt,
 }
 
+# System prompts compiled once into a shared prefix and per-language slices
+PROMPT_REGISTRY = PromptRegistry(PROMPT_MAP)
+
+# Scenarios whose per-text rules (glossary terms, language style) live in the
+# user prompt; packed and multi-language prompts add them for all their texts
+NOTES_MAP = {
+    'software': get_software_strings_notes,
+}
+
+def _with_notes(scenario_id, user_prompt, texts, langs):
+    notes_func = NOTES_MAP.get(scenario_id)
+    notes = notes_func(texts, langs) if notes_func else ""
+    return f"{notes}\n\n{user_prompt}" if notes else user_prompt
+
 def get_prompt_for_scenario(scenario_id, text, lang, location=""):
     """
     Get the appropriate prompt (system_prompt, user_prompt) for a given scenario.
@@ -26,14 +45,43 @@ def get_prompt_for_scenario(scenario_id, text, lang, location=""):
     Args:
         scenario_id: One of 'app-store', 'marketing', 'website', 'software', 'general'
         text: The text to translate
+        lang: Target language, or a list of languages for a multi-language
+              prompt answered with one JSON object keyed by language
+        location: Optional context/location hint
+        
+    Returns:
+        Tuple of (system_prompt, user_prompt)
+    """
+    if scenario_id not in PROMPT_MAP:
+        scenario_id = 'general'
+    compiled = PROMPT_REGISTRY.get(scenario_id)
+    if isinstance(lang, (list, tuple)):
+        system_prompt, user_prompt = get_multi_language_prompt(compiled.prefix, text, lang, location)
+        return system_prompt + compiled.language_section(lang), _with_notes(scenario_id, user_prompt, [text], lang)
+    _, user_prompt = PROMPT_MAP[scenario_id](text, lang, location)
+    return compiled.system_prompt([lang]), user_prompt
+
+def get_packed_prompt_for_scenario(scenario_id, items, lang, location=""):
+    """
+    Get a packed prompt that translates many strings in one completion.
+    
+    Args:
+        scenario_id: One of 'app-store', 'marketing', 'website', 'software', 'general'
+        items: List of {"id", "text"} dicts
         lang: Target language
         location: Optional context/location hint
         
     Returns:
         Tuple of (system_prompt, user_prompt)
     """
-    prompt_func = PROMPT_MAP.get(scenario_id, get_general_bulk_prompt)
-    return prompt_func(text, lang, location)
+    if scenario_id not in PROMPT_MAP:
+        scenario_id = 'general'
+    compiled = PROMPT_REGISTRY.get(scenario_id)
+    system_prompt, user_prompt = get_packed_prompt(compiled.prefix, items, lang, location)
+    return (
+        system_prompt + compiled.language_section([lang]),
+        _with_notes(scenario_id, user_prompt, [item['text'] for item in items], [lang])
+    )
 
 def get_qa_prompt(entries, lang, scenario="general"):
     """
@@ -48,7 +96,17 @@ __all__ = [
     'get_website_seo_prompt',
     'get_software_strings_prompt',
     'get_general_bulk_prompt',
+    'get_packed_prompt',
+    'get_multi_language_prompt',
+    'add_reference_translations',
+    'get_software_strings_notes',
+    'software_glossary',
+    'Glossary',
+    'load_glossary_file',
+    'PromptRegistry',
+    'PROMPT_REGISTRY',
     'get_prompt_for_scenario',
+    'get_packed_prompt_for_scenario',
     'get_qa_prompt',
     'PROMPT_MAP',
 ]
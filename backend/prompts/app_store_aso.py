@@ -57,7 +57,7 @@ Your task is to translate and optimize app store content for maximum visibility
    • Keep feature names if they're branded
    • Translate generic feature descriptions
 
-7. LANGUAGE-SPECIFIC ASO:
+🌍 LANGUAGE-SPECIFIC ASO:
    • Spanish: Use tú form, Latin American neutral Spanish
    • German: Use Du form, conversational modern German
    • French: International French, modern app terminology
@@ -66,18 +66,18 @@ Your task is to translate and optimize app store content for maximum visibility
    • Chinese: Ultra-compact, WeChat/local app style
    • Hindi/Marathi: Mix of transliteration + Devanagari
 
-8. CALL-TO-ACTION PHRASES:
+7. CALL-TO-ACTION PHRASES:
    • "Download now" → Translate naturally for each market
    • "Try free" → Use local freemium terminology
    • "Get started" → Match local app conventions
 
-9. RATINGS & REVIEWS MENTIONS:
+8. RATINGS & REVIEWS MENTIONS:
    • "4.8★ rating" → Keep star format, translate context
    • "1M+ downloads" → Use local number formatting
 
-10. TECHNICAL TERMS:
-    • AI, HD, 4K, RAW, JPEG → Keep in English
-    • "Photo editor", "Video maker" → Translate naturally
+9. TECHNICAL TERMS:
+   • AI, HD, 4K, RAW, JPEG → Keep in English
+   • "Photo editor", "Video maker" → Translate naturally
 
 📤 OUTPUT: Plain text only, ready for App Store submission.
 Match source formatting exactly (line breaks, bullets, emojis)."""
@@ -0,0 +1,113 @@
+"""
+Glossary / Termbase
+
+Structured terminology rules injected into prompts only when relevant:
+- each entry lists the source terms it covers, a rule, and optional
+  per-language translations
+- an Aho–Corasick automaton finds every term present in a source string in
+  one pass, however many entries the glossary holds
+
+Entry format:
+{"terms": ["Bust", "Breast"], "category": "sensitive",
+ "rule": "Replace with 'Chest' ...", "translations": {"Spanish": "Pecho"}}
+"""
+
+import json
+from collections import deque
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+class Glossary:
+    """
+    Termbase with multi-pattern matching over source strings.
+
+    Args:
+        entries: Iterable of entry dicts (see module docstring)
+    """
+
+    def __init__(self, entries=()):
+        self.entries = []
+        self._goto = [{}]
+        self._terms = [[]]
+        self._fail = [0]
+        self._output = [[]]
+        self.extend(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def extend(self, entries):
+        """
+        Add entries and rebuild the automaton.
+        """
+        for entry in entries:
+            index = len(self.entries)
+            self.entries.append(entry)
+            for term in entry['terms']:
+                self._insert(term.lower(), index)
+        self._build()
+
+    def match(self, text):
+        """
+        Entries whose terms occur in `text` as whole words (case-insensitive).
+
+        Returns:
+            List of entries in glossary order, each at most once
+        """
+        text = text.lower()
+        found = set()
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for index, length in self._output[state]:
+                start = position - length + 1
+                end = position + 1
+                if (start == 0 or not _is_word_char(text[start - 1])) and \
+                        (end == len(text) or not _is_word_char(text[end])):
+                    found.add(index)
+        return [self.entries[index] for index in sorted(found)]
+
+    def _insert(self, term, index):
+        state = 0
+        for ch in term:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._terms.append([])
+            state = next_state
+        self._terms[state].append((index, len(term)))
+
+    def _build(self):
+        # Breadth-first failure links; each state also reports the terms of its fallback
+        fail = [0] * len(self._goto)
+        output = [list(terms) for terms in self._terms]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                fallback = fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = self._goto[fallback].get(ch, 0)
+                output[next_state].extend(output[fail[next_state]])
+                queue.append(next_state)
+        # Swapped in whole so concurrent match() calls see a consistent automaton
+        self._fail, self._output = fail, output
+
+
+def load_glossary_file(path):
+    """
+    Read glossary entries from a JSON file holding a list of entries.
+    """
+    with open(path, encoding='utf-8') as handle:
+        entries = json.load(handle)
+    if not isinstance(entries, list):
+        raise ValueError(f'Glossary file must contain a list of entries: {path}')
+    return entries
@@ -75,21 +75,21 @@ Your task is to translate marketing content that drives engagement and conversio
    • Facebook: Community-focused, shareable
    • Twitter: Witty, concise, conversation-starting
 
-10. LANGUAGE-SPECIFIC SOCIAL STYLE:
-    • Spanish: Warm, enthusiastic, exclamation marks common
-    • German: Direct but friendly, less hyperbole
-    • French: Elegant, slightly sophisticated
-    • Portuguese (BR): Very casual, lots of slang acceptable
-    • Japanese: Kawaii elements, polite enthusiasm
-    • Korean: Trendy expressions, K-pop influenced style
-    • Hindi: Mix English terms naturally, Hinglish acceptable
-
-11. PRESERVE MARKETING ELEMENTS:
+🌍 LANGUAGE-SPECIFIC SOCIAL STYLE:
+   • Spanish: Warm, enthusiastic, exclamation marks common
+   • German: Direct but friendly, less hyperbole
+   • French: Elegant, slightly sophisticated
+   • Portuguese (BR): Very casual, lots of slang acceptable
+   • Japanese: Kawaii elements, polite enthusiasm
+   • Korean: Trendy expressions, K-pop influenced style
+   • Hindi: Mix English terms naturally, Hinglish acceptable
+
+10. PRESERVE MARKETING ELEMENTS:
     • Discount percentages: "50% OFF" → "50% de descuento"
     • Limited time: "24 hours only" → Translate with urgency
     • Social proof: "Join 10M users" → Local number format
 
-12. AVOID:
+11. AVOID:
     • Literal translations that lose impact
     • Overly formal language (unless B2B)
     • Cultural references that don't translate
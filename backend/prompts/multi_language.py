@@ -0,0 +1,46 @@
+"""
+Multi-Language (Fan-In) Translation Prompt
+
+Wraps a scenario system prompt so that one completion translates a single
+source string into every requested language.
+
+Output strictly as a JSON object keyed by language name:
+{"Spanish": "...", "German": "..."}
+No extra text.
+"""
+
+import json
+
+MULTI_LANGUAGE_OUTPUT_RULES = (
+    "\n\n🌐 MULTI-LANGUAGE MODE (overrides the output format above):\n"
+    "• Translate the text into EVERY target language listed, applying all rules above to each one.\n"
+    "• Apply each language's own style rules independently.\n"
+    "• Return ONLY a JSON object whose keys are exactly the target language names as given\n"
+    "  and whose values are the final translations.\n"
+    "• No markdown, code fences, explanations or extra keys."
+)
+
+
+def get_multi_language_prompt(system_prompt, text, langs, location=""):
+    """
+    Build a fan-in (system_prompt, user_prompt) pair.
+
+    Args:
+        system_prompt: The scenario system prompt to extend
+        text: The text to translate
+        langs: List of target languages
+        location: Optional context/location hint
+
+    Returns:
+        Tuple of (system_prompt, user_prompt)
+    """
+    langs_json = json.dumps(list(langs), ensure_ascii=False)
+
+    if location:
+        user_prompt = f"""Translate this text into each of these languages: {langs_json}
+Context/Location: {location}
+Text: {text}"""
+    else:
+        user_prompt = f"Translate this text into each of these languages: {langs_json}\nText: {text}"
+
+    return system_prompt + MULTI_LANGUAGE_OUTPUT_RULES, user_prompt
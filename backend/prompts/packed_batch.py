@@ -0,0 +1,49 @@
+"""
+Packed Batch Translation Prompt
+
+Wraps a scenario system prompt so that one completion translates many
+source strings at once.
+
+Output strictly as JSON array aligned by id:
+[{"id": 0, "translation": "..."}]
+No extra text.
+"""
+
+import json
+
+PACKED_OUTPUT_RULES = (
+    "\n\n📦 BATCH MODE (overrides the output format above):\n"
+    "• You receive a JSON array of items, each with an \"id\" and a \"text\".\n"
+    "• Translate every item independently, applying all rules above to each one.\n"
+    "• Return ONLY a JSON array with one object per item: {\"id\": <same id>, \"translation\": \"...\"}.\n"
+    "• Keep every id exactly as given. Do not merge, skip, reorder or add items.\n"
+    "• No markdown, code fences, explanations or extra keys."
+)
+
+
+def get_packed_prompt(system_prompt, items, lang, location=""):
+    """
+    Build a packed (system_prompt, user_prompt) pair.
+
+    Args:
+        system_prompt: The scenario system prompt to extend
+        items: List of {"id", "text"} dicts
+        lang: Target language
+        location: Optional context/location hint shared by all items
+
+    Returns:
+        Tuple of (system_prompt, user_prompt)
+    """
+    items_json = json.dumps(
+        [{"id": item["id"], "text": str(item["text"])} for item in items],
+        ensure_ascii=False
+    )
+
+    if location:
+        user_prompt = f"""Translate each item into {lang}.
+Context/Location: {location}
+Items: {items_json}"""
+    else:
+        user_prompt = f"Translate each item into {lang}.\nItems: {items_json}"
+
+    return system_prompt + PACKED_OUTPUT_RULES, user_prompt
@@ -0,0 +1,33 @@
+"""
+Reference Translation Prompt Addendum
+
+Appends near matches from translation memory to a user prompt, so a string
+that differs slightly from one already translated keeps the approved
+wording and terminology.
+"""
+
+
+def add_reference_translations(user_prompt, matches):
+    """
+    Extend a user prompt with reference translations.
+
+    Args:
+        user_prompt: The scenario user prompt
+        matches: List of {"source", "translation"} near matches
+
+    Returns:
+        The extended user prompt (unchanged when there are no matches)
+    """
+    if not matches:
+        return user_prompt
+
+    references = "\n".join(
+        f"- Source: {match['source']}\n  Translation: {match['translation']}"
+        for match in matches
+    )
+    return (
+        f"{user_prompt}\n\n"
+        "Previously approved translations of similar texts (reuse their wording and terms "
+        "where the source is the same; translate only what differs):\n"
+        f"{references}"
+    )
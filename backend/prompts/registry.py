@@ -0,0 +1,123 @@
+"""
+Compiled Prompt Registry
+
+Scenario system prompts are compiled once into:
+- a shared prefix: the whole prompt minus its language-specific section,
+  byte-identical for every call so upstream prefix caching applies
+- per-language slices: the lines of that section, keyed by language
+
+A call's system prompt is the prefix followed by the slices of its target
+language(s) only.
+"""
+
+import re
+
+# Heading of the language-specific section ("🌍 LANGUAGE-SPECIFIC WEB STYLE:"), left
+# unnumbered so the prefix keeps consecutive numbering, and its bullet lines up to a blank line
+_SECTION_RE = re.compile(r'\n\n[^\n]*LANGUAGE-SPECIFIC[^\n]*:\n((?:[ \t]*•[^\n]*\n?)+)')
+_RULE_RE = re.compile(r'^\s*•\s*([^:]+):\s*(.+)$')
+
+
+def _base_name(name):
+    return name.split('(')[0].strip()
+
+
+class CompiledPrompt:
+    """
+    One scenario's system prompt split into prefix and language slices.
+
+    Args:
+        scenario_id: Scenario the prompt belongs to
+        system_prompt: Full system prompt as written by the scenario builder
+    """
+
+    def __init__(self, scenario_id, system_prompt):
+        self.scenario_id = scenario_id
+        self.language_rules = []
+
+        match = _SECTION_RE.search(system_prompt)
+        if match is None:
+            self.prefix = system_prompt
+            return
+
+        self.prefix = system_prompt[:match.start()] + '\n\n' + system_prompt[match.end():].lstrip('\n')
+        for line in match.group(1).splitlines():
+            rule = _RULE_RE.match(line)
+            if rule:
+                names = [name.strip().lower() for name in rule.group(1).split('/')]
+                self.language_rules.append((names, f'• {rule.group(1).strip()}: {rule.group(2).strip()}'))
+
+    def language_slice(self, lang):
+        """
+        Style lines that apply to `lang`: an exact name match ("Chinese
+        (Simplified)") wins, otherwise every rule for the base language.
+        """
+        key = lang.strip().lower()
+        exact = [line for names, line in self.language_rules if key in names]
+        if exact:
+            return exact
+        base = _base_name(key)
+        return [line for names, line in self.language_rules if base in [_base_name(name) for name in names]]
+
+    def language_section(self, langs):
+        """
+        Section with the style lines of the given languages ('' if none apply),
+        to append after the prefix and any mode-specific rules.
+        """
+        lines = []
+        for lang in langs:
+            for line in self.language_slice(lang):
+                if line not in lines:
+                    lines.append(line)
+        if not lines:
+            return ''
+        return '\n\n🌍 LANGUAGE-SPECIFIC STYLE:\n' + '\n'.join(lines)
+
+    def system_prompt(self, langs):
+        """
+        Prefix plus the style lines of the given languages.
+        """
+        return self.prefix + self.language_section(langs)
+
+
+class PromptRegistry:
+    """
+    Compiled system prompts for every scenario in a prompt map.
+
+    Args:
+        prompt_map: Scenario id -> builder(text, lang, location)
+    """
+
+    def __init__(self, prompt_map):
+        # Scenario system prompts do not depend on text, language or location
+        self.prompts = {
+            scenario_id: CompiledPrompt(scenario_id, builder("", "", "")[0])
+            for scenario_id, builder in prompt_map.items()
+        }
+
+    def get(self, scenario_id):
+        return self.prompts.get(scenario_id)
+
+    def token_counts(self, count_tokens):
+        """
+        Token counts of each scenario's prefix and language slices.
+
+        Args:
+            count_tokens: Callable mapping a string to its token count
+
+        Returns:
+            Dict of scenario -> {"prefix": n, "languages": {name: n}, "full": n}
+        """
+        counts = {}
+        for scenario_id, prompt in self.prompts.items():
+            languages = {}
+            for names, line in prompt.language_rules:
+                for name in names:
+                    languages[name] = count_tokens(line)
+            all_langs = [name for names, _ in prompt.language_rules for name in names]
+            counts[scenario_id] = {
+                'prefix': count_tokens(prompt.prefix),
+                'languages': languages,
+                'full': count_tokens(prompt.system_prompt(all_langs)),
+            }
+        return counts
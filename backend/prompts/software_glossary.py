@@ -0,0 +1,236 @@
+"""
+Software Strings Termbase
+
+Structured form of the term rules and per-language style rules used by
+prompts/software_strings.py. Only the entries whose terms appear in a
+string, and the style of the target language, are sent with it.
+
+Categories:
+- sensitive: body terms replaced with neutral wording before translating
+- conceptual: feature names translated by function, not word for word
+- keep: technical standards and acronyms kept in English
+- color: tonal values in photo editing, never standalone color words
+- ui-action / photo-term: industry-standard renderings
+- beauty: wording to avoid in enhancement features
+"""
+
+SOFTWARE_GLOSSARY = [
+    # Sensitive body terms
+    {
+        "terms": ["Bust", "Breast", "Breasts"],
+        "category": "sensitive",
+        "rule": "Replace with 'Chest' (neutral, professional, non-gendered) before translating",
+        "translations": {"Hindi": "छाती (Chhātī)", "Marathi": "छाती (Chhātī)", "Spanish": "Pecho"},
+    },
+    {
+        "terms": ["Belly"],
+        "category": "sensitive",
+        "rule": "Replace with 'Abdomen', or keep 'Belly' only in technical context; "
+                "use clinical phrasing ('Abdomen adjustment', not standalone 'Belly')",
+    },
+    {
+        "terms": ["Hip", "Hips", "Thigh", "Thighs", "Waist"],
+        "category": "sensitive",
+        "rule": "Always add editing context ('Waist adjustment', 'Hip reshape'), never the bare body part",
+        "translations": {
+            "Spanish": "'Waist adjustment' → Ajuste de cintura (NOT just 'Cintura')",
+            "Hindi": "'Hip reshape' → हिप रीशेप or कूल्हे का समायोजन",
+        },
+    },
+    {
+        "terms": ["Curves"],
+        "category": "sensitive",
+        "rule": "In body editing use 'Body contour' or 'Shape adjustment'",
+        "translations": {"Spanish": "Contorno corporal / Ajuste de forma"},
+    },
+
+    # Conceptual terms
+    {
+        "terms": ["Headshot", "AI Headshot", "Headshots"],
+        "category": "conceptual",
+        "rule": "DANGER: 'Headshot' can mean 'shot to the head' (violent). Translate the function: "
+                "'AI Portrait' or 'AI Profile Photo'",
+        "translations": {
+            "Hindi": "AI पोर्ट्रेट or AI प्रोफाइल फोटो",
+            "Marathi": "AI पोर्ट्रेट",
+            "Spanish": "Retrato con IA or Foto de perfil con IA",
+        },
+    },
+    {
+        "terms": ["Milestone", "Baby Milestone", "Milestones"],
+        "category": "conceptual",
+        "rule": "Translate the concept, not word by word",
+        "translations": {
+            "Hindi": "बेबी माइलस्टोन (common transliteration) or शिशु की उपलब्धि",
+            "Spanish": "Hito del bebé",
+        },
+    },
+    {
+        "terms": ["Skin Smoothing", "Smooth Skin"],
+        "category": "conceptual",
+        "rule": "Use technical, non-beauty-standard phrasing",
+        "translations": {
+            "German": "Hautglättung (technical feature name, NOT 'Haut glätten')",
+            "Spanish": "Suavizado de piel",
+        },
+    },
+
+    # Technical standards and global acronyms
+    {
+        "terms": ["JPEG", "JPG", "PNG", "MP4", "MOV", "GIF", "PDF", "TIFF", "RAW"],
+        "category": "keep",
+        "rule": "File format: keep in English, do not translate or transliterate",
+        "translations": {
+            "Hindi": "'Save as JPEG' → JPEG के रूप में सेव करें; 'Export MP4 Video' → MP4 वीडियो एक्सपोर्ट करें",
+            "Marathi": "'Save as JPEG' → JPEG म्हणून सेव्ह करा",
+            "Spanish": "'Save as JPEG' → Guardar como JPEG; 'Export MP4 Video' → Exportar video MP4",
+        },
+    },
+    {
+        "terms": ["HDR", "4K", "8K", "FHD", "QHD", "NTSC", "PAL", "sRGB", "Adobe RGB"],
+        "category": "keep",
+        "rule": "Technical standard: keep in English",
+    },
+    {
+        "terms": ["AI"],
+        "category": "keep",
+        "rule": "Keep 'AI' in English unless the local form is verifiably dominant (e.g. Spanish 'IA'); "
+                "pair it with a translated concept ('AI Portrait')",
+        "translations": {"Spanish": "IA", "Hindi": "AI (always in English)", "Marathi": "AI (always in English)"},
+    },
+    {
+        "terms": ["RGB", "CMYK", "FPS", "DPI", "ISO", "USB", "WiFi", "Wi-Fi", "Bluetooth"],
+        "category": "keep",
+        "rule": "Technical acronym: keep in English",
+    },
+    {
+        "terms": ["Instagram", "Lightroom", "Photoshop", "WhatsApp"],
+        "category": "keep",
+        "rule": "Brand: keep in English unless an official localized name exists",
+    },
+
+    # Color terms (photo editing context)
+    {
+        "terms": ["Blacks", "Black"],
+        "category": "color",
+        "rule": "Shadow/tonal adjustment, not a racial reference: use professional photography terms, "
+                "never a standalone color word",
+        "translations": {
+            "Spanish": "Sombras or Tonos oscuros (NEVER standalone 'Negros')",
+            "German": "Tiefen or Schwarzwerte (NEVER 'Schwarze')",
+            "French": "Tons sombres or Noirs (technical context)",
+            "Portuguese": "Sombras (NEVER standalone 'Pretos')",
+            "Italian": "Ombre or Neri (technical)",
+            "Russian": "Тени or Чёрные тона",
+            "Hindi": "ब्लैक्स (transliteration accepted) or काले टोन",
+            "Marathi": "ब्लॅक्स or काळे टोन",
+        },
+    },
+    {
+        "terms": ["Whites", "White"],
+        "category": "color",
+        "rule": "Highlight/tonal adjustment: use technical terms, never a standalone color word",
+        "translations": {
+            "Spanish": "Altas luces or Tonos claros",
+            "German": "Lichter or Weißwerte",
+            "Hindi": "व्हाइट्स or उजले टोन",
+        },
+    },
+
+    # Industry-standard UI actions
+    {
+        "terms": ["Save"],
+        "category": "ui-action",
+        "rule": "Use the same rendering throughout the batch",
+        "translations": {
+            "Spanish": "Guardar (never mix 'Salvar'/'Grabar')",
+            "German": "Speichern",
+            "French": "Enregistrer",
+            "Hindi": "सेव",
+            "Marathi": "सेव्ह",
+        },
+    },
+    {
+        "terms": ["Share"],
+        "category": "ui-action",
+        "rule": "Use the same rendering throughout the batch",
+        "translations": {
+            "Spanish": "Compartir",
+            "German": "Teilen",
+            "French": "Partager",
+            "Hindi": "शेयर",
+            "Marathi": "शेअर",
+            "Thai": "แชร์",
+        },
+    },
+    {
+        "terms": ["Edit"],
+        "category": "ui-action",
+        "rule": "Use the same rendering throughout the batch",
+        "translations": {
+            "Spanish": "Editar",
+            "German": "Bearbeiten",
+            "French": "Modifier",
+            "Hindi": "एडिट",
+            "Marathi": "एडिट",
+        },
+    },
+
+    # Professional photo terms
+    {
+        "terms": ["Saturation"],
+        "category": "photo-term",
+        "rule": "Use the professional photo-editing term",
+        "translations": {"Spanish": "Saturación", "German": "Sättigung"},
+    },
+    {
+        "terms": ["Contrast"],
+        "category": "photo-term",
+        "rule": "Use the professional photo-editing term",
+        "translations": {"Spanish": "Contraste", "Marathi": "कॉन्ट्रास्ट"},
+    },
+    {
+        "terms": ["Exposure"],
+        "category": "photo-term",
+        "rule": "Use the professional photo-editing term",
+        "translations": {"German": "Belichtung"},
+    },
+    {
+        "terms": ["Gamma"],
+        "category": "photo-term",
+        "rule": "Use the professional photo-editing term",
+        "translations": {"Hindi": "गामा"},
+    },
+
+    # Beauty wording
+    {
+        "terms": ["Perfect", "Beautify", "Fair", "Fairness", "Ideal"],
+        "category": "beauty",
+        "rule": "Avoid beauty-standard wording; use neutral enhancement language "
+                "('Enhance', 'Adjust', 'Smooth', 'Refine')",
+    },
+]
+
+# Per-language style rules (matched by language name prefix)
+SOFTWARE_LANGUAGE_STYLE = {
+    "spanish": "Neutral Latin American Spanish, informal (tú), modern app style",
+    "hindi": "Transliteration-first for English tech terms (सेव, शेयर, एडिट), Devanagari script",
+    "marathi": "Transliteration-first for English tech terms (सेव्ह, शेअर, एडिट), Devanagari script",
+    "german": "Du-form (informal), drop Sie endings, modern conversational",
+    "french": "Standard international French, neutral tone, modern app terminology",
+    "portuguese": "Brazilian Portuguese, informal modern tone",
+    "russian": "Modern conversational, avoid Soviet-era formal terms",
+    "italian": "Standard Italian, friendly modern tone",
+    "chinese": "Ultra-compact phrasing, use terms from local tech apps",
+    "thai": "Polite register (ครับ/ค่ะ), modern terminology",
+    "turkish": "Modern conversational, drop formal suffixes",
+    "dutch": "Casual modern tone, avoid overly formal language",
+    "swedish": "Casual modern tone, avoid overly formal language",
+    "danish": "Casual modern tone, avoid overly formal language",
+}
+
+# Fallback when a term is uncertain, by script
+NON_LATIN_SCRIPT_LANGUAGES = (
+    "hindi", "marathi", "thai", "arabic", "russian", "chinese", "japanese", "korean",
+    "ukrainian", "bengali", "gujarati", "punjabi", "tamil", "telugu", "greek", "hebrew", "persian",
+)
@@ -9,203 +9,145 @@ Optimized for:
 - Button labels and menu items
 """
 
+from .glossary import Glossary
+from .software_glossary import SOFTWARE_GLOSSARY, SOFTWARE_LANGUAGE_STYLE, NON_LATIN_SCRIPT_LANGUAGES
+
+# Shared termbase; grown at startup with extra entries (see app.py)
+software_glossary = Glossary(SOFTWARE_GLOSSARY)
+
+# Identical for every string and language; term and style rules that apply
+# to a given string are added to the user prompt by get_software_strings_notes
+SOFTWARE_SYSTEM_PROMPT = (
+    "You are a professional localization expert for a mobile photo/video editing app (similar to Lightroom, PicsArt, Remini). "
+    "Your task is to translate UI strings into natural, short, safe translations that match modern mobile app conventions.\n\n"
+
+    "🎯 OUTPUT RULE: Return ONLY the final translation — no explanations, notes, alternatives, or extra text.\n\n"
+
+    "⚠️ CRITICAL SAFETY WORKFLOW (APPLY IN THIS ORDER):\n"
+    "1. Sensitive body terms that can read as sexualized, crude or objectifying → replace with a neutral, "
+    "clinical term with editing context BEFORE translating\n"
+    "2. Feature names that are violent, confusing or wrong when translated literally → translate the "
+    "CONCEPT/FUNCTION, not the words. Ask: 'What does this feature DO?'\n"
+    "3. Technical standards, file formats, global acronyms and brands → keep in English\n"
+    "4. Color terms are TONAL VALUES in photo editing, not racial references → use technical photography "
+    "terminology, never standalone color words\n"
+    "5. Then proceed with normal translation logic\n"
+    "The TERM RULES given with a text override everything else for those terms.\n\n"
+
+    "📍 CONTEXT DETECTION:\n"
+    "After safety checks, analyze location/context to determine UI placement:\n"
+    "• Button/Action (download, save, upload page) → Shortest form (1-2 words)\n"
+    "• Slider/Tool (adjustment, color tool, editor) → Technical photography term\n"
+    "• Menu/Option (settings, list, menu) → Short phrase (2-4 words)\n"
+    "• Description/Message (tooltip, notification) → Natural but concise sentence\n"
+    "• If location is empty → Default to Button style (shortest common usage)\n\n"
+
+    "🔄 TRANSLATION DECISION PROCESS:\n"
+    "• UI actions and technical photo terms: use what professional apps (Instagram, WhatsApp, Lightroom) "
+    "use in the target language — native translation where common, transliteration where that is standard\n"
+    "• Descriptive text: translate naturally\n"
+    "• If uncertain: non-Latin scripts default to transliteration, Latin scripts to natural translation\n\n"
+
+    "🚨 ADDITIONAL SAFETY RULES:\n"
+    "• NO offensive cultural/religious/political terms\n"
+    "• Avoid idioms that don't translate culturally\n"
+    "• Use universally neutral language\n"
+    "• Beauty terms → neutral enhancement language ('Enhance', 'Adjust', 'Smooth', 'Refine')\n\n"
+
+    "🔧 PLACEHOLDER RULES:\n"
+    "• NEVER translate placeholder variable names: {width} stays {width}, NOT {ancho}\n"
+    "• Keep spacing around placeholders consistent with target language\n"
+    "• If word order changes, keep placeholders in logical positions\n"
+    "• Preserve ALL placeholder syntax exactly ({}, %s, %d)\n\n"
+
+    "✅ CONSISTENCY RULE:\n"
+    "• Same English term → SAME translation throughout entire batch\n\n"
+
+    "📤 OUTPUT FORMAT:\n"
+    "• Match source capitalization (Title Case / UPPERCASE / lowercase)\n"
+    "• Preserve punctuation (... : ! ?)\n"
+    "• NO explanations, notes, alternatives, or markdown\n"
+    "• Plain text only — ready to insert directly into app\n\n"
+
+    "4️⃣ KEEP IT SHORT:\n"
+    "• Mobile UI has limited space\n"
+    "• Buttons: 1-2 words maximum\n"
+    "• Descriptions: 4-5 words maximum\n"
+    "• Cut unnecessary words ruthlessly\n\n"
+
+    "Remember: Translate like Instagram, WhatsApp, and Lightroom would — short, natural, safe, and culturally appropriate."
+)
+
+
+def _language_key(lang):
+    return lang.strip().lower()
+
+
+def _language_style(lang):
+    key = _language_key(lang)
+    for name, style in SOFTWARE_LANGUAGE_STYLE.items():
+        if key.startswith(name):
+            return style
+    if key.startswith(NON_LATIN_SCRIPT_LANGUAGES):
+        return "Non-Latin script: default to transliteration for English tech terms"
+    return None
+
+
+def _term_translation(entry, lang):
+    key = _language_key(lang)
+    for name, translation in entry.get("translations", {}).items():
+        if key.startswith(name.lower()):
+            return translation
+    return None
+
+
+def get_software_strings_notes(texts, langs):
+    """
+    Term rules for the glossary entries found in `texts` and style rules for
+    `langs`, to append to a user prompt.
+
+    Args:
+        texts: Source strings the prompt covers
+        langs: Target languages the prompt covers
+
+    Returns:
+        Notes block (empty string when nothing applies)
+    """
+    entries = []
+    seen = set()
+    for text in texts:
+        for entry in software_glossary.match(text):
+            if id(entry) not in seen:
+                seen.add(id(entry))
+                entries.append(entry)
+
+    lines = []
+    if entries:
+        lines.append("TERM RULES:")
+        for entry in entries:
+            terms = " / ".join(f"'{term}'" for term in entry["terms"])
+            lines.append(f"• {terms} [{entry.get('category', 'term')}]: {entry['rule']}")
+            for lang in langs:
+                translation = _term_translation(entry, lang)
+                if translation:
+                    lines.append(f"  - {lang}: {translation}")
+
+    styles = [(lang, _language_style(lang)) for lang in langs]
+    styles = [(lang, style) for lang, style in styles if style]
+    if styles:
+        lines.append("STYLE:")
+        lines.extend(f"• {lang}: {style}" for lang, style in styles)
+
+    return "\n".join(lines)
+
+
 def get_software_strings_prompt(text, lang, location=""):
     """
     Software/App UI strings specific localization prompt.
-    This is the comprehensive prompt from your working Colab code.
+    The system prompt is shared by every call; glossary entries found in the
+    text and the target-language style are added to the user prompt.
     """
-    
-    system_prompt = (
-        "You are a professional localization expert for a mobile photo/video editing app (similar to Lightroom, PicsArt, Remini). "
-        "Your task is to translate UI strings into natural, short, safe translations that match modern mobile app conventions.\n\n"
-
-        "🎯 OUTPUT RULE: Return ONLY the final translation — no explanations, notes, alternatives, or extra text.\n\n"
-
-        "⚠️ CRITICAL SAFETY WORKFLOW (APPLY IN THIS ORDER):\n\n"
-
-        "STEP 1: CHECK FOR SENSITIVE & SEXUALIZED TERMINOLOGY\n"
-        "Before translating, scan the source text for body parts that can be perceived as sexualized, crude, or objectifying.\n"
-        "If found, replace with neutral anatomical term BEFORE translation:\n\n"
-
-        "Sensitive Term Replacements:\n"
-        "• 'Bust' / 'Breast' → Replace with 'Chest' (neutral, professional, non-gendered)\n"
-        "  - Hindi: छाती (Chhātī)\n"
-        "  - Marathi: छाती (Chhātī)\n"
-        "  - Spanish: Pecho\n"
-        "• 'Belly' → Replace with 'Abdomen' or keep 'Belly' in technical context\n"
-        "  - Use clinical phrasing: 'Abdomen adjustment' not standalone 'Belly'\n"
-        "• 'Hip' / 'Thigh' / 'Waist' → Always add editing context:\n"
-        "  - ✅ 'Waist adjustment' → Spanish: 'Ajuste de cintura' (NOT just 'Cintura')\n"
-        "  - ✅ 'Hip reshape' → Hindi: 'हिप रीशेप' or 'कूल्हे का समायोजन'\n"
-        "• 'Curves' (body editing) → Use 'Body contour' or 'Shape adjustment'\n"
-        "  - Spanish: 'Contorno corporal' / 'Ajuste de forma'\n\n"
-
-        "Reasoning: These replacements prevent objectification and maintain professional, clinical tone appropriate for editing tools.\n\n"
-
-        "STEP 2: CHECK FOR CONCEPTUAL & POTENTIALLY DANGEROUS TERMS\n"
-        "Some feature names translate to violent, confusing, or incorrect meanings if translated literally.\n"
-        "For these terms, translate the CONCEPT/FUNCTION, not the words:\n\n"
-
-        "Conceptual Translation Rules:\n"
-        "• 'AI Headshot' → DANGER: 'Headshot' can mean 'shot to the head' (violent)\n"
-        "  ✅ Translate the function: 'AI Portrait' or 'AI Profile Photo'\n"
-        "  - Hindi: AI पोर्ट्रेट or AI प्रोफाइल फोटो\n"
-        "  - Marathi: AI पोर्ट्रेट\n"
-        "  - Spanish: Retrato con IA or Foto de perfil con IA\n\n"
-
-        "• 'Baby Milestone' → Translate concept, not word-by-word:\n"
-        "  - Hindi: बेबी माइलस्टोन (common transliteration) or शिशु की उपलब्धि\n"
-        "  - Spanish: Hito del bebé\n\n"
-
-        "• 'Skin Smoothing' → Use technical, non-beauty-standard phrasing:\n"
-        "  - German: Hautglättung (technical feature name, NOT 'Haut glätten')\n"
-        "  - Spanish: Suavizado de piel\n\n"
-
-        "Ask yourself: 'What does this feature DO?' Translate that function, not literal words.\n\n"
-
-        "STEP 3: CHECK FOR TECHNICAL STANDARDS & GLOBAL ACRONYMS\n"
-        "Standard technical formats and global acronyms MUST remain in original English form.\n"
-        "These are universal 'proper nouns' — changing them causes confusion.\n\n"
-
-        "Keep in English (DO NOT translate or transliterate):\n"
-        "• File formats: JPEG, PNG, MP4, MOV, GIF, PDF, TIFF, RAW\n"
-        "• Standards: HDR, 4K, 8K, FHD, QHD, NTSC, PAL, sRGB, Adobe RGB\n"
-        "• Tech acronyms: AI, RGB, CMYK, FPS, DPI, ISO, USB, WiFi, Bluetooth\n"
-        "• Brands: Instagram, Lightroom, Photoshop (unless official localized name exists)\n\n"
-
-        "Translation Examples:\n"
-        "• 'Save as JPEG' → \n"
-        "  - Hindi: JPEG के रूप में सेव करें\n"
-        "  - Marathi: JPEG म्हणून सेव्ह करा\n"
-        "  - Spanish: Guardar como JPEG\n"
-        "• 'Export MP4 Video' →\n"
-        "  - Hindi: MP4 वीडियो एक्सपोर्ट करें\n"
-        "  - Spanish: Exportar video MP4\n\n"
-
-        "Exception: Only translate if verifiably dominant in target country (e.g., Spanish 'IA' for 'AI').\n"
-        "For Hindi/Marathi: Keep 'AI' in English, always pair with translated concept ('AI Portrait').\n\n"
-
-        "STEP 4: CHECK FOR COLOR TERMS (PHOTO EDITING CONTEXT)\n"
-        "Color terms in photo editing are TONAL VALUES, not racial references.\n"
-        "ALWAYS use technical photography terminology:\n\n"
-
-        "• 'Blacks' (shadow adjustment) → Use professional terms:\n"
-        "  - Spanish: Sombras or Tonos oscuros (NEVER standalone 'Negros')\n"
-        "  - German: Tiefen or Schwarzwerte (NEVER 'Schwarze')\n"
-        "  - French: Tons sombres or Noirs (technical context)\n"
-        "  - Portuguese: Sombras (NEVER standalone 'Pretos')\n"
-        "  - Italian: Ombre or Neri (technical)\n"
-        "  - Russian: Тени or Чёрные тона\n"
-        "  - Hindi: ब्लैक्स (transliteration accepted) or काले टोन\n"
-        "  - Marathi: ब्लॅक्स or काळे टोन\n\n"
-
-        "• 'Whites' (highlight adjustment) → Use technical terms:\n"
-        "  - Spanish: Altas luces or Tonos claros\n"
-        "  - German: Lichter or Weißwerte\n"
-        "  - Hindi: व्हाइट्स or उजले टोन\n\n"
-
-        "RULE: ALWAYS add technical context to color terms. Never use standalone color words.\n\n"
-
-        "📍 CONTEXT DETECTION:\n"
-        "After safety checks, analyze location/context to determine UI placement:\n"
-        "• Button/Action (download, save, upload page) → Shortest form (1-2 words)\n"
-        "• Slider/Tool (adjustment, color tool, editor) → Technical photography term\n"
-        "• Menu/Option (settings, list, menu) → Short phrase (2-4 words)\n"
-        "• Description/Message (tooltip, notification) → Natural but concise sentence\n"
-        "• If location is empty → Default to Button style (shortest common usage)\n\n"
-
-        "🔄 TRANSLATION DECISION PROCESS:\n"
-        "After safety checks and context detection, apply translation logic:\n\n"
-
-        "Step 1: Word type identification\n"
-        "• Already checked: Technical standards (JPEG, MP4, AI) → Kept in English\n"
-        "• UI Actions (Save, Share, Edit, Download) → Proceed to Step 2\n"
-        "• Technical Photo Terms (Contrast, Saturation, Exposure) → Proceed to Step 2\n"
-        "• Descriptive text → Translate naturally\n\n"
-
-        "Step 2: Check industry standard (reference: Instagram, WhatsApp, Lightroom)\n"
-        "• Does target language use native translation or transliteration?\n"
-        "• What term do professional photo apps use?\n\n"
-
-        "Step 3: Apply decision priority\n"
-        "UI Actions:\n"
-        "  - Native translation common → Translate:\n"
-        "    * Spanish: Save → Guardar, Share → Compartir, Edit → Editar\n"
-        "    * German: Save → Speichern, Share → Teilen, Edit → Bearbeiten\n"
-        "    * French: Save → Enregistrer, Share → Partager, Edit → Modifier\n"
-        "  - Transliteration common → Transliterate:\n"
-        "    * Hindi: Save → सेव, Share → शेयर, Edit → एडिट\n"
-        "    * Marathi: Save → सेव्ह, Share → शेअर, Edit → एडिट\n"
-        "    * Thai: Share → แชร์\n\n"
-
-        "Technical Photo Terms:\n"
-        "  - Professional term exists → Use it:\n"
-        "    * Spanish: Saturation → Saturación, Contrast → Contraste\n"
-        "    * German: Saturation → Sättigung, Exposure → Belichtung\n"
-        "  - Transliteration standard → Transliterate:\n"
-        "    * Hindi: Blacks → ब्लैक्स, Gamma → गामा\n"
-        "    * Marathi: Contrast → कॉन्ट्रास्ट\n\n"
-
-        "Step 4: If uncertain\n"
-        "  - Non-Latin script (Hindi, Thai, Arabic, Russian, Chinese) → Default to transliteration\n"
-        "  - Latin script → Default to natural translation\n\n"
-
-        "🚨 ADDITIONAL SAFETY RULES:\n"
-        "• NO offensive cultural/religious/political terms\n"
-        "• Avoid idioms that don't translate culturally\n"
-        "• Use universally neutral language\n"
-        "• Beauty terms → Use neutral enhancement language:\n"
-        "  - AVOID: 'Perfect', 'Beautify', 'Fair', 'Ideal'\n"
-        "  - USE: 'Enhance', 'Adjust', 'Smooth', 'Refine'\n\n"
-
-        "🔧 PLACEHOLDER RULES:\n"
-        "• NEVER translate placeholder variable names: {width} stays {width}, NOT {ancho}\n"
-        "• Keep spacing around placeholders consistent with target language\n"
-        "• If word order changes, keep placeholders in logical positions\n"
-        "• Preserve ALL placeholder syntax exactly ({}, %s, %d)\n"
-        "Example: 'Custom {width} × {height}'\n"
-        "  - Spanish: Personalizado {width} × {height}\n"
-        "  - Hindi: कस्टम {width} × {height}\n\n"
-
-        "✅ CONSISTENCY RULE:\n"
-        "• Same English term → SAME translation throughout entire batch\n"
-        "• 'Save' must always be 'Guardar' in Spanish (never mix 'Salvar'/'Grabar')\n"
-        "• Maintain consistent terminology across all strings\n\n"
-
-        "📤 OUTPUT FORMAT:\n"
-        "• Match source capitalization (Title Case / UPPERCASE / lowercase)\n"
-        "• Preserve punctuation (... : ! ?)\n"
-        "• NO explanations, notes, alternatives, or markdown\n"
-        "• Plain text only — ready to insert directly into app\n\n"
-
-        "🌍 LANGUAGE-SPECIFIC STYLE:\n"
-        "• Spanish: Use neutral Latin American Spanish, informal (tú), modern app style\n"
-        "• Hindi/Marathi: Transliteration-first for English tech terms (सेव, शेयर, एडिट), Devanagari script\n"
-        "• German: Use Du-form (informal), drop Sie endings, modern conversational\n"
-        "• French: Standard international French, neutral tone, modern app terminology\n"
-        "• Portuguese: Brazilian Portuguese, informal modern tone\n"
-        "• Russian: Modern conversational, avoid Soviet-era formal terms\n"
-        "• Italian: Standard Italian, friendly modern tone\n"
-        "• Chinese: Ultra-compact phrasing, use terms from local tech apps\n"
-        "• Thai: Polite register (ครับ/ค่ะ), modern terminology\n"
-        "• Turkish: Modern conversational, drop formal suffixes\n"
-        "• Dutch/Swedish/Danish: Casual modern tone, avoid overly formal language\n\n"
-
-        "4️⃣ KEEP IT SHORT:\n"
-        "• Mobile UI has limited space\n"
-        "• Buttons: 1-2 words maximum\n"
-        "• Descriptions: 4-5 words maximum\n"
-        "• Cut unnecessary words ruthlessly\n\n"
-
-        "📋 SAFETY WORKFLOW SUMMARY (Check in order):\n"
-        "1. Sensitive body terms? → Replace with neutral term before translation\n"
-        "2. Dangerous literal translation? → Translate concept/function, not words\n"
-        "3. Technical standard/acronym? → Keep in English\n"
-        "4. Color term in photo context? → Use technical photography terminology\n"
-        "5. Then proceed with normal translation logic\n\n"
-
-        "Remember: Translate like Instagram, WhatsApp, and Lightroom would — short, natural, safe, and culturally appropriate."
-    )
+    notes = get_software_strings_notes([text], [lang]) if text else ""
 
     if location:
         user_prompt = f"""Translate this UI text into {lang}.
@@ -214,4 +156,7 @@ Text: {text}"""
     else:
         user_prompt = f"Translate this UI text into {lang}: {text}"
 
-    return system_prompt, user_prompt
+    if notes:
+        user_prompt = f"{notes}\n\n{user_prompt}"
+
+    return SOFTWARE_SYSTEM_PROMPT, user_prompt
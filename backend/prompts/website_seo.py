@@ -63,7 +63,7 @@ Your task is to translate web content that ranks well in local search engines an
    • Consider local competitors
    • Use region-specific examples
 
-8. LANGUAGE-SPECIFIC WEB STYLE:
+🌍 LANGUAGE-SPECIFIC WEB STYLE:
    • Spanish: SEO keywords often different from spoken Spanish
    • German: Compound words common in searches
    • French: Formal web French vs casual social French
@@ -71,35 +71,35 @@ Your task is to translate web content that ranks well in local search engines an
    • Chinese: Simplified for mainland, Traditional for Taiwan/HK
    • Russian: Consider Cyrillic keyboard patterns
 
-9. E-COMMERCE SPECIFICS:
+8. E-COMMERCE SPECIFICS:
    • Product titles: Keyword-rich, descriptive
    • Product descriptions: Benefits + features
    • Price formatting: Local currency conventions
    • Shipping/returns: Clear local terminology
 
-10. BLOG/ARTICLE CONTENT:
-    • Maintain natural reading flow
-    • Keep expert tone if technical content
-    • Preserve author voice where possible
-    • Adapt examples to local context
+9. BLOG/ARTICLE CONTENT:
+   • Maintain natural reading flow
+   • Keep expert tone if technical content
+   • Preserve author voice where possible
+   • Adapt examples to local context
 
-11. LANDING PAGE ELEMENTS:
+10. LANDING PAGE ELEMENTS:
     • Headlines: Benefit-focused, attention-grabbing
     • Subheadlines: Support main message
     • Bullet points: Scannable benefits
     • Social proof: Localize numbers appropriately
 
-12. LEGAL/COMPLIANCE:
+11. LEGAL/COMPLIANCE:
     • Privacy policy: Use local legal terminology
     • Terms of service: Formal, precise language
     • Cookie notices: Match local regulations (GDPR, etc.)
 
-13. NAVIGATION:
+12. NAVIGATION:
     • Menu items: Short, clear, consistent
     • Breadcrumbs: Logical path translation
     • Footer links: Standard web conventions
 
-14. PRESERVE:
+13. PRESERVE:
     • Brand names and trademarks
     • Technical specifications
     • Model numbers and codes
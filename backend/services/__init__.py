@@ -0,0 +1,75 @@
+"""
+Service module for Localizer backend.
+Shared building blocks used by the API endpoints (caching, pacing, etc.).
+"""
+
+from .translation_memory import TranslationMemory, prompt_hash
+from .fuzzy_index import FuzzyIndex
+from .shared_limiter import SharedRateLimiter, load_tenant_quotas
+from .tokens import estimate_tokens, estimate_messages_tokens
+from .metrics import Counters
+from .packing import (
+    plan_packs, packed_max_tokens, parse_packed_reply, fan_in_max_tokens, parse_multi_language_reply,
+    load_json_reply
+)
+from .qa_chunking import plan_qa_chunks, qa_max_tokens
+from .qa_rules import check_entry, check_table, select_cells_for_review
+from .templates import split_template, template_key, substitute_values, plural_category
+from .router import ModelRouter, Route, load_routes
+from .concurrency import AIMDLimiter, INTERACTIVE, BULK
+from .upstream import (
+    ResilientClient, AsyncResilientClient, CircuitBreaker, CircuitOpenError, build_http_client,
+    build_async_http_client
+)
+from .hedging import LatencyTracker, Hedger
+from .singleflight import SingleFlight
+from .admission import AdmissionQueue, Overloaded
+from .cancellation import Cancelled, peer_closed
+from .jobs import JobStore, JobManager
+
+__all__ = [
+    'TranslationMemory',
+    'prompt_hash',
+    'FuzzyIndex',
+    'SharedRateLimiter',
+    'load_tenant_quotas',
+    'estimate_tokens',
+    'estimate_messages_tokens',
+    'Counters',
+    'plan_packs',
+    'packed_max_tokens',
+    'parse_packed_reply',
+    'fan_in_max_tokens',
+    'parse_multi_language_reply',
+    'load_json_reply',
+    'plan_qa_chunks',
+    'qa_max_tokens',
+    'check_entry',
+    'check_table',
+    'select_cells_for_review',
+    'split_template',
+    'template_key',
+    'substitute_values',
+    'plural_category',
+    'ModelRouter',
+    'Route',
+    'load_routes',
+    'AIMDLimiter',
+    'INTERACTIVE',
+    'BULK',
+    'ResilientClient',
+    'AsyncResilientClient',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'build_http_client',
+    'build_async_http_client',
+    'LatencyTracker',
+    'Hedger',
+    'SingleFlight',
+    'AdmissionQueue',
+    'Overloaded',
+    'Cancelled',
+    'peer_closed',
+    'JobStore',
+    'JobManager',
+]
@@ -0,0 +1,109 @@
+"""
+Admission Control
+
+Bounded queues in front of the translate, batch and verify endpoints.
+Admitted requests wait for upstream capacity in the limiters; a request is
+turned away (429 + Retry-After) instead when the work already admitted
+ahead of it would take longer than the queue's latency budget to drain, or
+when the queue is at its request cap.
+
+Work is counted in estimated upstream calls and drained at the estimated
+upstream call rate (see the `capacity` callable), so the wait adapts as the
+concurrency limit and upstream latency move.
+"""
+
+import math
+import threading
+
+
+class Overloaded(RuntimeError):
+    """Raised by admit() when a request is shed; retry_after is in seconds"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionQueue:
+    """
+    Bounded admission for one group of endpoints.
+
+    Args:
+        name: Queue name (used in errors and metrics)
+        capacity: Callable returning the upstream calls per second this queue drains at
+        latency_budget: Longest estimated wait (seconds) a new request is admitted behind
+        max_pending: Most requests admitted at once
+    """
+
+    def __init__(self, name, capacity, latency_budget=5.0, max_pending=256):
+        self.name = name
+        self.capacity = capacity
+        self.latency_budget = latency_budget
+        self.max_pending = max_pending
+        self._pending = 0
+        self._pending_calls = 0
+        self._lock = threading.Lock()
+        self._counters = {'admitted': 0, 'shed': 0, 'completed': 0}
+
+    def admit(self, calls=1):
+        """
+        Admit a request worth `calls` upstream calls, or raise Overloaded.
+        A request is always admitted into an empty queue, however large.
+
+        Returns:
+            Ticket; release() it (or use it as a context manager) when the request ends
+        """
+        rate = max(self.capacity(), 1e-6)
+        with self._lock:
+            wait = self._pending_calls / rate
+            if self._pending and (self._pending >= self.max_pending or wait > self.latency_budget):
+                self._counters['shed'] += 1
+                # Until enough of the backlog drains to fit the budget again
+                retry_after = max(1, math.ceil(wait - self.latency_budget))
+                raise Overloaded(f'Server busy ({self.name} queue full), retry in {retry_after}s', retry_after)
+            self._pending += 1
+            self._pending_calls += calls
+            self._counters['admitted'] += 1
+        return Ticket(self, calls)
+
+    def stats(self):
+        rate = max(self.capacity(), 1e-6)
+        with self._lock:
+            counters = dict(self._counters)
+            counters.update({
+                'depth': self._pending,
+                'pending_calls': self._pending_calls,
+                'estimated_wait': round(self._pending_calls / rate, 2),
+                'latency_budget': self.latency_budget,
+                'max_pending': self.max_pending,
+            })
+        return counters
+
+    def _release(self, calls):
+        with self._lock:
+            self._pending -= 1
+            self._pending_calls -= calls
+            self._counters['completed'] += 1
+
+
+class Ticket:
+    """An admitted request; releasing it more than once is harmless"""
+
+    def __init__(self, queue, calls):
+        self._queue = queue
+        self._calls = calls
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._queue._release(self._calls)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,37 @@
+"""
+Cancellation
+
+Long runs (batches, table streams, QA, jobs) take a `should_stop` callable
+and poll it before every upstream call, so once nobody is waiting for the
+result no new calls are made. Calls already in flight finish, and their
+results still land in the translation memory.
+
+- Cancelled: raised in place of an upstream call that should not be made
+- peer_closed(): whether a client closed its connection, for WSGI servers
+  that expose the socket (werkzeug.socket, gunicorn.socket)
+"""
+
+import select
+import socket
+
+
+class Cancelled(RuntimeError):
+    """Raised instead of making an upstream call after should_stop() turned True"""
+
+
+def peer_closed(sock):
+    """
+    Whether the client has closed its end of `sock`, without consuming data.
+    The request body must have been read already.
+    """
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        # Readable with nothing to read means EOF
+        return sock.recv(1, socket.MSG_PEEK) == b''
+    except ValueError:
+        # TLS sockets cannot peek; assume the client is still there
+        return False
+    except OSError:
+        return True
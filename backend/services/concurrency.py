@@ -0,0 +1,264 @@
+"""
+Adaptive Concurrency
+
+AIMD limit on upstream calls in flight, shared by every endpoint:
+- additive increase while calls succeed and the limit is actually used
+- multiplicative decrease on overload (429, 503/504, timeouts) or when
+  latency per output token inflates well above its running baseline
+
+Worker pools can then be sized generously; the limiter decides how many of
+their threads talk to the upstream at any moment. Coroutines share the same
+limit through acquire_async() / async_slot().
+
+Calls come in two priority lanes. A share of the limit is reserved for the
+interactive lane (a translator waiting on one string), and bulk calls
+(batches, tables, QA, jobs) only start while no interactive call is waiting,
+so bulk work uses whatever capacity is left and is the first to be held back.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+# Outcomes reported on release
+SUCCESS = 'success'
+OVERLOAD = 'overload'
+IGNORED = 'ignored'
+
+# Priority lanes
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+
+
+class AIMDLimiter:
+    """
+    Additive-increase / multiplicative-decrease limit on calls in flight.
+
+    Args:
+        initial: Starting limit
+        min_limit: Lower bound of the limit
+        max_limit: Upper bound of the limit
+        increase: Limit added per full window of successful calls
+        decrease: Factor applied to the limit on congestion
+        latency_tolerance: Latency over this multiple of the baseline counts as congestion
+        min_samples: Latency samples needed before latency inflation is acted on
+        interactive_reserve: Share of the limit bulk calls may not use
+    """
+
+    def __init__(self, initial=8, min_limit=1, max_limit=64, increase=1.0, decrease=0.5,
+                 latency_tolerance=2.0, min_samples=10, interactive_reserve=0.25):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.min_samples = min_samples
+        self.interactive_reserve = interactive_reserve
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self._in_flight = 0
+        self._baseline = None
+        self._samples = 0
+        self._last_decrease = float('-inf')
+        self._in_flight_by_lane = {INTERACTIVE: 0, BULK: 0}
+        self._waiting = {INTERACTIVE: 0, BULK: 0}
+        self._counters = {
+            'increases': 0, 'decreases': 0, 'overloads': 0, 'latency_backoffs': 0,
+            'interactive_waits': 0, 'bulk_waits': 0,
+        }
+        self._condition = threading.Condition()
+        self._async_waiters = []
+
+    @property
+    def limit(self):
+        with self._condition:
+            return int(self._limit)
+
+    def acquire(self, lane=INTERACTIVE):
+        """
+        Block until a call in `lane` may start.
+
+        Returns:
+            Start token to pass to release()
+        """
+        with self._condition:
+            if not self._admits(lane):
+                self._counters[f'{lane}_waits'] += 1
+                self._waiting[lane] += 1
+                try:
+                    while not self._admits(lane):
+                        self._condition.wait()
+                finally:
+                    self._waiting[lane] -= 1
+            return self._start(lane)
+
+    async def acquire_async(self, lane=INTERACTIVE):
+        """
+        acquire() for coroutines: waits without blocking the event loop.
+
+        Returns:
+            Start token to pass to release()
+        """
+        loop = asyncio.get_running_loop()
+        waiting = False
+        try:
+            while True:
+                with self._condition:
+                    if self._admits(lane):
+                        if waiting:
+                            self._waiting[lane] -= 1
+                            waiting = False
+                        return self._start(lane)
+                    if not waiting:
+                        self._counters[f'{lane}_waits'] += 1
+                        self._waiting[lane] += 1
+                        waiting = True
+                    waiter = loop.create_future()
+                    self._async_waiters.append((loop, waiter))
+                await waiter
+        finally:
+            if waiting:
+                # Cancelled while queued: bulk calls may have been held back for us
+                with self._condition:
+                    self._waiting[lane] -= 1
+                    waiters = self._notify()
+                _wake_all(waiters)
+
+    def release(self, outcome=SUCCESS, latency=None, started=None, lane=INTERACTIVE):
+        """
+        Finish a call and adjust the limit.
+
+        Args:
+            outcome: SUCCESS, OVERLOAD or IGNORED (errors that say nothing about load)
+            latency: Seconds per unit of work (e.g. per output token), for successes
+            started: Token returned by acquire(); congestion signals from calls
+                     started before the last decrease are not acted on again
+            lane: Lane the call was acquired in
+        """
+        with self._condition:
+            busy = self._in_flight >= int(self._limit) / 2
+            self._in_flight -= 1
+            self._in_flight_by_lane[lane] -= 1
+            stale = started is not None and started < self._last_decrease
+
+            if outcome == OVERLOAD:
+                self._counters['overloads'] += 1
+                if not stale:
+                    self._back_off()
+            elif outcome == SUCCESS:
+                if latency is not None and self._inflated(latency):
+                    self._counters['latency_backoffs'] += 1
+                    if not stale:
+                        self._back_off()
+                elif busy and self._limit < self.max_limit:
+                    # +increase per window of `limit` successes; only while the limit is in use
+                    self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+                    self._counters['increases'] += 1
+            waiters = self._notify()
+        _wake_all(waiters)
+
+    def lane_limit(self, lane):
+        """
+        Most calls `lane` may have in flight under the current limit.
+        """
+        with self._condition:
+            return int(self._limit) - (self._reserved() if lane == BULK else 0)
+
+    @contextmanager
+    def slot(self, lane=INTERACTIVE):
+        """
+        Hold a slot for one call; the body reports through the yielded dict:
+        slot['outcome'] and slot['latency']. Exceptions release as IGNORED
+        unless the body set an outcome.
+        """
+        started = self.acquire(lane)
+        report = {'outcome': None, 'latency': None}
+        try:
+            yield report
+        finally:
+            self.release(report['outcome'] or IGNORED, report['latency'], started, lane)
+
+    @asynccontextmanager
+    async def async_slot(self, lane=INTERACTIVE):
+        """
+        slot() for coroutines.
+        """
+        started = await self.acquire_async(lane)
+        report = {'outcome': None, 'latency': None}
+        try:
+            yield report
+        finally:
+            self.release(report['outcome'] or IGNORED, report['latency'], started, lane)
+
+    def stats(self):
+        with self._condition:
+            counters = dict(self._counters)
+            counters.update({
+                'limit': int(self._limit),
+                'in_flight': self._in_flight,
+                'in_flight_interactive': self._in_flight_by_lane[INTERACTIVE],
+                'in_flight_bulk': self._in_flight_by_lane[BULK],
+                'waiting_interactive': self._waiting[INTERACTIVE],
+                'waiting_bulk': self._waiting[BULK],
+                'reserved': self._reserved(),
+                'baseline_latency': round(self._baseline, 6) if self._baseline is not None else None,
+            })
+        return counters
+
+    def _notify(self):
+        """
+        Wake blocked threads; returns the coroutine waiters to pass to _wake_all()
+        once the lock is released. Caller holds the lock.
+        """
+        self._condition.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        return waiters
+
+    def _admits(self, lane):
+        # Caller holds the lock
+        if lane == BULK:
+            return self._in_flight < int(self._limit) - self._reserved() and self._waiting[INTERACTIVE] == 0
+        return self._in_flight < int(self._limit)
+
+    def _reserved(self):
+        # Caller holds the lock
+        return int(int(self._limit) * self.interactive_reserve)
+
+    def _start(self, lane):
+        # Caller holds the lock
+        self._in_flight += 1
+        self._in_flight_by_lane[lane] += 1
+        return time.monotonic()
+
+    def _back_off(self):
+        # Caller holds the lock
+        self._last_decrease = time.monotonic()
+        self._limit = max(self.min_limit, math.floor(self._limit * self.decrease))
+        self._counters['decreases'] += 1
+
+    def _inflated(self, latency):
+        # Caller holds the lock. The baseline follows drops quickly and rises slowly
+        self._samples += 1
+        if self._baseline is None:
+            self._baseline = latency
+            return False
+        inflated = self._samples > self.min_samples and latency > self._baseline * self.latency_tolerance
+        if latency < self._baseline:
+            self._baseline = (self._baseline + latency) / 2
+        else:
+            self._baseline = self._baseline * 0.99 + latency * 0.01
+        return inflated
+
+
+def _wake_all(waiters):
+    # Releases may come from worker threads, so wake coroutines through their loop
+    for loop, waiter in waiters:
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter):
+    # The waiting coroutine may have been cancelled meanwhile
+    if not waiter.done():
+        waiter.set_result(None)
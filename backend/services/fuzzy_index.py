@@ -0,0 +1,116 @@
+"""
+Fuzzy Translation Memory Index
+
+Near-match lookup over past (source, translation) pairs, for strings that
+differ by a word or two from something already translated:
+- character n-gram MinHash signatures, banded into LSH buckets, find
+  candidates without scanning the memory
+- candidates are ranked by edit similarity of the source strings
+
+Entries are partitioned by scenario, language and location so a match is
+always a translation into the same target.
+"""
+
+import hashlib
+import struct
+import threading
+from difflib import SequenceMatcher
+
+# One 64-byte blake2b digest yields 32 16-bit min-hash values
+_VALUES_PER_DIGEST = 32
+_UNPACK = struct.Struct(f'<{_VALUES_PER_DIGEST}H').unpack
+
+
+class FuzzyIndex:
+    """
+    In-memory MinHash/LSH index.
+
+    Args:
+        num_perm: MinHash signature length
+        bands: LSH bands (num_perm must be a multiple); more bands find
+               less similar candidates
+        ngram: Character n-gram size used for shingling
+        seed: Seed of the hash functions
+    """
+
+    def __init__(self, num_perm=64, bands=16, ngram=3, seed=1):
+        if num_perm % bands or num_perm % _VALUES_PER_DIGEST:
+            raise ValueError(f'num_perm must be a multiple of bands and of {_VALUES_PER_DIGEST}')
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ngram = ngram
+        self._salts = [
+            struct.pack('<II', seed, index) for index in range(num_perm // _VALUES_PER_DIGEST)
+        ]
+        self._entries = []
+        self._positions = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def add(self, partition, source, translation):
+        """
+        Index (source, translation) under a partition key; re-adding a source
+        replaces its translation.
+        """
+        with self._lock:
+            position = self._positions.get((partition, source))
+            if position is not None:
+                self._entries[position] = (source, translation)
+                return
+            position = len(self._entries)
+            self._entries.append((source, translation))
+            self._positions[(partition, source)] = position
+            for band_key in self._band_keys(partition, source):
+                self._buckets.setdefault(band_key, []).append(position)
+
+    def query(self, partition, source, k=3, threshold=0.0):
+        """
+        Top-k near matches of `source` within a partition.
+
+        Returns:
+            List of {"source", "translation", "score"} sorted by score (1.0 = identical)
+        """
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(partition, source):
+                candidates.update(self._buckets.get(band_key, ()))
+            entries = [self._entries[position] for position in candidates]
+
+        matches = []
+        for candidate, translation in entries:
+            score = SequenceMatcher(None, source, candidate, autojunk=False).ratio()
+            if score >= threshold:
+                matches.append({'source': candidate, 'translation': translation, 'score': round(score, 4)})
+        matches.sort(key=lambda match: -match['score'])
+        return matches[:k]
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._positions = {}
+            self._buckets = {}
+
+    def _shingles(self, text):
+        text = ' '.join(text.lower().split())
+        if len(text) <= self.ngram:
+            return {text}
+        return {text[i:i + self.ngram] for i in range(len(text) - self.ngram + 1)}
+
+    def _signature(self, text):
+        signature = []
+        shingles = [shingle.encode('utf-8') for shingle in self._shingles(text)]
+        for salt in self._salts:
+            values = [_UNPACK(hashlib.blake2b(shingle, digest_size=64, salt=salt).digest()) for shingle in shingles]
+            signature.extend(map(min, zip(*values)))
+        return signature
+
+    def _band_keys(self, partition, text):
+        signature = self._signature(text)
+        return [
+            (partition, band, hash(tuple(signature[band * self.rows:(band + 1) * self.rows])))
+            for band in range(self.bands)
+        ]
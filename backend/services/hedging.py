@@ -0,0 +1,169 @@
+"""
+Request Hedging
+
+Cuts tail latency of interactive calls: when a call has not returned by a
+percentile of recently observed latency, a duplicate is sent and whichever
+finishes first wins.
+- LatencyTracker keeps a sliding window of upstream latencies (p50/p95);
+  the upstream client records each attempt into it (latency_tracker), so
+  slot waits, backoff and retries do not inflate the hedge delay
+- Hedger runs calls on a small pool and caps duplicates to a fraction of
+  calls (the hedge budget)
+
+The losing call cannot be interrupted mid-request (the SDK call is
+blocking); its result is discarded, and a duplicate that has not started
+yet is cancelled. run_async() hedges coroutines and cancels the loser
+outright.
+"""
+
+import asyncio
+import math
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class LatencyTracker:
+    """
+    Sliding window of call latencies.
+
+    Args:
+        window: Number of most recent samples kept
+    """
+
+    def __init__(self, window=500):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p):
+        """
+        p-th percentile (nearest rank) of the window, or None without samples.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(p / 100 * len(samples)))
+        return samples[rank - 1]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+    def stats(self):
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            'samples': len(self),
+            'p50': round(p50, 3) if p50 is not None else None,
+            'p95': round(p95, 3) if p95 is not None else None,
+        }
+
+
+class Hedger:
+    """
+    Runs a call and hedges it with a duplicate when it is slow.
+
+    Args:
+        tracker: LatencyTracker whose percentile triggers the hedge
+        percentile: Latency percentile after which a duplicate is sent
+        budget: Largest ratio of duplicates to calls
+        min_samples: Samples needed before the percentile is trusted
+        default_delay: Hedge delay (seconds) until there are enough samples
+        min_delay: Lower bound of the hedge delay (seconds)
+        max_workers: Threads running primary and duplicate calls
+    """
+
+    def __init__(self, tracker, percentile=95, budget=0.05, min_samples=20, default_delay=5.0,
+                 min_delay=0.2, max_workers=32):
+        self.tracker = tracker
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+        self._counters = {'calls': 0, 'hedges': 0, 'hedge_wins': 0, 'over_budget': 0}
+        self._lock = threading.Lock()
+
+    def hedge_delay(self):
+        if len(self.tracker) < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, self.tracker.percentile(self.percentile))
+
+    def run(self, call, duplicate=None):
+        """
+        Run call(); if it is still running after hedge_delay() and the budget
+        allows, also run duplicate() (defaults to call) and return the first
+        successful result. Raises the primary's error if both fail.
+        """
+        with self._lock:
+            self._counters['calls'] += 1
+
+        primary = self._pool.submit(call)
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done or not self._take_budget():
+            return primary.result()
+
+        backup = self._pool.submit(duplicate or call)
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if future is backup:
+                        with self._lock:
+                            self._counters['hedge_wins'] += 1
+                    return future.result()
+        return primary.result()
+
+    async def run_async(self, call, duplicate=None):
+        """
+        run() for coroutine functions; the call that loses is cancelled.
+        """
+        with self._lock:
+            self._counters['calls'] += 1
+
+        primary = asyncio.ensure_future(call())
+        backup = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay())
+            if done or not self._take_budget():
+                return await primary
+
+            backup = asyncio.ensure_future((duplicate or call)())
+            pending = {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            with self._lock:
+                                self._counters['hedge_wins'] += 1
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters.update(self.tracker.stats())
+        counters['hedge_delay'] = round(self.hedge_delay(), 3)
+        return counters
+
+    def _take_budget(self):
+        with self._lock:
+            if self._counters['hedges'] + 1 > self.budget * self._counters['calls']:
+                self._counters['over_budget'] += 1
+                return False
+            self._counters['hedges'] += 1
+            return True
@@ -0,0 +1,392 @@
+"""
+Background Jobs
+
+Asynchronous execution for large translation and QA runs:
+- JobStore persists job state and per-cell results in SQLite
+- JobManager runs registered job kinds on a background worker pool
+
+A job runner receives a Job handle and reports progress through
+job.set_total() / job.record_cell(), and checks job.cancelled between
+units of work. Every cell is checkpointed as it completes, so a resumed
+job only re-runs cells that are missing or errored (job.completed_cells()).
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Job lifecycle
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+INTERRUPTED = 'interrupted'
+
+FINAL_STATUSES = (COMPLETED, FAILED, CANCELLED, INTERRUPTED)
+
+# Inline error marker used in translation cells
+ERROR_PREFIX = '[Error:'
+
+# Identifies the process that owns (and runs) a job. The boot id tells a
+# restarted container apart from its previous run, which often comes back
+# with the same hostname and pid
+BOOT_ID = uuid.uuid4().hex[:12]
+PROCESS_OWNER = f'{socket.gethostname()}:{os.getpid()}:{BOOT_ID}'
+
+
+def _owner_alive(owner):
+    """
+    Whether the process named by an owner token may still be running.
+    Owners on other hosts are assumed alive.
+    """
+    if not owner:
+        return False
+    # Owners recorded before boot ids were added are host:pid
+    host, pid, boot = (owner.split(':') + [None])[:3]
+    if host != socket.gethostname():
+        return True
+    if pid == str(os.getpid()):
+        # Our pid, but possibly from before a restart
+        return boot == BOOT_ID
+    try:
+        os.kill(int(pid), 0)
+    except (OSError, TypeError, ValueError):
+        return False
+    return True
+
+
+class JobStore:
+    """
+    SQLite persistence for jobs and their per-cell results.
+
+    Args:
+        db_path: Path of the SQLite file (created if missing)
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                owner TEXT,
+                params TEXT NOT NULL,
+                total_cells INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS job_cells (
+                job_id TEXT NOT NULL,
+                row_index INTEGER NOT NULL,
+                language TEXT NOT NULL,
+                value TEXT,
+                status TEXT NOT NULL,
+                error TEXT,
+                extra TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (job_id, row_index, language)
+            );
+            """
+        )
+        # Stores created before jobs had an owner
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(jobs)')]
+        if 'owner' not in columns:
+            self._conn.execute('ALTER TABLE jobs ADD COLUMN owner TEXT')
+        self._conn.commit()
+
+    def create_job(self, kind, params):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO jobs (id, kind, status, owner, params, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, kind, QUEUED, PROCESS_OWNER, json.dumps(params, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+        return job_id
+
+    def get_job(self, job_id):
+        """
+        Job row as a dict (params decoded, cell counts included), or None.
+        run_cells counts the cells recorded since the current run started.
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None:
+                return None
+            counts = dict(self._conn.execute(
+                'SELECT status, COUNT(*) FROM job_cells WHERE job_id = ? GROUP BY status',
+                (job_id,)
+            ).fetchall())
+            run_cells = self._conn.execute(
+                'SELECT COUNT(*) FROM job_cells WHERE job_id = ? AND updated_at >= ?',
+                (job_id, row['started_at'] or 0)
+            ).fetchone()[0]
+
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['cell_counts'] = counts
+        job['run_cells'] = run_cells
+        return job
+
+    def update_job(self, job_id, **fields):
+        if not fields:
+            return
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f'UPDATE jobs SET {assignments} WHERE id = ?',
+                list(fields.values()) + [job_id]
+            )
+            self._conn.commit()
+
+    def record_cell(self, job_id, row_index, language, value, status='done', error=None, extra=None):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO job_cells '
+                '(job_id, row_index, language, value, status, error, extra, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    job_id, row_index, language, value, status, error,
+                    json.dumps(extra, ensure_ascii=False) if extra is not None else None,
+                    time.time()
+                )
+            )
+            self._conn.commit()
+
+    def list_jobs(self, statuses):
+        """
+        (id, owner) of jobs in any of the given statuses.
+        """
+        placeholders = ', '.join('?' for _ in statuses)
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT id, owner FROM jobs WHERE status IN ({placeholders})',
+                list(statuses)
+            ).fetchall()
+        return [(row['id'], row['owner']) for row in rows]
+
+    def completed_cells(self, job_id):
+        """
+        (row_index, language) of cells that finished without error.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT row_index, language FROM job_cells '
+                "WHERE job_id = ? AND status = 'done' AND (value IS NULL OR value NOT LIKE ?)",
+                (job_id, ERROR_PREFIX + '%')
+            ).fetchall()
+        return {(row['row_index'], row['language']) for row in rows}
+
+    def get_cells(self, job_id):
+        """
+        All recorded cells of a job, ordered by row then language.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT row_index, language, value, status, error, extra FROM job_cells '
+                'WHERE job_id = ? ORDER BY row_index, language',
+                (job_id,)
+            ).fetchall()
+
+        cells = []
+        for row in rows:
+            cell = dict(row)
+            cell['extra'] = json.loads(cell['extra']) if cell['extra'] else None
+            cells.append(cell)
+        return cells
+
+
+class Job:
+    """
+    Handle given to a job runner.
+    """
+
+    def __init__(self, manager, job_id, kind, params):
+        self._manager = manager
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+
+    @property
+    def cancelled(self):
+        return self._manager.is_cancelled(self.id)
+
+    def completed_cells(self):
+        """
+        Cells checkpointed by earlier runs that do not need to run again.
+        """
+        return self._manager.store.completed_cells(self.id)
+
+    def set_total(self, total_cells):
+        self._manager.store.update_job(self.id, total_cells=total_cells)
+
+    def record_cell(self, row_index, language, value, status='done', error=None, extra=None):
+        self._manager.store.record_cell(self.id, row_index, language, value, status, error, extra)
+
+
+class JobManager:
+    """
+    Runs registered job kinds on a background worker pool.
+
+    Args:
+        store: JobStore used for state and results
+        max_workers: Number of jobs executed at the same time
+    """
+
+    def __init__(self, store, max_workers=2):
+        self.store = store
+        self._runners = {}
+        self._futures = {}
+        self._cancelled = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+
+    def register(self, kind, runner):
+        """
+        Register runner(job) for a job kind.
+        """
+        self._runners[kind] = runner
+
+    def submit(self, kind, params):
+        if kind not in self._runners:
+            raise ValueError(f'Unknown job kind: {kind}')
+        job_id = self.store.create_job(kind, params)
+        self._schedule(job_id, kind, params)
+        return job_id
+
+    def resume(self, job_id):
+        """
+        Re-run a finished, cancelled, failed or interrupted job; the runner skips
+        cells that already completed. Returns False if the job is unknown or active.
+        """
+        job = self.store.get_job(job_id)
+        if job is None:
+            return False
+        with self._lock:
+            if job_id in self._futures:
+                return False
+            self._cancelled.discard(job_id)
+
+        self.store.update_job(job_id, status=QUEUED, owner=PROCESS_OWNER, error=None, finished_at=None)
+        self._schedule(job_id, job['kind'], job['params'])
+        return True
+
+    def recover(self, auto_resume=False):
+        """
+        Mark jobs left queued/running by a dead process (or by this process
+        but no longer scheduled) as interrupted and optionally resume them in
+        this process.
+
+        Returns:
+            List of recovered job ids
+        """
+        recovered = []
+        for job_id, owner in self.store.list_jobs((QUEUED, RUNNING)):
+            if owner == PROCESS_OWNER:
+                with self._lock:
+                    if job_id in self._futures:
+                        continue
+            elif _owner_alive(owner):
+                continue
+            self.store.update_job(job_id, status=INTERRUPTED, finished_at=time.time())
+            recovered.append(job_id)
+            if auto_resume:
+                self.resume(job_id)
+        return recovered
+
+    def cancel(self, job_id):
+        """
+        Request cancellation. Returns False if the job is unknown or already finished.
+        """
+        job = self.store.get_job(job_id)
+        if job is None or job['status'] in FINAL_STATUSES:
+            return False
+
+        with self._lock:
+            self._cancelled.add(job_id)
+            future = self._futures.get(job_id)
+            # Never started, so _run will not clear it
+            never_started = future is not None and future.cancel()
+            if never_started:
+                self._futures.pop(job_id, None)
+                self._cancelled.discard(job_id)
+        if never_started:
+            self.store.update_job(job_id, status=CANCELLED, finished_at=time.time())
+        return True
+
+    def is_cancelled(self, job_id):
+        with self._lock:
+            return job_id in self._cancelled
+
+    def progress(self, job_id):
+        """
+        Job status with cells done, throughput (cells/sec) and ETA (seconds).
+        Throughput only counts cells of the current run, so a resumed job is
+        not credited with cells finished before it restarted.
+        """
+        job = self.store.get_job(job_id)
+        if job is None:
+            return None
+
+        counts = job['cell_counts']
+        done = sum(counts.values())
+        total = job['total_cells']
+        throughput = None
+        eta = None
+        if job['started_at']:
+            elapsed = (job['finished_at'] or time.time()) - job['started_at']
+            if elapsed > 0 and job['run_cells']:
+                throughput = round(job['run_cells'] / elapsed, 3)
+                if job['status'] == RUNNING and total and throughput:
+                    eta = round(max(0, total - done) / throughput, 1)
+
+        return {
+            'jobId': job['id'],
+            'kind': job['kind'],
+            'status': job['status'],
+            'error': job['error'],
+            'totalCells': total,
+            'cellsDone': done,
+            'cellsFailed': counts.get('error', 0),
+            'throughput': throughput,
+            'eta': eta,
+            'createdAt': job['created_at'],
+            'startedAt': job['started_at'],
+            'finishedAt': job['finished_at'],
+        }
+
+    def _schedule(self, job_id, kind, params):
+        # Under the lock, so _run cannot finish and pop the job before it is stored
+        with self._lock:
+            self._futures[job_id] = self._pool.submit(self._run, Job(self, job_id, kind, params))
+
+    def _run(self, job):
+        self.store.update_job(
+            job.id, status=RUNNING, owner=PROCESS_OWNER, started_at=time.time(), finished_at=None, error=None
+        )
+        try:
+            self._runners[job.kind](job)
+        except Exception as e:
+            self.store.update_job(job.id, status=FAILED, error=str(e), finished_at=time.time())
+        else:
+            status = CANCELLED if job.cancelled else COMPLETED
+            self.store.update_job(job.id, status=status, finished_at=time.time())
+        finally:
+            with self._lock:
+                self._futures.pop(job.id, None)
+                self._cancelled.discard(job.id)
@@ -0,0 +1,28 @@
+"""
+Metrics
+
+Thread-safe named counters for service-level statistics.
+"""
+
+import threading
+
+
+class Counters:
+    """
+    A small set of named, thread-safe counters.
+
+    Args:
+        *names: Counter names, all starting at zero
+    """
+
+    def __init__(self, *names):
+        self._values = {name: 0 for name in names}
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
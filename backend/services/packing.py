@@ -0,0 +1,133 @@
+"""
+Multi-String Packing and Language Fan-In
+
+Helpers for getting many translations out of one completion:
+- plan_packs groups strings under a token budget
+- parse_packed_reply maps a JSON array reply back to item ids
+- parse_multi_language_reply maps a JSON object reply back to languages
+
+Items missing from the reply (or malformed) are reported so the caller can
+retry them one by one.
+"""
+
+import json
+import re
+
+from .tokens import estimate_tokens
+
+# Per-item JSON framing ({"id": .., "text": ..}) in the request and reply
+ITEM_OVERHEAD_TOKENS = 10
+
+# Translations of short strings can be several times longer in tokens
+# (non-Latin scripts especially); plan output generously
+OUTPUT_EXPANSION = 3
+
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+
+def estimate_item_tokens(text):
+    """
+    Estimated (input_tokens, output_tokens) for one packed item.
+    """
+    text_tokens = estimate_tokens(text)
+    return text_tokens + ITEM_OVERHEAD_TOKENS, text_tokens * OUTPUT_EXPANSION + ITEM_OVERHEAD_TOKENS
+
+
+def plan_packs(texts, token_budget=2000, max_items=50):
+    """
+    Split texts into packs whose estimated input + output tokens fit the budget.
+
+    Args:
+        texts: List of source strings
+        token_budget: Upper bound of item tokens (input + expected output) per pack
+        max_items: Upper bound of items per pack
+
+    Returns:
+        List of packs, each a list of indexes into `texts`
+    """
+    packs = []
+    current = []
+    used = 0
+    for index, text in enumerate(texts):
+        tokens_in, tokens_out = estimate_item_tokens(text)
+        cost = tokens_in + tokens_out
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            packs.append(current)
+            current = []
+            used = 0
+        current.append(index)
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+def packed_max_tokens(texts, ceiling=4096):
+    """
+    max_tokens for a packed completion covering `texts`.
+    """
+    return min(ceiling, sum(estimate_item_tokens(text)[1] for text in texts) + 50)
+
+
+def fan_in_max_tokens(text, languages, floor=500, ceiling=4096):
+    """
+    max_tokens for a fan-in completion translating `text` into `languages`.
+    """
+    per_language = estimate_item_tokens(text)[1]
+    return max(floor, min(ceiling, per_language * len(languages) + 50))
+
+
+def load_json_reply(content):
+    """
+    Decode a JSON completion, tolerating markdown code fences. None if invalid.
+    """
+    try:
+        return json.loads(_FENCE_RE.sub('', (content or '').strip()))
+    except ValueError:
+        return None
+
+
+def parse_packed_reply(content, expected_ids):
+    """
+    Parse a packed JSON array reply.
+
+    Returns:
+        Tuple of (translations, missing_ids) where translations maps id -> text
+    """
+    translations = {}
+    items = load_json_reply(content)
+    if not isinstance(items, list):
+        items = []
+
+    expected = set(expected_ids)
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        item_id = item.get('id')
+        translation = item.get('translation')
+        if item_id in expected and isinstance(translation, str) and translation.strip():
+            translations[item_id] = translation.strip()
+
+    missing = [item_id for item_id in expected_ids if item_id not in translations]
+    return translations, missing
+
+
+def parse_multi_language_reply(content, languages):
+    """
+    Parse a fan-in JSON object reply keyed by language.
+
+    Returns:
+        Tuple of (translations, failed_languages) where translations maps language -> text
+    """
+    translations = {}
+    reply = load_json_reply(content)
+    if not isinstance(reply, dict):
+        reply = {}
+
+    for lang in languages:
+        translation = reply.get(lang)
+        if isinstance(translation, str) and translation.strip():
+            translations[lang] = translation.strip()
+
+    failed = [lang for lang in languages if lang not in translations]
+    return translations, failed
@@ -0,0 +1,67 @@
+"""
+QA Chunk Planning
+
+Token-aware chunking for /api/verify. Chunk boundaries come from a local
+estimate of both the prompt and the expected JSON reply, so long strings get
+smaller chunks and short UI labels get larger ones.
+"""
+
+from .tokens import estimate_tokens
+
+# JSON framing per entry ({"source": .., "translation": ..}) in the request
+ENTRY_OVERHEAD_TOKENS = 12
+
+# Reply repeats source and translation and may add notes
+NOTES_ALLOWANCE_TOKENS = 20
+REPLY_OVERHEAD_TOKENS = 50
+
+
+def estimate_entry_tokens(entry):
+    """
+    Estimated (input_tokens, output_tokens) for one QA entry.
+    """
+    source_tokens = estimate_tokens(str(entry.get('source', '')))
+    translation_tokens = estimate_tokens(str(entry.get('translation', '')))
+    tokens_in = source_tokens + translation_tokens + ENTRY_OVERHEAD_TOKENS
+    # Corrections can run a little longer than the original translation
+    tokens_out = source_tokens + translation_tokens * 5 // 4 + ENTRY_OVERHEAD_TOKENS + NOTES_ALLOWANCE_TOKENS
+    return tokens_in, tokens_out
+
+
+def plan_qa_chunks(entries, max_items=50, input_budget=6000, output_budget=4000):
+    """
+    Split entries into chunks that fit both token budgets.
+
+    Args:
+        entries: List of {"source", "translation"} for one language
+        max_items: Upper bound of entries per chunk (the client's chunkSize)
+        input_budget: Upper bound of estimated entry tokens sent per chunk
+        output_budget: Upper bound of estimated reply tokens per chunk
+
+    Returns:
+        List of (start, end) index ranges
+    """
+    chunks = []
+    start = 0
+    used_in = 0
+    used_out = REPLY_OVERHEAD_TOKENS
+    for index, entry in enumerate(entries):
+        tokens_in, tokens_out = estimate_entry_tokens(entry)
+        size = index - start
+        if size and (size >= max_items or used_in + tokens_in > input_budget or used_out + tokens_out > output_budget):
+            chunks.append((start, index))
+            start = index
+            used_in = 0
+            used_out = REPLY_OVERHEAD_TOKENS
+        used_in += tokens_in
+        used_out += tokens_out
+    if start < len(entries):
+        chunks.append((start, len(entries)))
+    return chunks
+
+
+def qa_max_tokens(entries, ceiling=4096):
+    """
+    max_tokens for a QA completion covering `entries`.
+    """
+    return min(ceiling, REPLY_OVERHEAD_TOKENS + sum(estimate_entry_tokens(entry)[1] for entry in entries))
@@ -0,0 +1,113 @@
+"""
+Local QA Rules
+
+Deterministic checks for the mechanical rules in prompts/quality_assurance.py,
+run over the whole table before the LLM QA pass:
+- placeholders ({name}, {{var}}, %d, %s, %1$s) preserved
+- numbers preserved
+- technical acronyms (AI, JPEG, MP4, 4K) preserved
+- no emojis/hashtags added (or dropped, for marketing)
+- translation not much longer than the source (over ~1.5x words)
+- translation present (not empty or an inline error marker)
+
+Only cells that fail a rule (plus an optional random sample) need the LLM.
+"""
+
+import random
+import re
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*[\w.]+\s*\}\}|\{[\w.]*\}|%(?:\d+\$)?[-+ 0#]*\d*(?:\.\d+)?[sdfiuxXc@]')
+NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)*')
+ACRONYM_RE = re.compile(r'\b(?=[A-Z0-9]*[A-Z])[A-Z0-9]{2,}\b')
+HASHTAG_RE = re.compile(r'(?<!\w)#\w+')
+EMOJI_RE = re.compile('[\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF\uFE0F]')
+ERROR_MARKERS = ('[Error:', '[Localization pending')
+
+# Rule 9 of the QA prompt
+MAX_WORD_RATIO = 1.5
+
+
+def _sorted_matches(pattern, text):
+    return sorted(pattern.findall(text))
+
+
+def check_entry(source, translation, scenario='general'):
+    """
+    Run every rule on one (source, translation) pair.
+
+    Returns:
+        List of {"rule", "message"} hits (empty if the pair looks fine)
+    """
+    source = str(source or '')
+    translation = str(translation or '')
+    hits = []
+
+    if not translation.strip() or translation.startswith(ERROR_MARKERS):
+        return [{'rule': 'missing', 'message': 'Translation is missing'}]
+
+    if _sorted_matches(PLACEHOLDER_RE, source) != _sorted_matches(PLACEHOLDER_RE, translation):
+        hits.append({'rule': 'placeholders', 'message': 'Placeholders differ from the source'})
+
+    if _sorted_matches(NUMBER_RE, source) != _sorted_matches(NUMBER_RE, translation):
+        hits.append({'rule': 'numbers', 'message': 'Numbers differ from the source'})
+
+    # An all-caps source is a styling choice, not a string of acronyms
+    source_letters = [ch for ch in source if ch.isalpha()]
+    if not all(ch.isupper() for ch in source_letters):
+        missing = set(ACRONYM_RE.findall(source)) - set(ACRONYM_RE.findall(translation))
+        if missing:
+            hits.append({'rule': 'acronyms', 'message': f"Acronyms not preserved: {', '.join(sorted(missing))}"})
+
+    for name, pattern in (('emoji', EMOJI_RE), ('hashtag', HASHTAG_RE)):
+        in_source = bool(pattern.search(source))
+        in_translation = bool(pattern.search(translation))
+        if in_translation and not in_source:
+            hits.append({'rule': name, 'message': f'Translation adds {name}s not in the source'})
+        elif in_source and not in_translation and scenario == 'marketing':
+            hits.append({'rule': name, 'message': f'Translation drops {name}s from the source'})
+
+    source_words = len(source.split())
+    translation_words = len(translation.split())
+    if source_words and translation_words > max(source_words * MAX_WORD_RATIO, source_words + 1):
+        hits.append({
+            'rule': 'length',
+            'message': f'Translation is {translation_words / source_words:.1f}x the source length'
+        })
+
+    return hits
+
+
+def check_table(table_data, languages, scenario='general'):
+    """
+    Run the rules over every (row, language) cell.
+
+    Returns:
+        Dict of (row_index, language) -> hits, for cells with at least one hit
+    """
+    hits = {}
+    for index, row in enumerate(table_data):
+        source = row.get('source', '')
+        translations = row.get('translations', {})
+        for lang in languages:
+            cell_hits = check_entry(source, translations.get(lang, ''), scenario)
+            if cell_hits:
+                hits[(index, lang)] = cell_hits
+    return hits
+
+
+def select_cells_for_review(hits, row_count, languages, sample_rate=0.0, seed=0):
+    """
+    Cells to forward to the LLM QA pass: every cell with a rule hit plus a
+    deterministic random sample of the rest.
+
+    Returns:
+        Set of (row_index, language)
+    """
+    selected = set(hits)
+    if sample_rate > 0:
+        rng = random.Random(seed)
+        for lang in languages:
+            for index in range(row_count):
+                if (index, lang) not in selected and rng.random() < sample_rate:
+                    selected.add((index, lang))
+    return selected
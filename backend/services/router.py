@@ -0,0 +1,161 @@
+"""
+Model Router
+
+Picks the model and max_tokens for each upstream call from configuration:
+- routes match on call kind, scenario, source length (estimated tokens)
+  and target language; the first matching route wins
+- max_tokens is sized from the source length and a per-language
+  expansion factor instead of a fixed cap
+- calls that must finish quickly (a request short of time for its
+  deadline) can be sent to a faster model instead
+
+Route format (MODEL_ROUTES, JSON list):
+{"name": "short-ui", "model": "gpt-4o-mini", "kinds": ["translate"],
+ "scenarios": ["general", "software"], "maxSourceTokens": 16, "languages": ["Spanish"]}
+Every key but name and model is optional.
+"""
+
+import json
+import math
+import os
+import threading
+from collections import namedtuple
+
+Route = namedtuple('Route', ['name', 'model', 'max_tokens'])
+
+# Output tokens per source token, by target language (prefix match);
+# non-Latin scripts tokenize into many more tokens than English
+EXPANSION_FACTORS = {
+    'hindi': 3.0, 'marathi': 3.0, 'bengali': 3.0, 'gujarati': 3.0, 'punjabi': 3.0,
+    'tamil': 3.5, 'telugu': 3.5, 'kannada': 3.5, 'malayalam': 3.5,
+    'thai': 2.5, 'greek': 2.5, 'hebrew': 2.0, 'arabic': 2.0, 'persian': 2.0,
+    'russian': 2.0, 'ukrainian': 2.0, 'bulgarian': 2.0,
+    'korean': 1.8, 'japanese': 1.5, 'chinese': 1.3, 'vietnamese': 1.8,
+    'german': 1.5, 'french': 1.4, 'spanish': 1.3, 'portuguese': 1.3, 'italian': 1.3,
+}
+DEFAULT_EXPANSION = 1.5
+
+# Short UI labels in the cheaper scenarios do not need the largest model
+DEFAULT_ROUTES = [
+    {
+        'name': 'short-label',
+        'model': 'gpt-4o-mini',
+        'kinds': ['translate'],
+        'scenarios': ['general', 'software'],
+        'maxSourceTokens': 16,
+    },
+]
+
+
+def load_routes(value):
+    """
+    Routes from a JSON string or the path of a JSON file.
+    """
+    if os.path.isfile(value):
+        with open(value, encoding='utf-8') as handle:
+            routes = json.load(handle)
+    else:
+        routes = json.loads(value)
+    if not isinstance(routes, list) or not all('name' in route and 'model' in route for route in routes):
+        raise ValueError('MODEL_ROUTES must be a list of routes with a name and a model')
+    return routes
+
+
+class ModelRouter:
+    """
+    Rule-based model selection and output sizing.
+
+    Args:
+        routes: List of route dicts (see module docstring), checked in order
+        default_model: Model used when no route matches
+        floor: Smallest max_tokens handed out for a translation
+        ceiling: Largest max_tokens handed out for a translation
+        margin: Headroom multiplier over the expected output size
+        fast_model: Model for calls routed with fast=True (None disables it)
+    """
+
+    def __init__(self, routes=None, default_model='gpt-4o', floor=64, ceiling=4096, margin=2.0,
+                 fast_model='gpt-4o-mini'):
+        self.routes = list(DEFAULT_ROUTES if routes is None else routes)
+        self.default_model = default_model
+        self.fast_model = fast_model
+        self.floor = floor
+        self.ceiling = ceiling
+        self.margin = margin
+        self._served = {}
+        self._lock = threading.Lock()
+
+    def expansion_factor(self, language):
+        key = language.strip().lower()
+        for name, factor in EXPANSION_FACTORS.items():
+            if key.startswith(name):
+                return factor
+        return DEFAULT_EXPANSION
+
+    def expected_tokens(self, source_tokens, languages):
+        """
+        Likely output tokens for translating `source_tokens` into each of `languages`.
+        """
+        return math.ceil(sum(source_tokens * self.expansion_factor(lang) for lang in languages))
+
+    def max_tokens(self, source_tokens, languages):
+        """
+        max_tokens for translating `source_tokens` into each of `languages`.
+        """
+        expected = self.expected_tokens(source_tokens, languages)
+        return max(self.floor, min(self.ceiling, math.ceil(expected * self.margin) + 16 * len(languages)))
+
+    def route(self, scenario, source_tokens, languages, kind='translate', fast=False):
+        """
+        Route for one call.
+
+        Args:
+            scenario: Scenario id of the call
+            source_tokens: Estimated tokens of the text(s) being translated or reviewed
+            languages: Target languages of the call
+            kind: 'translate', 'packed', 'fan-in' or 'qa'
+            fast: Use the fast model regardless of the configured routes
+
+        Returns:
+            Route(name, model, max_tokens); max_tokens is sized for 'translate'
+            calls and None for other kinds, which size their own output
+        """
+        max_tokens = self.max_tokens(source_tokens, languages) if kind == 'translate' else None
+        if fast and self.fast_model:
+            return Route('fast', self.fast_model, max_tokens)
+        for config in self.routes:
+            if self._matches(config, scenario, source_tokens, languages, kind):
+                return Route(config['name'], config['model'], max_tokens)
+        return Route('default', self.default_model, max_tokens)
+
+    def record(self, route_name, cells=1):
+        """
+        Count cells served by a route (or by 'memory', 'template', ...).
+        """
+        with self._lock:
+            self._served[route_name] = self._served.get(route_name, 0) + cells
+
+    def stats(self):
+        with self._lock:
+            served = dict(self._served)
+        return {
+            'default_model': self.default_model,
+            'fast_model': self.fast_model,
+            'routes': [{'name': route['name'], 'model': route['model']} for route in self.routes],
+            'served_cells': served,
+        }
+
+    def _matches(self, config, scenario, source_tokens, languages, kind):
+        if kind not in config.get('kinds', ['translate']):
+            return False
+        if 'scenarios' in config and scenario not in config['scenarios']:
+            return False
+        if source_tokens > config.get('maxSourceTokens', math.inf):
+            return False
+        if source_tokens < config.get('minSourceTokens', 0):
+            return False
+        if 'languages' in config:
+            allowed = [name.lower() for name in config['languages']]
+            if not all(lang.strip().lower().startswith(tuple(allowed)) for lang in languages):
+                return False
+        return True
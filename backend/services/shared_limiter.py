@@ -0,0 +1,396 @@
+"""
+Shared Rate Limiter
+
+Token-bucket pacing for upstream OpenAI calls. One request and the call's
+estimated tokens (prompt + expected completion) are drawn per call and
+settled against the reported usage once it returns. The buckets live in a
+SQLite file, so every worker process on the node draws from the same
+org-wide RPM/TPM budget:
+- the org buckets (requests and tokens per minute), refilled by wall clock
+- optional per-tenant buckets (quotas) on top of the org buckets
+- fair queuing: once callers have to wait for org capacity they queue, and
+  the next call goes to an interactive caller before any bulk one, then to
+  the waiting tenant that used the least capacity recently (usage decays
+  with a half-life), first come first served within a tenant; a bulk job
+  cannot starve a translator editing one string
+
+Each acquire is one short IMMEDIATE transaction. Quota format
+(TENANT_QUOTAS, JSON object; "*" applies to tenants not listed):
+{"team-a": {"requestsPerMinute": 100, "tokensPerMinute": 20000}, "*": {...}}
+
+Tenant names come from an unauthenticated request header, so a name is
+not trusted to buy capacity: with a "*" quota, every tenant not listed
+shares that one bucket (and one place in the fair queue), and sending a
+new name per request gains nothing. Only listed tenants get their own.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .concurrency import INTERACTIVE
+
+# Queue entries not refreshed for this long belong to a dead process
+WAITER_TTL = 10.0
+
+# How often a waiter refreshes its queue entry (and stale entries are swept)
+WAITER_REFRESH = 2.0
+
+# Poll interval while other tenants are ahead in the queue; it grows with the
+# time already waited, up to TURN_POLL_MAX. Waiters in this process are also
+# woken whenever a call here is granted or leaves the queue
+TURN_POLL = 0.02
+TURN_POLL_MAX = 0.5
+
+
+def load_tenant_quotas(value):
+    """
+    Tenant quotas from a JSON string or the path of a JSON file.
+    """
+    if os.path.isfile(value):
+        with open(value, encoding='utf-8') as handle:
+            quotas = json.load(handle)
+    else:
+        quotas = json.loads(value)
+    if not isinstance(quotas, dict) or not all(isinstance(quota, dict) for quota in quotas.values()):
+        raise ValueError('TENANT_QUOTAS must map tenant names to {requestsPerMinute, tokensPerMinute}')
+    return quotas
+
+
+class SharedRateLimiter:
+    """
+    Cross-process RPM/TPM token bucket with tenant quotas and fair queuing.
+
+    Args:
+        db_path: SQLite file shared by every worker process (created if missing)
+        requests_per_minute: Org-wide sustained request rate
+        tokens_per_minute: Org-wide sustained token rate
+        tenant_quotas: Optional dict of tenant -> {requestsPerMinute, tokensPerMinute}
+        usage_half_life: Seconds for a tenant's recorded usage to halve
+    """
+
+    def __init__(self, db_path, requests_per_minute, tokens_per_minute, tenant_quotas=None, usage_half_life=60.0):
+        self.db_path = db_path
+        self.requests_per_minute = float(requests_per_minute)
+        self.tokens_per_minute = float(tokens_per_minute)
+        self.tenant_quotas = dict(tenant_quotas or {})
+        self.usage_half_life = usage_half_life
+        self._lock = threading.Lock()
+        # Wakes this process's blocked waiters when their turn may have come
+        self._turn = threading.Condition()
+        # Last refresh of this process's queue entries, and of the stale sweep
+        self._refreshed = {}
+        self._swept = 0.0
+        self._counters = {
+            'acquired': 0,
+            'throttled': 0,
+            'quota_throttled': 0,
+            'abandoned': 0,
+            'settled_tokens': 0.0,
+            'wait_seconds': 0.0,
+        }
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL NOT NULL, updated REAL NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS tenant_usage (tenant TEXT PRIMARY KEY, used REAL NOT NULL, updated REAL NOT NULL)'
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS waiters (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tenant TEXT NOT NULL,
+                seen REAL NOT NULL,
+                bulk INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Files created before priority lanes
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(waiters)')]
+        if 'bulk' not in columns:
+            self._conn.execute('ALTER TABLE waiters ADD COLUMN bulk INTEGER NOT NULL DEFAULT 0')
+
+    def acquire(self, tokens=0, tenant=None, lane=INTERACTIVE, should_stop=None):
+        """
+        Block until the org buckets (and the tenant's quota) cover one request
+        and `tokens` tokens, and it is the caller's turn; then consume them.
+        Once should_stop() turns True the caller leaves the queue without
+        consuming anything.
+
+        Returns:
+            Seconds spent waiting, or None when should_stop() ended the wait
+        """
+        tenant = self._tenant_key(tenant)
+        waited = 0.0
+        waiter = None
+        try:
+            while True:
+                if self._stopped(should_stop):
+                    return None
+                delay, waiter = self._take(tokens, tenant, lane, waiter, waited)
+                if delay is None:
+                    return waited
+                started = time.monotonic()
+                with self._turn:
+                    self._turn.wait(delay)
+                waited += time.monotonic() - started
+        finally:
+            if waiter is not None:
+                self._leave(waiter)
+
+    async def acquire_async(self, tokens=0, tenant=None, lane=INTERACTIVE, should_stop=None):
+        """
+        acquire() for coroutines: waits without blocking the event loop.
+
+        Returns:
+            Seconds spent waiting, or None when should_stop() ended the wait
+        """
+        tenant = self._tenant_key(tenant)
+        waited = 0.0
+        waiter = None
+        try:
+            while True:
+                if self._stopped(should_stop):
+                    return None
+                # The transaction may wait on other processes' locks
+                attempt = asyncio.ensure_future(asyncio.to_thread(self._take, tokens, tenant, lane, waiter, waited))
+                try:
+                    delay, waiter = await asyncio.shield(attempt)
+                except asyncio.CancelledError:
+                    # The attempt still runs to the end; drop the queue entry it may create
+                    attempt.add_done_callback(self._abandon)
+                    raise
+                if delay is None:
+                    return waited
+                await asyncio.sleep(delay)
+                waited += delay
+        finally:
+            if waiter is not None:
+                self._leave(waiter)
+
+    def settle(self, reserved, used, tenant=None):
+        """
+        Correct the token buckets (and the tenant's usage) once a call
+        reserved `reserved` tokens but the upstream reports `used`: unused
+        tokens are returned, an overrun is charged.
+        """
+        difference = float(reserved) - float(used)
+        if not difference:
+            return
+        tenant = self._tenant_key(tenant)
+        now = time.time()
+        buckets = [('tokens', self.tokens_per_minute)]
+        rate = self._quota_rate(tenant, 'tokensPerMinute')
+        if rate:
+            buckets.append((f'tenant:{tenant}:tokens', rate))
+
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for name, rate in buckets:
+                    row = conn.execute('SELECT level, updated FROM buckets WHERE name = ?', (name,)).fetchone()
+                    if row is None:
+                        continue
+                    level = self._level(row[0], row[1], now, rate)
+                    conn.execute(
+                        'UPDATE buckets SET level = ?, updated = ? WHERE name = ?',
+                        (min(rate, level + difference), now, name)
+                    )
+                self._record_usage(tenant, -difference, now)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            self._counters['settled_tokens'] += difference
+        self._wake()
+
+    def stats(self):
+        """
+        Shared bucket levels, queue, recent tenant usage and this process's counters.
+        """
+        now = time.time()
+        with self._lock:
+            counters = dict(self._counters)
+            levels = {
+                name: self._level(level, updated, now, self.requests_per_minute if name == 'requests'
+                                  else self.tokens_per_minute)
+                for name, level, updated in self._conn.execute(
+                    "SELECT name, level, updated FROM buckets WHERE name IN ('requests', 'tokens')"
+                )
+            }
+            usage = {
+                tenant: round(self._decay(used, updated, now), 1)
+                for tenant, used, updated in self._conn.execute('SELECT tenant, used, updated FROM tenant_usage')
+            }
+            queued = self._conn.execute(
+                'SELECT COUNT(*) FROM waiters WHERE seen >= ?', (now - WAITER_TTL,)
+            ).fetchone()[0]
+        counters.update({
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute,
+            'available_requests': round(levels.get('requests', self.requests_per_minute), 2),
+            'available_tokens': round(levels.get('tokens', self.tokens_per_minute), 2),
+            'queued': queued,
+            'tenant_usage': usage,
+        })
+        counters['wait_seconds'] = round(counters['wait_seconds'], 3)
+        counters['settled_tokens'] = round(counters['settled_tokens'])
+        return counters
+
+    def _take(self, tokens, tenant, lane, waiter, waited):
+        """
+        One attempt at acquiring.
+
+        Returns:
+            Tuple of (delay, waiter) -- delay is None once consumed, else seconds
+            to wait; waiter is the caller's queue entry (None when not queued)
+        """
+        now = time.time()
+        org_buckets = [('requests', 1.0, self.requests_per_minute), ('tokens', float(tokens), self.tokens_per_minute)]
+        tenant_buckets = [
+            (name, need, rate)
+            for name, need, rate in (
+                (f'tenant:{tenant}:requests', 1.0, self._quota_rate(tenant, 'requestsPerMinute')),
+                (f'tenant:{tenant}:tokens', float(tokens), self._quota_rate(tenant, 'tokensPerMinute')),
+            )
+            if rate
+        ]
+
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if now - self._swept >= WAITER_REFRESH:
+                    conn.execute('DELETE FROM waiters WHERE seen < ?', (now - WAITER_TTL,))
+                    self._swept = now
+                levels = {}
+                for name, _, rate in org_buckets + tenant_buckets:
+                    row = conn.execute('SELECT level, updated FROM buckets WHERE name = ?', (name,)).fetchone()
+                    levels[name] = self._level(row[0], row[1], now, rate) if row else rate
+
+                tenant_delay = self._deficit(tenant_buckets, levels)
+                if tenant_delay > 0:
+                    # Over the tenant's own quota: not waiting for shared capacity, so leave the queue
+                    if waiter is not None:
+                        conn.execute('DELETE FROM waiters WHERE id = ?', (waiter,))
+                        self._refreshed.pop(waiter, None)
+                    conn.execute('COMMIT')
+                    self._counters['quota_throttled'] += 1
+                    return min(max(tenant_delay, 0.01), 1.0), None
+
+                org_delay = self._deficit(org_buckets, levels)
+                head = self._queue_head(now)
+                if org_delay == 0 and head in (None, waiter):
+                    for name, need, rate in org_buckets + tenant_buckets:
+                        conn.execute(
+                            'INSERT OR REPLACE INTO buckets (name, level, updated) VALUES (?, ?, ?)',
+                            (name, levels[name] - min(need, rate), now)
+                        )
+                    self._record_usage(tenant, max(float(tokens), 1.0), now)
+                    if waiter is not None:
+                        conn.execute('DELETE FROM waiters WHERE id = ?', (waiter,))
+                        self._refreshed.pop(waiter, None)
+                    conn.execute('COMMIT')
+                    self._counters['acquired'] += 1
+                    if waited:
+                        self._counters['throttled'] += 1
+                        self._counters['wait_seconds'] += waited
+                    self._wake()
+                    return None, None
+
+                if waiter is None:
+                    waiter = conn.execute(
+                        'INSERT INTO waiters (tenant, seen, bulk) VALUES (?, ?, ?)',
+                        (tenant, now, int(lane != INTERACTIVE))
+                    ).lastrowid
+                    self._refreshed[waiter] = now
+                elif now - self._refreshed.get(waiter, 0.0) >= WAITER_REFRESH:
+                    conn.execute('UPDATE waiters SET seen = ? WHERE id = ?', (now, waiter))
+                    self._refreshed[waiter] = now
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+        if head in (None, waiter):
+            delay = org_delay
+        else:
+            # Nobody behind the head gets capacity before the buckets refill
+            delay = max(org_delay, min(TURN_POLL + waited / 2, TURN_POLL_MAX))
+        return min(max(delay, 0.01), 1.0), waiter
+
+    def _deficit(self, buckets, levels):
+        """Seconds until every bucket covers its share (a call larger than a whole bucket is capped)"""
+        return max(
+            (max(0.0, min(need, rate) - levels[name]) * 60.0 / rate for name, need, rate in buckets),
+            default=0.0
+        )
+
+    def _queue_head(self, now):
+        # Caller holds the lock inside a transaction. Interactive first, then least
+        # recent usage, then arrival
+        usage = {
+            tenant: self._decay(used, updated, now)
+            for tenant, used, updated in self._conn.execute('SELECT tenant, used, updated FROM tenant_usage')
+        }
+        waiters = self._conn.execute('SELECT id, tenant, bulk FROM waiters').fetchall()
+        if not waiters:
+            return None
+        return min(waiters, key=lambda entry: (entry[2], usage.get(entry[1], 0.0), entry[0]))[0]
+
+    def _record_usage(self, tenant, amount, now):
+        # Caller holds the lock inside a transaction
+        row = self._conn.execute('SELECT used, updated FROM tenant_usage WHERE tenant = ?', (tenant,)).fetchone()
+        used = self._decay(row[0], row[1], now) if row else 0.0
+        self._conn.execute(
+            'INSERT OR REPLACE INTO tenant_usage (tenant, used, updated) VALUES (?, ?, ?)',
+            (tenant, max(0.0, used + amount), now)
+        )
+
+    def _abandon(self, attempt):
+        if not attempt.cancelled() and attempt.exception() is None:
+            _, waiter = attempt.result()
+            if waiter is not None:
+                self._leave(waiter)
+
+    def _stopped(self, should_stop):
+        if should_stop and should_stop():
+            with self._lock:
+                self._counters['abandoned'] += 1
+            return True
+        return False
+
+    def _leave(self, waiter):
+        with self._lock:
+            self._conn.execute('DELETE FROM waiters WHERE id = ?', (waiter,))
+            self._refreshed.pop(waiter, None)
+        self._wake()
+
+    def _wake(self):
+        with self._turn:
+            self._turn.notify_all()
+
+    def _tenant_key(self, tenant):
+        """Tenant the limiter accounts a call to: unlisted tenants are pooled under "*" when it exists"""
+        tenant = tenant or 'default'
+        if tenant not in self.tenant_quotas and '*' in self.tenant_quotas:
+            return '*'
+        return tenant
+
+    def _quota_rate(self, tenant, key):
+        """Per-minute rate (= capacity) of a tenant quota bucket; None without that quota"""
+        quota = self.tenant_quotas.get(tenant, self.tenant_quotas.get('*')) or {}
+        return float(quota[key]) if quota.get(key) else None
+
+    def _level(self, level, updated, now, rate):
+        return min(rate, level + max(0.0, now - updated) * rate / 60.0)
+
+    def _decay(self, used, updated, now):
+        return used * 0.5 ** (max(0.0, now - updated) / self.usage_half_life)
@@ -0,0 +1,116 @@
+"""
+Singleflight
+
+Coalesces identical calls that are in flight at the same moment: the first
+caller for a key runs the call, later callers wait for it and receive the
+same result (or error). Nothing is kept once the call finishes; repeat
+requests are the translation memory's job.
+
+Threads use do(), coroutines do_async(); both share the same flights, so a
+request on the ASGI loop can join a call made from a worker thread and the
+other way round.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class _Flight:
+    def __init__(self):
+        self.future = Future()
+        self.task = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Per-key deduplication of concurrent calls.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._counters = {'flights': 0, 'coalesced': 0}
+
+    def do(self, key, fn):
+        """
+        Run fn() unless a call for `key` is already in flight, else wait for it.
+
+        Returns:
+            Tuple of (result, shared) -- shared is True when another caller's
+            call produced the result
+        """
+        flight, leader = self._join(key)
+        if not leader:
+            return flight.future.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, flight, error=e)
+            raise
+        self._finish(key, flight, result=result)
+        return result, False
+
+    async def do_async(self, key, fn):
+        """
+        do() for coroutine functions. The call runs in its own task; it is
+        cancelled only when every caller waiting on it has been cancelled.
+
+        Returns:
+            Tuple of (result, shared)
+        """
+        flight, leader = self._join(key)
+        if leader:
+            flight.task = asyncio.ensure_future(self._run(key, flight, fn))
+        try:
+            result = await asyncio.shield(asyncio.wrap_future(flight.future))
+        except asyncio.CancelledError:
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0
+            if abandoned and flight.task is not None:
+                flight.task.cancel()
+            raise
+        return result, not leader
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters['in_flight'] = len(self._flights)
+        return counters
+
+    def _join(self, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._counters['flights'] += 1
+            else:
+                self._counters['coalesced'] += 1
+            flight.waiters += 1
+        return flight, leader
+
+    async def _run(self, key, flight, fn):
+        try:
+            result = await fn()
+        except asyncio.CancelledError as e:
+            self._finish(key, flight, error=e)
+            raise
+        except Exception as e:
+            self._finish(key, flight, error=e)
+        else:
+            self._finish(key, flight, result=result)
+
+    def _finish(self, key, flight, result=None, error=None):
+        # Later callers start a new flight from here on
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        if isinstance(error, asyncio.CancelledError):
+            flight.future.cancel()
+        elif error is not None:
+            flight.future.set_exception(error)
+        else:
+            flight.future.set_result(result)
@@ -0,0 +1,121 @@
+"""
+Source Templates
+
+Collapses source strings that differ only in numbers or placeholders
+("1 photo" / "2 photo", "%s-day free trial" / "7-day free trial") into one
+template per target language, so each template is translated once:
+- template_key groups strings by template text and the plural category of
+  every numeric value in the target language
+- substitute_values turns a translation of one member into the translation
+  of another by swapping the values back in
+
+When the values cannot be located unambiguously in a translation, the caller
+should translate that string on its own.
+"""
+
+import re
+
+from .qa_rules import NUMBER_RE, PLACEHOLDER_RE
+
+SLOT_RE = re.compile(f'{PLACEHOLDER_RE.pattern}|{NUMBER_RE.pattern}')
+SLOT_MARK = '{#}'
+
+# Plural rule families (CLDR cardinal categories, integers only)
+ONE_OTHER = ('english', 'spanish', 'german', 'italian', 'portuguese', 'dutch', 'swedish', 'danish',
+             'norwegian', 'finnish', 'greek', 'hungarian', 'turkish', 'bulgarian', 'estonian', 'catalan')
+ZERO_ONE_OTHER = ('french', 'hindi', 'marathi', 'bengali', 'gujarati', 'punjabi', 'persian')
+OTHER_ONLY = ('chinese', 'japanese', 'korean', 'thai', 'vietnamese', 'indonesian', 'malay')
+EAST_SLAVIC = ('russian', 'ukrainian', 'belarusian')
+WEST_SLAVIC = ('czech', 'slovak')
+
+
+def _integer(value):
+    digits = value.replace(',', '') if re.fullmatch(r'\d{1,3}(?:,\d{3})+', value) else value
+    return int(digits) if digits.isdigit() else None
+
+
+def plural_category(value, language):
+    """
+    Plural category of a slot value in a target language.
+    Placeholders and decimals count as 'other'; for languages without a known
+    rule the value itself is the category, so nothing is shared.
+    """
+    n = _integer(value)
+    if n is None:
+        return 'other'
+
+    family = language.strip().lower()
+    if family.startswith(OTHER_ONLY):
+        return 'other'
+    if family.startswith(ONE_OTHER):
+        return 'one' if n == 1 else 'other'
+    if family.startswith(ZERO_ONE_OTHER):
+        return 'one' if n in (0, 1) else 'other'
+    if family.startswith(EAST_SLAVIC):
+        if n % 10 == 1 and n % 100 != 11:
+            return 'one'
+        if 2 <= n % 10 <= 4 and not 12 <= n % 100 <= 14:
+            return 'few'
+        return 'many'
+    if family.startswith('polish'):
+        if n == 1:
+            return 'one'
+        if 2 <= n % 10 <= 4 and not 12 <= n % 100 <= 14:
+            return 'few'
+        return 'many'
+    if family.startswith(WEST_SLAVIC):
+        return 'one' if n == 1 else 'few' if 2 <= n <= 4 else 'other'
+    if family.startswith('arabic'):
+        if n in (0, 1, 2):
+            return ('zero', 'one', 'two')[n]
+        if 3 <= n % 100 <= 10:
+            return 'few'
+        if 11 <= n % 100 <= 99:
+            return 'many'
+        return 'other'
+    return f'={value}'
+
+
+def split_template(text):
+    """
+    Returns:
+        Tuple of (template, values) where numbers and placeholders are replaced by slots
+    """
+    values = SLOT_RE.findall(text)
+    return SLOT_RE.sub(lambda match: SLOT_MARK, text), values
+
+
+def template_key(text, language):
+    """
+    Grouping key: strings with the same key can share one translation.
+    """
+    template, values = split_template(text)
+    return template, tuple(plural_category(value, language) for value in values)
+
+
+def substitute_values(translation, source_values, target_values):
+    """
+    Rewrite the translation of a string with `source_values` into the translation
+    of the same template with `target_values`.
+
+    Returns:
+        The rewritten translation, or None if the values cannot be located unambiguously
+    """
+    if list(source_values) == list(target_values):
+        return translation
+    if len(set(source_values)) != len(source_values):
+        return None
+
+    matches = [match for match in SLOT_RE.finditer(translation) if match.group(0) in source_values]
+    if sorted(match.group(0) for match in matches) != sorted(source_values):
+        return None
+
+    replacement = dict(zip(source_values, target_values))
+    pieces = []
+    position = 0
+    for match in matches:
+        pieces.append(translation[position:match.start()])
+        pieces.append(replacement[match.group(0)])
+        position = match.end()
+    pieces.append(translation[position:])
+    return ''.join(pieces)
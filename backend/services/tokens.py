@@ -0,0 +1,33 @@
+"""
+Token Estimation
+
+Cheap local token estimates for pacing and budgeting.
+No tokenizer dependency: roughly 4 characters per token for Latin script,
+about one token per character for CJK, Devanagari, Thai and similar scripts.
+"""
+
+# Fixed per-message overhead of the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in a string.
+    """
+    if not text:
+        return 0
+    ascii_chars = 0
+    other_chars = 0
+    for ch in text:
+        if ord(ch) < 128:
+            ascii_chars += 1
+        else:
+            other_chars += 1
+    return max(1, (ascii_chars + 3) // 4 + other_chars)
+
+
+def estimate_messages_tokens(messages):
+    """
+    Estimate prompt tokens for a list of chat messages ({role, content}).
+    """
+    return sum(estimate_tokens(m.get('content', '')) + MESSAGE_OVERHEAD_TOKENS for m in messages)
@@ -0,0 +1,255 @@
+"""
+Translation Memory
+
+Two-tier cache for finished translations:
+- In-process LRU for hot entries
+- SQLite store on disk so entries survive restarts and releases
+
+Entries are keyed by scenario, target language, location, source text and a
+hash of the prompt pair, so editing a prompt invalidates old entries.
+
+With a FuzzyIndex attached, near() also finds past translations of similar
+sources (any prompt version). The index is built from the store in batches
+by a background thread at startup, without holding the store lock; until it
+is ready near() finds nothing.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Rows read per batch while building the fuzzy index
+FUZZY_LOAD_BATCH = 5000
+
+
+def prompt_hash(system_prompt, user_prompt):
+    """
+    Stable digest of a (system_prompt, user_prompt) pair.
+    """
+    digest = hashlib.sha256()
+    digest.update(system_prompt.encode('utf-8'))
+    digest.update(b'\x00')
+    digest.update(user_prompt.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class TranslationMemory:
+    """
+    LRU in front of a persistent SQLite table.
+
+    Args:
+        db_path: Path of the SQLite file (created if missing)
+        max_memory_entries: Capacity of the in-process LRU
+        fuzzy_index: Optional FuzzyIndex for near-match lookups
+    """
+
+    def __init__(self, db_path, max_memory_entries=10000, fuzzy_index=None):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.fuzzy_index = fuzzy_index
+        self._fuzzy_loaded = False
+        self._fuzzy_pending = None
+        self._fuzzy_generation = 0
+        self._fuzzy_loader = None
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'near_lookups': 0,
+            'near_hits': 0,
+        }
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                scenario TEXT NOT NULL,
+                language TEXT NOT NULL,
+                location TEXT NOT NULL,
+                source TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (scenario, language, location, source, prompt_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+        if self.fuzzy_index is not None:
+            self._start_fuzzy_load()
+
+    def get(self, scenario, language, location, source, digest):
+        """
+        Look up a translation. Returns None on a miss.
+        """
+        key = (scenario, language, location or '', source, digest)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return self._lru[key]
+
+            row = self._conn.execute(
+                'SELECT translation FROM translations WHERE scenario = ? AND language = ? '
+                'AND location = ? AND source = ? AND prompt_hash = ?',
+                key
+            ).fetchone()
+            if row is None:
+                self._counters['misses'] += 1
+                return None
+
+            self._counters['disk_hits'] += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, scenario, language, location, source, digest, translation):
+        """
+        Store a translation in both tiers.
+        """
+        key = (scenario, language, location or '', source, digest)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO translations '
+                '(scenario, language, location, source, prompt_hash, translation, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                key + (translation, time.time())
+            )
+            self._conn.commit()
+            self._counters['writes'] += 1
+            self._remember(key, translation)
+            fuzzy_ready = self._fuzzy_loaded
+            if self._fuzzy_pending is not None:
+                # Applied by the loader once it has read the store
+                self._fuzzy_pending.append((key[:3], source, translation))
+
+        if self.fuzzy_index is not None and fuzzy_ready:
+            self.fuzzy_index.add((scenario, language, location or ''), source, translation)
+
+    def near(self, scenario, language, location, source, k=3, threshold=0.0):
+        """
+        Past translations of sources similar to `source` (exact matches included).
+
+        Returns:
+            List of {"source", "translation", "score"}, best first; empty without
+            a fuzzy index or while it is still being built
+        """
+        if self.fuzzy_index is None:
+            return []
+        with self._lock:
+            ready = self._fuzzy_loaded
+        matches = self.fuzzy_index.query((scenario, language, location or ''), source, k, threshold) if ready else []
+        with self._lock:
+            self._counters['near_lookups'] += 1
+            if matches:
+                self._counters['near_hits'] += 1
+        return matches
+
+    def purge(self, scenario=None, language=None):
+        """
+        Delete entries matching the given scenario and/or language.
+        With neither argument the whole memory is cleared.
+
+        Returns:
+            Number of rows removed from the persistent store
+        """
+        clauses = []
+        params = []
+        if scenario:
+            clauses.append('scenario = ?')
+            params.append(scenario)
+        if language:
+            clauses.append('language = ?')
+            params.append(language)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        with self._lock:
+            cursor = self._conn.execute(f'DELETE FROM translations{where}', params)
+            self._conn.commit()
+            for key in list(self._lru):
+                if (not scenario or key[0] == scenario) and (not language or key[1] == language):
+                    del self._lru[key]
+            if self.fuzzy_index is not None:
+                # Rebuilt from the remaining rows; a load still running is abandoned
+                self._start_fuzzy_load()
+            return cursor.rowcount
+
+    def stats(self):
+        """
+        Snapshot of hit/miss/eviction counters and current sizes.
+        """
+        with self._lock:
+            stored = self._conn.execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+            counters = dict(self._counters)
+            memory_entries = len(self._lru)
+
+        lookups = counters['memory_hits'] + counters['disk_hits'] + counters['misses']
+        hits = counters['memory_hits'] + counters['disk_hits']
+        counters.update({
+            'hits': hits,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'memory_entries': memory_entries,
+            'memory_capacity': self.max_memory_entries,
+            'stored_entries': stored,
+            'fuzzy_entries': len(self.fuzzy_index) if self.fuzzy_index is not None else 0,
+            'fuzzy_ready': self._fuzzy_loaded,
+        })
+        return counters
+
+    def _start_fuzzy_load(self):
+        # Caller holds the lock (or is __init__)
+        self._fuzzy_loaded = False
+        self._fuzzy_pending = []
+        self._fuzzy_generation += 1
+        self._fuzzy_loader = threading.Thread(
+            target=self._load_fuzzy_index, args=(self._fuzzy_generation, self._fuzzy_loader),
+            name='fuzzy-index-load', daemon=True
+        )
+        self._fuzzy_loader.start()
+
+    def _load_fuzzy_index(self, generation, previous):
+        # An abandoned load stops at its next batch; let it finish adding before clearing
+        if previous is not None:
+            previous.join()
+        self.fuzzy_index.clear()
+        # Own connection, so lookups and writes proceed while the store is read
+        conn = sqlite3.connect(self.db_path)
+        try:
+            last = (float('-inf'), 0)
+            while True:
+                # Newest last, so the latest translation of a source wins
+                rows = conn.execute(
+                    'SELECT created_at, rowid, scenario, language, location, source, translation FROM translations '
+                    'WHERE (created_at, rowid) > (?, ?) ORDER BY created_at, rowid LIMIT ?',
+                    last + (FUZZY_LOAD_BATCH,)
+                ).fetchall()
+                with self._lock:
+                    if generation != self._fuzzy_generation:
+                        return
+                    if not rows:
+                        # Writes made during the load are newer than anything read
+                        for partition, source, translation in self._fuzzy_pending:
+                            self.fuzzy_index.add(partition, source, translation)
+                        self._fuzzy_pending = None
+                        self._fuzzy_loaded = True
+                        return
+                for _, _, scenario, language, location, source, translation in rows:
+                    self.fuzzy_index.add((scenario, language, location), source, translation)
+                last = rows[-1][:2]
+        finally:
+            conn.close()
+
+    def _remember(self, key, translation):
+        # Caller holds the lock
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_memory_entries:
+            self._lru.popitem(last=False)
+            self._counters['evictions'] += 1
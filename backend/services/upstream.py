@@ -0,0 +1,403 @@
+"""
+Resilient Upstream Client
+
+Wraps the OpenAI client used by every endpoint:
+- a keep-alive connection pool sized for the worker pools
+- a deadline per call, covering all of its attempts
+- retries of 408/409/429/5xx, timeouts and connection errors with
+  exponential backoff and full jitter, honoring Retry-After
+- a circuit breaker that fails fast while the upstream keeps failing
+- connection warm-up, so the first user request skips the TLS handshake
+- an optional adaptive concurrency limiter around every attempt
+
+Call sites keep using client.chat.completions.create(...), passing lane=BULK
+for batch work and should_stop= for work whose client may go away.
+AsyncResilientClient does the same around AsyncOpenAI for the ASGI app.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import nullcontext
+
+import openai
+
+from .cancellation import Cancelled
+from .concurrency import SUCCESS, OVERLOAD, IGNORED, INTERACTIVE
+
+# Statuses worth retrying; anything else (400, 401, 404, ...) fails at once
+RETRYABLE_STATUSES = (408, 409, 429)
+
+# Statuses that mean the upstream wants less concurrency
+OVERLOAD_STATUSES = (429, 503, 504)
+
+# Latency per call is normalized by output tokens plus this fixed share
+# (prompt processing, network) so long and short replies compare
+LATENCY_TOKEN_OFFSET = 20
+
+# Circuit breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling upstream while the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive upstream failures, rejects
+    calls for `reset_timeout` seconds, then lets one trial call through.
+
+    Args:
+        failure_threshold: Consecutive failures that open the circuit
+        reset_timeout: Seconds the circuit stays open before a trial call
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.opened = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(f'Upstream circuit open, retry in {remaining:.1f}s')
+                self.state = HALF_OPEN
+                self._trial_running = False
+            if self.state == HALF_OPEN:
+                if self._trial_running:
+                    raise CircuitOpenError('Upstream circuit half-open, trial call in progress')
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+    def release(self):
+        """
+        End a call that was neither an upstream success nor an upstream failure.
+        """
+        with self._lock:
+            self._trial_running = False
+
+
+def is_retryable(error):
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    status = getattr(error, 'status_code', None)
+    return status is not None and (status in RETRYABLE_STATUSES or status >= 500)
+
+
+def is_upstream_failure(error):
+    """
+    Errors that count against the circuit breaker (upstream unhealthy, not
+    our request being wrong or throttled).
+    """
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    status = getattr(error, 'status_code', None)
+    return status is not None and status >= 500
+
+
+def is_overload(error):
+    if isinstance(error, openai.APITimeoutError):
+        return True
+    return getattr(error, 'status_code', None) in OVERLOAD_STATUSES
+
+
+def latency_per_token(response, seconds):
+    usage = getattr(response, 'usage', None)
+    tokens = getattr(usage, 'completion_tokens', None) or 0
+    return seconds / (tokens + LATENCY_TOKEN_OFFSET)
+
+
+def retry_after_seconds(error):
+    """
+    Delay requested by the upstream (Retry-After / retry-after-ms), or None.
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class ResilientClient:
+    """
+    Retry, deadline and circuit-breaker wrapper around an OpenAI client.
+
+    Args:
+        client: OpenAI client (constructed with max_retries=0)
+        deadline: Seconds a call may take across all attempts
+        attempt_timeout: Upper bound of one attempt
+        max_attempts: Attempts per call, including the first
+        base_delay: First backoff step in seconds
+        max_delay: Largest backoff step in seconds
+        breaker: CircuitBreaker shared by all calls
+        limiter: Optional AIMDLimiter gating every attempt
+    """
+
+    def __init__(self, client, deadline=60.0, attempt_timeout=30.0, max_attempts=4,
+                 base_delay=0.5, max_delay=8.0, breaker=None, limiter=None):
+        self.client = client
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter
+        self.chat = _Chat(self)
+        self._counters = {'calls': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'cancelled': 0}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Everything but chat completions goes straight to the SDK client
+        return getattr(self.client, name)
+
+    def create_completion(self, deadline=None, lane=INTERACTIVE, should_stop=None, latency_tracker=None,
+                          **kwargs):
+        """
+        chat.completions.create with retries inside a deadline.
+
+        Args:
+            deadline: Seconds for this call (defaults to the client deadline)
+            lane: Priority lane of the call for the concurrency limiter
+            should_stop: Optional callable; once it returns True no further attempt
+                         is sent and Cancelled is raised
+            latency_tracker: Optional LatencyTracker that records the duration of
+                             the successful attempt (not slot waits or backoff)
+        """
+        self._count('calls')
+        expires = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit()
+
+            error = None
+            with self._slot(lane) as report:
+                if should_stop and should_stop():
+                    # Gave up while waiting for a slot or backing off
+                    self.breaker.release()
+                    self._count('cancelled')
+                    raise Cancelled('Request cancelled')
+                started = time.monotonic()
+                try:
+                    response = self.client.chat.completions.create(
+                        timeout=self._attempt_timeout(expires, started), **kwargs
+                    )
+                except Exception as e:
+                    error = e
+                    report['outcome'] = OVERLOAD if is_overload(e) else IGNORED
+                else:
+                    seconds = time.monotonic() - started
+                    report['outcome'] = SUCCESS
+                    report['latency'] = latency_per_token(response, seconds)
+                    if latency_tracker is not None:
+                        latency_tracker.record(seconds)
+
+            if error is None:
+                self.breaker.record_success()
+                return response
+            # Backoff happens outside the concurrency slot
+            time.sleep(self._settle(attempt, error, expires))
+
+    def warm_up(self):
+        """
+        Open a pooled connection in the background (TLS handshake included).
+        """
+        def connect():
+            try:
+                self.client.with_options(max_retries=0, timeout=10.0).models.list()
+            except Exception:
+                pass
+        threading.Thread(target=connect, name='upstream-warmup', daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters.update({'circuit': self.breaker.state, 'circuit_opened': self.breaker.opened})
+        return counters
+
+    def _admit(self):
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count('rejected')
+            raise
+
+    def _attempt_timeout(self, expires, started):
+        return max(0.1, min(self.attempt_timeout, expires - started))
+
+    def _settle(self, attempt, error, expires):
+        """
+        Book a failed attempt with the breaker.
+
+        Returns:
+            Backoff delay before the next attempt; raises `error` when there is none
+        """
+        if is_upstream_failure(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+        delay = self._backoff(attempt, error)
+        if not is_retryable(error) or attempt >= self.max_attempts \
+                or time.monotonic() + delay >= expires:
+            self._count('failures')
+            raise error
+        self._count('retries')
+        return delay
+
+    def _slot(self, lane):
+        if self.limiter is None:
+            return nullcontext({'outcome': None, 'latency': None})
+        return self.limiter.slot(lane)
+
+    def _backoff(self, attempt, error):
+        # Full jitter, but never sooner than the upstream asked for
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        requested = retry_after_seconds(error)
+        if requested is not None:
+            delay = max(delay, requested)
+        return delay
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+
+class AsyncResilientClient(ResilientClient):
+    """
+    ResilientClient around an AsyncOpenAI client: chat.completions.create is
+    a coroutine and waits (backoff, concurrency slots) without blocking the
+    event loop. Breaker and limiter may be shared with a blocking client.
+    """
+
+    async def create_completion(self, deadline=None, lane=INTERACTIVE, latency_tracker=None, **kwargs):
+        """
+        chat.completions.create with retries inside a deadline.
+
+        Args:
+            deadline: Seconds for this call (defaults to the client deadline)
+            lane: Priority lane of the call for the concurrency limiter
+            latency_tracker: Optional LatencyTracker for the successful attempt's duration
+        """
+        self._count('calls')
+        expires = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit()
+
+            error = None
+            try:
+                async with self._async_slot(lane) as report:
+                    started = time.monotonic()
+                    try:
+                        response = await self.client.chat.completions.create(
+                            timeout=self._attempt_timeout(expires, started), **kwargs
+                        )
+                    except Exception as e:
+                        error = e
+                        report['outcome'] = OVERLOAD if is_overload(e) else IGNORED
+                    else:
+                        seconds = time.monotonic() - started
+                        report['outcome'] = SUCCESS
+                        report['latency'] = latency_per_token(response, seconds)
+                        if latency_tracker is not None:
+                            latency_tracker.record(seconds)
+            except asyncio.CancelledError:
+                # Caller gave up (client disconnected, hedge lost): not an upstream verdict
+                self.breaker.release()
+                raise
+
+            if error is None:
+                self.breaker.record_success()
+                return response
+            await asyncio.sleep(self._settle(attempt, error, expires))
+
+    async def warm_up(self):
+        """
+        Open a pooled connection (TLS handshake included).
+        """
+        try:
+            await self.client.with_options(max_retries=0, timeout=10.0).models.list()
+        except Exception:
+            pass
+
+    def _async_slot(self, lane):
+        if self.limiter is None:
+            return nullcontext({'outcome': None, 'latency': None})
+        return self.limiter.async_slot(lane)
+
+
+class _Chat:
+    def __init__(self, owner):
+        self.completions = _Completions(owner)
+
+
+class _Completions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def create(self, **kwargs):
+        return self._owner.create_completion(**kwargs)
+
+
+def build_http_client(max_connections=100, max_keepalive=20, keepalive_expiry=30.0, connect_timeout=5.0,
+                      read_timeout=30.0):
+    """
+    Keep-alive pooled HTTP client for the OpenAI SDK.
+    """
+    return openai.DefaultHttpxClient(
+        **_pool_options(max_connections, max_keepalive, keepalive_expiry, connect_timeout, read_timeout)
+    )
+
+
+def build_async_http_client(max_connections=100, max_keepalive=20, keepalive_expiry=30.0, connect_timeout=5.0,
+                            read_timeout=30.0):
+    """
+    build_http_client() for AsyncOpenAI.
+    """
+    return openai.DefaultAsyncHttpxClient(
+        **_pool_options(max_connections, max_keepalive, keepalive_expiry, connect_timeout, read_timeout)
+    )
+
+
+def _pool_options(max_connections, max_keepalive, keepalive_expiry, connect_timeout, read_timeout):
+    # httpx.Limits via the SDK, so it matches the HTTP library the SDK was built with
+    limits = type(openai.DEFAULT_CONNECTION_LIMITS)(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry
+    )
+    return {'limits': limits, 'timeout': openai.Timeout(read_timeout, connect=connect_timeout)}
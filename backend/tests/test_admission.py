@@ -0,0 +1,59 @@
+import pytest
+
+from services import AdmissionQueue, Overloaded
+
+
+def test_request_is_shed_with_retry_after_once_the_backlog_exceeds_the_budget():
+    queue = AdmissionQueue('bulk', lambda: 1.0, latency_budget=5.0)
+    # An empty queue admits any request, however large
+    ticket = queue.admit(12)
+
+    with pytest.raises(Overloaded) as shed:
+        queue.admit(1)
+    # 12 calls at 1/s is 7s past the budget
+    assert shed.value.retry_after == 7
+    assert queue.stats()['shed'] == 1
+
+    ticket.release()
+    queue.admit(1).release()
+    assert queue.stats()['depth'] == 0
+
+
+def test_request_cap_sheds_even_within_the_latency_budget():
+    queue = AdmissionQueue('interactive', lambda: 100.0, latency_budget=5.0, max_pending=2)
+    with queue.admit(), queue.admit():
+        with pytest.raises(Overloaded) as shed:
+            queue.admit()
+    assert shed.value.retry_after == 1
+    assert queue.stats()['completed'] == 2
+
+
+def test_released_tickets_are_counted_once():
+    queue = AdmissionQueue('bulk', lambda: 1.0)
+    ticket = queue.admit(3)
+    ticket.release()
+    ticket.release()
+    assert queue.stats()['pending_calls'] == 0
+    assert queue.stats()['completed'] == 1
+
+
+def test_endpoint_answers_429_with_retry_after(tmp_path, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setenv('UPSTREAM_WARMUP', 'false')
+    for name in ('TRANSLATION_MEMORY_PATH', 'RATE_LIMIT_PATH', 'JOB_STORE_PATH'):
+        monkeypatch.setenv(name, str(tmp_path / f'{name.lower()}.sqlite3'))
+    app = pytest.importorskip('app')
+
+    full = AdmissionQueue('bulk', lambda: 1.0, latency_budget=1.0)
+    monkeypatch.setattr(app, 'bulk_queue', full)
+    ticket = full.admit(30)
+    try:
+        response = app.app.test_client().post(
+            '/api/translate/batch', json={'texts': ['Save'], 'languages': ['French']}
+        )
+    finally:
+        ticket.release()
+
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '29'
+    assert response.get_json()['retryAfter'] == 29
@@ -0,0 +1,74 @@
+import pytest
+
+from services import AIMDLimiter, ResilientClient, BULK, INTERACTIVE
+from services.concurrency import OVERLOAD, SUCCESS
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class Completions:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        raise self.error
+
+
+class Client:
+    def __init__(self, error):
+        self.chat = type('Chat', (), {})()
+        self.chat.completions = Completions(error)
+
+
+def test_overload_halves_the_limit_once_per_congestion_event():
+    limiter = AIMDLimiter(initial=16, min_limit=1, max_limit=32)
+    first = limiter.acquire()
+    second = limiter.acquire()
+
+    limiter.release(OVERLOAD, started=first)
+    assert limiter.limit == 8
+    # Started before the decrease: the same congestion, not acted on again
+    limiter.release(OVERLOAD, started=second)
+    assert limiter.limit == 8
+    assert limiter.stats()['overloads'] == 2
+
+
+def test_limit_never_drops_below_min_limit():
+    limiter = AIMDLimiter(initial=2, min_limit=2, max_limit=8)
+    for _ in range(3):
+        limiter.release(OVERLOAD, started=limiter.acquire())
+    assert limiter.limit == 2
+
+
+def test_successes_grow_the_limit_only_while_it_is_used():
+    limiter = AIMDLimiter(initial=4, max_limit=8)
+    for _ in range(8):
+        limiter.release(SUCCESS, started=limiter.acquire())
+    # One call in flight at a time never uses half of the limit
+    assert limiter.limit == 4
+
+    for _ in range(8):
+        started = [limiter.acquire() for _ in range(4)]
+        for token in started:
+            limiter.release(SUCCESS, started=token)
+    assert limiter.limit > 4
+
+
+def test_upstream_429_backs_the_limiter_off():
+    limiter = AIMDLimiter(initial=16, max_limit=32)
+    client = ResilientClient(Client(RateLimited('rate limited')), max_attempts=1, limiter=limiter)
+
+    with pytest.raises(RateLimited):
+        client.chat.completions.create(model='m', messages=[])
+    assert limiter.limit == 8
+    assert limiter.stats()['in_flight'] == 0
+
+
+def test_bulk_calls_leave_the_interactive_reserve_free():
+    limiter = AIMDLimiter(initial=4, max_limit=4, interactive_reserve=0.25)
+    assert limiter.lane_limit(BULK) == 3
+    assert limiter.lane_limit(INTERACTIVE) == 4
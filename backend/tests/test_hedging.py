@@ -0,0 +1,41 @@
+import threading
+import time
+
+from services import Hedger, LatencyTracker
+
+
+def test_slow_call_is_hedged_and_the_duplicate_wins():
+    hedger = Hedger(LatencyTracker(), budget=1.0, default_delay=0.05)
+    release = threading.Event()
+
+    def primary():
+        release.wait(5)
+        return 'slow'
+
+    try:
+        assert hedger.run(primary, lambda: 'fast') == 'fast'
+    finally:
+        release.set()
+    stats = hedger.stats()
+    assert stats['hedges'] == 1
+    assert stats['hedge_wins'] == 1
+
+
+def test_hedges_are_capped_by_the_budget():
+    hedger = Hedger(LatencyTracker(), budget=0.0, default_delay=0.01)
+
+    def primary():
+        time.sleep(0.05)
+        return 'primary'
+
+    assert hedger.run(primary, lambda: 'duplicate') == 'primary'
+    assert hedger.stats()['over_budget'] == 1
+
+
+def test_hedge_delay_follows_the_latency_percentile():
+    tracker = LatencyTracker()
+    hedger = Hedger(tracker, percentile=95, min_samples=20, default_delay=5.0, min_delay=0.2)
+    assert hedger.hedge_delay() == 5.0
+    for sample in range(1, 21):
+        tracker.record(sample / 10)
+    assert hedger.hedge_delay() == 1.9
@@ -0,0 +1,36 @@
+import threading
+import time
+
+from services import JobManager, JobStore
+from services.jobs import CANCELLED, COMPLETED
+
+
+def wait_for(manager, job_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if manager.progress(job_id)['status'] == status:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_job_cancelled_while_queued_can_be_resumed(tmp_path):
+    manager = JobManager(JobStore(str(tmp_path / 'jobs.sqlite3')), max_workers=1)
+    release = threading.Event()
+    manager.register('block', lambda job: release.wait(5))
+    manager.register('cells', lambda job: job.record_cell(0, 'French', 'Bonjour'))
+
+    # Fill the only worker so the next job stays queued
+    blocker = manager.submit('block', {})
+    queued = manager.submit('cells', {})
+
+    assert manager.cancel(queued)
+    assert manager.progress(queued)['status'] == CANCELLED
+    assert not manager.is_cancelled(queued)
+
+    assert manager.resume(queued)
+    release.set()
+    assert wait_for(manager, blocker, COMPLETED)
+    assert wait_for(manager, queued, COMPLETED)
+    assert manager.progress(queued)['cellsDone'] == 1
+
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from services import SharedRateLimiter, BULK, INTERACTIVE
+
+
+def drained_limiter(tmp_path, requests_per_minute=60):
+    limiter = SharedRateLimiter(str(tmp_path / 'limits.sqlite3'), requests_per_minute, 10 ** 9)
+    for _ in range(requests_per_minute):
+        limiter.acquire(0, 'warm-up')
+    return limiter
+
+
+def test_should_stop_leaves_the_queue_without_taking_capacity(tmp_path):
+    limiter = drained_limiter(tmp_path)
+    stop = threading.Event()
+    threading.Timer(0.2, stop.set).start()
+
+    started = time.monotonic()
+    assert limiter.acquire(0, 'team-a', should_stop=stop.is_set) is None
+    assert time.monotonic() - started < 1.5
+
+    stats = limiter.stats()
+    assert stats['acquired'] == 60
+    assert stats['abandoned'] == 1
+    assert stats['queued'] == 0
+
+
+def test_unlisted_tenants_share_the_wildcard_quota(tmp_path):
+    limiter = SharedRateLimiter(
+        str(tmp_path / 'limits.sqlite3'), 6000, 10 ** 9,
+        tenant_quotas={'team-a': {'requestsPerMinute': 60}, '*': {'requestsPerMinute': 3}}
+    )
+    # A fresh tenant name per call still draws from the one "*" bucket
+    for name in ('x1', 'x2', 'x3'):
+        assert limiter.acquire(0, name) == 0
+    stop = threading.Event()
+    threading.Timer(0.3, stop.set).start()
+    assert limiter.acquire(0, 'x4', should_stop=stop.is_set) is None
+    assert limiter.stats()['quota_throttled'] >= 1
+
+    # Listed tenants keep their own quota
+    assert limiter.acquire(0, 'team-a') == 0
+    assert set(limiter.stats()['tenant_usage']) == {'*', 'team-a'}
+
+
+def test_settle_returns_unused_reserved_tokens(tmp_path):
+    limiter = SharedRateLimiter(str(tmp_path / 'limits.sqlite3'), 6000, 1000)
+    assert limiter.acquire(1000, 'team-a') == 0
+    limiter.settle(1000, 100, 'team-a')
+    # 900 tokens came back, so this fits without waiting for the refill
+    assert limiter.acquire(800, 'team-a') == 0
+    assert limiter.stats()['settled_tokens'] == 900
+
+
+def acquire_in_order(limiter, callers):
+    """Start callers (tenant, lane) a little apart; return the order they got capacity in"""
+    order = []
+    lock = threading.Lock()
+
+    def acquire(tenant, lane):
+        limiter.acquire(0, tenant, lane)
+        with lock:
+            order.append(tenant)
+
+    threads = []
+    for tenant, lane in callers:
+        thread = threading.Thread(target=acquire, args=(tenant, lane))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.1)
+    for thread in threads:
+        thread.join(10)
+    return order
+
+
+def test_least_recently_served_tenant_goes_first(tmp_path):
+    # The heavy tenant used the whole minute of capacity
+    limiter = SharedRateLimiter(str(tmp_path / 'limits.sqlite3'), 60, 10 ** 9)
+    for _ in range(60):
+        limiter.acquire(0, 'heavy')
+
+    order = acquire_in_order(limiter, [('heavy', BULK), ('light', BULK)])
+    assert order == ['light', 'heavy']
+
+
+def test_interactive_callers_go_before_bulk(tmp_path):
+    limiter = drained_limiter(tmp_path)
+    order = acquire_in_order(limiter, [('bulk-job', BULK), ('translator', INTERACTIVE)])
+    assert order == ['translator', 'bulk-job']
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from services import SingleFlight
+
+
+def run_followers(flight, key, fn, count):
+    outcomes = []
+    lock = threading.Lock()
+
+    def follow():
+        try:
+            outcome = flight.do(key, fn)
+        except Exception as e:
+            outcome = e
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=follow) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_followers_receive_the_leaders_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def translate():
+        calls.append(1)
+        release.wait(5)
+        return 'Bonjour'
+
+    leader, leader_outcome = run_followers(flight, 'key', translate, 1)
+    wait_until(lambda: calls)
+    followers, outcomes = run_followers(flight, 'key', translate, 5)
+    wait_until(lambda: flight.stats()['coalesced'] == 5)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert calls == [1]
+    assert leader_outcome == [('Bonjour', False)]
+    assert outcomes == [('Bonjour', True)] * 5
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_followers_receive_the_leaders_error():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        release.wait(5)
+        raise RuntimeError('upstream rejected request')
+
+    leader, _ = run_followers(flight, 'key', fail, 1)
+    wait_until(lambda: calls)
+    followers, outcomes = run_followers(flight, 'key', fail, 3)
+    wait_until(lambda: flight.stats()['coalesced'] == 3)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert calls == [1]
+    assert [str(outcome) for outcome in outcomes] == ['upstream rejected request'] * 3
+
+
+def test_finished_flights_are_not_reused():
+    flight = SingleFlight()
+    assert flight.do('key', lambda: 1) == (1, False)
+    assert flight.do('key', lambda: 2) == (2, False)
+    with pytest.raises(ValueError):
+        flight.do('key', lambda: int('x'))
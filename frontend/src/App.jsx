@@ -1,4 +1,4 @@
-import React, { useEffect, useMemo, useState } from 'react';
+import React, { useEffect, useMemo, useRef, useState } from 'react';
 import LandingPage from './pages/LandingPage.jsx';
 import WorkspacePage from './pages/WorkspacePage.jsx';
 import ToastContainer from './components/ToastContainer.jsx';
@@ -23,6 +23,7 @@ export default function App() {
   const [cancelRequested, setCancelRequested] = useState(false);
   const [qaFindings, setQaFindings] = useState([]);
   const [qaModalOpen, setQaModalOpen] = useState(false);
+  const streamAbortRef = useRef(null);
 
   // Handle browser navigation
   useEffect(() => {
@@ -80,29 +81,49 @@ export default function App() {
     return mapping[frontendId] || 'general';
   };
 
-  const translateWithApi = async (text, langName, scenarioId) => {
-    try {
-      const response = await fetch(`${API_URL}/translate/stream`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          text,
-          targetLanguage: langName,
-          scenario: getBackendScenarioId(scenarioId)
-        })
-      });
-      
-      if (!response.ok) {
-        const error = await response.json();
-        throw new Error(error.error || 'Localization failed');
+  // Translate the whole table in one request; the backend streams each cell
+  // as a server-sent event as soon as it is ready
+  const streamTableWithApi = async (lines, languages, scenarioId, onEvent, signal) => {
+    const backendScenario = getBackendScenarioId(scenarioId);
+    const response = await fetch(`${API_URL}/translate/stream/table`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        texts: lines,
+        languages,
+        scenario: backendScenario,
+        // Short rows: one completion per row covering every language
+        fanIn: backendScenario === 'app-store'
+      }),
+      signal
+    });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.error || 'Localization failed');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let eventName = 'message';
+        let payload = '';
+        rawEvent.split('\n').forEach(line => {
+          if (line.startsWith('event:')) eventName = line.slice(6).trim();
+          else if (line.startsWith('data:')) payload += line.slice(5).trim();
+        });
+        if (payload) onEvent(eventName, JSON.parse(payload));
       }
-      
-      const data = await response.json();
-      return data.translation;
-    } catch (error) {
-      console.error('Localization API error:', error);
-      // Return a placeholder if API fails
-      return `[Localization pending: ${langName}]`;
     }
   };
 
@@ -159,6 +180,7 @@ export default function App() {
 
   const stopLocalization = () => {
     setCancelRequested(true);
+    streamAbortRef.current?.abort();
   };
 
   const simulateLocalization = async () => {
@@ -191,33 +213,58 @@ export default function App() {
     const totalCells = lines.length * allLanguages.length;
     let completedCells = 0;
 
-    // Process each cell with real or mock translations
-    for (let rowIndex = 0; rowIndex < lines.length; rowIndex++) {
-      if (cancelRequested) break;
-      for (let langIndex = 0; langIndex < allLanguages.length; langIndex++) {
-        if (cancelRequested) break;
-        const text = lines[rowIndex];
-        const lang = allLanguages[langIndex];
-        
-        try {
-          let translation;
-          if (useRealApi) {
-            translation = await translateWithApi(text, lang, scenario?.id);
-          } else {
-            // Mock translation with delay
-            await new Promise(resolve => setTimeout(resolve, 150));
-            translation = mockTranslate(text, lang);
-          }
-          
-          tempData[rowIndex].translations[lang] = translation;
+    if (useRealApi) {
+      const controller = new AbortController();
+      streamAbortRef.current = controller;
+      try {
+        await streamTableWithApi(lines, allLanguages, scenario?.id, (eventName, payload) => {
+          if (eventName !== 'translation' && eventName !== 'error') return;
+          const { rowIndex, language } = payload;
+          tempData[rowIndex].translations[language] = eventName === 'translation'
+            ? payload.translation
+            : `[Localization pending: ${language}]`;
           setTableData([...tempData]);
-          
+
           completedCells++;
           setProgress(Math.round((completedCells / totalCells) * 100));
-        } catch (error) {
-          console.error(`Error translating "${text}" to ${lang}:`, error);
-          tempData[rowIndex].translations[lang] = `[Error: ${lang}]`;
+        }, controller.signal);
+      } catch (error) {
+        if (!controller.signal.aborted) {
+          console.error('Localization stream error:', error);
+          // Mark anything the stream did not deliver
+          tempData.forEach(row => {
+            allLanguages.forEach(lang => {
+              if (row.translations[lang] === undefined) {
+                row.translations[lang] = `[Localization pending: ${lang}]`;
+              }
+            });
+          });
+          setTableData([...tempData]);
+        }
+      } finally {
+        streamAbortRef.current = null;
+      }
+
+      if (controller.signal.aborted) {
+        setIsProcessing(false);
+        return;
+      }
+    } else {
+      // Process each cell with mock translations
+      for (let rowIndex = 0; rowIndex < lines.length; rowIndex++) {
+        if (cancelRequested) break;
+        for (let langIndex = 0; langIndex < allLanguages.length; langIndex++) {
+          if (cancelRequested) break;
+          const text = lines[rowIndex];
+          const lang = allLanguages[langIndex];
+
+          // Mock translation with delay
+          await new Promise(resolve => setTimeout(resolve, 150));
+          tempData[rowIndex].translations[lang] = mockTranslate(text, lang);
           setTableData([...tempData]);
+
+          completedCells++;
+          setProgress(Math.round((completedCells / totalCells) * 100));
         }
       }
     }